@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Check or update the runner pin in templates/fragments.yml.
+
+The GitLab `setup` fragment downloads the nipyapi-actions runner at a tagged
+release and refuses to use it unless its files hash to the digest recorded
+next to that tag. The digest is computed from a release archive, the same
+way `setup` computes it: from `git archive` of a commit (default: HEAD,
+committed files only) or from a downloaded archive.
+
+    python scripts/runner_digest.py                     # print the digest of HEAD
+    python scripts/runner_digest.py --write             # pin HEAD (in the release commit)
+    python scripts/runner_digest.py --check --archive https://github.com/OWNER/REPO/archive/TAG.tar.gz
+
+The pin only changes when a release is prepared: bump the version in
+pyproject.toml and CHANGELOG.md, then run `make fragments-pin` in the same
+commit. The pinned ref is `v` followed by that version. The release workflow
+checks the pin against the archive GitHub serves for the tag.
+"""
+import hashlib
+import io
+import posixpath
+import re
+import subprocess
+import sys
+import tarfile
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FRAGMENTS = ROOT / 'templates' / 'fragments.yml'
+PREFIX = 'src/nipyapi_actions/'
+
+REF_LINE = re.compile(r'^(\s*DEFAULT_REF=)(\S*)$', re.MULTILINE)
+SHA_LINE = re.compile(r'^(\s*DEFAULT_SHA256=)(\S*)$', re.MULTILINE)
+
+
+def archive_digest(data):
+    """SHA-256 over (path, SHA-256 of content) of the runner files in a release archive.
+
+    Members are read as `setup` reads them: the top-level directory is dropped and
+    only regular files under src/nipyapi_actions/ count, sorted by path.
+    """
+    files = {}
+    with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+        for member in archive.getmembers():
+            name = posixpath.normpath(member.name.split('/', 1)[-1])
+            if name.startswith(PREFIX) and member.isfile():
+                files[name[len(PREFIX):]] = archive.extractfile(member).read()
+    if not files:
+        print(f'ERROR: no {PREFIX} files in the archive', file=sys.stderr)
+        sys.exit(1)
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(f'{name}\0{hashlib.sha256(files[name]).hexdigest()}\n'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def read_archive(source=None):
+    """Archive bytes from a URL or file, or `git archive HEAD` by default."""
+    if source is None:
+        return subprocess.run(
+            ['git', 'archive', '--format=tar', '--prefix=release/', 'HEAD'],
+            cwd=ROOT, check=True, capture_output=True,
+        ).stdout
+    if source.startswith(('https://', 'http://')):
+        with urllib.request.urlopen(source, timeout=60) as response:
+            return response.read()
+    return Path(source).read_bytes()
+
+
+def release_ref():
+    """Tag of the release these fragments ship with."""
+    match = re.search(r'^version\s*=\s*"([^"]+)"', (ROOT / 'pyproject.toml').read_text(), re.MULTILINE)
+    if not match:
+        print('ERROR: no version in pyproject.toml', file=sys.stderr)
+        sys.exit(1)
+    return f'v{match.group(1)}'
+
+
+def main(argv):
+    source = None
+    if '--archive' in argv:
+        index = argv.index('--archive')
+        if index + 1 >= len(argv):
+            print('ERROR: --archive needs a file or URL', file=sys.stderr)
+            return 2
+        source = argv[index + 1]
+        argv = argv[:index] + argv[index + 2:]
+    digest, ref = archive_digest(read_archive(source)), release_ref()
+    if not argv:
+        print(digest)
+        return 0
+    content = FRAGMENTS.read_text()
+    pinned_ref, pinned_sha = REF_LINE.search(content), SHA_LINE.search(content)
+    if not pinned_ref or not pinned_sha:
+        print(f'ERROR: DEFAULT_REF / DEFAULT_SHA256 not found in {FRAGMENTS}', file=sys.stderr)
+        return 1
+    if argv == ['--check']:
+        stale = []
+        if pinned_ref.group(2) != ref:
+            stale.append(f'DEFAULT_REF is {pinned_ref.group(2)}, expected {ref}')
+        if pinned_sha.group(2) != digest:
+            stale.append(f'DEFAULT_SHA256 is {pinned_sha.group(2)}, expected {digest}')
+        for message in stale:
+            print(f'ERROR: {message} (run: make fragments-pin)', file=sys.stderr)
+        return 1 if stale else 0
+    if argv == ['--write']:
+        content = REF_LINE.sub(lambda m: m.group(1) + ref, content, count=1)
+        content = SHA_LINE.sub(lambda m: m.group(1) + digest, content, count=1)
+        FRAGMENTS.write_text(content)
+        print(f'Pinned runner {ref} ({digest})')
+        return 0
+    print('Usage: runner_digest.py [--check | --write] [--archive FILE_OR_URL]', file=sys.stderr)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,14 @@
+"""
+NiPyAPI Actions runtime helpers.
+
+The action delegates NiFi operations to the nipyapi CLI functions in
+``nipyapi.ci``. This package adds the pieces that only make sense inside a
+CI step: running several commands in one process, output formatting for
+the CI platform, and the action-specific commands that are not part of
+nipyapi itself.
+
+Run with::
+
+    python -m nipyapi_actions deploy-flow
+    NIFI_COMMANDS="[ensure-registry, deploy-flow, start-flow]" python -m nipyapi_actions
+"""
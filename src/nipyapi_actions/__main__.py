@@ -0,0 +1,157 @@
+# pylint: disable=broad-exception-caught
+"""
+Entry point: ``python -m nipyapi_actions [command ...]``.
+
+With command arguments, runs those commands in order. Without arguments,
+reads the pipeline from NIFI_COMMANDS (the ``commands`` action input), or
+falls back to the single NIFI_ACTION_COMMAND (the ``command`` input).
+
+Outputs are printed to stdout in the platform format (see ``outputs``) as
+each step finishes, and appended to NIFI_OUTPUT_FILE if set; progress and
+timing go to stderr so they never end up in GITHUB_OUTPUT.
+"""
+
+import logging
+import os
+import sys
+
+from .commands import OFFLINE_COMMANDS
+from .outputs import OutputSink, detect_output_format, jsonl_output_path
+from .runner import parse_steps, run_steps
+
+log = logging.getLogger(__package__)
+
+# nipyapi.profiles.switch() errors meaning no credentials were given, not that login failed
+_NO_AUTH_CONFIGURED = ("No configuration found", "No valid NiFi authentication method")
+
+
+def _log_level():
+    """Return the NIFI_LOG_LEVEL as a logging level, or None if unset."""
+    level_name = os.environ.get("NIFI_LOG_LEVEL", "").upper()
+    if not level_name:
+        return None
+    return getattr(logging, level_name, logging.WARNING)
+
+
+def _log_on_error() -> bool:
+    """Whether to attach captured logs to the outputs on failure (NIFI_LOG_ON_ERROR)."""
+    return os.environ.get("NIFI_LOG_ON_ERROR", "true").lower() not in ("false", "0", "no", "off")
+
+
+def _fail(sink, error, log_capture=None) -> int:
+    """Write the outputs for an error raised outside a command and return the exit code."""
+    outputs = {"success": False, "error": error}
+    if log_capture is not None and _log_on_error():
+        outputs["logs"] = log_capture.get_all_logs()
+    sink.write(outputs)
+    sink.close()
+    return 1
+
+
+def main(argv=None) -> int:  # pylint: disable=too-many-branches
+    """Run the requested command(s) and print their outputs."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        spec, pipeline = list(argv), len(argv) > 1
+    elif os.environ.get("NIFI_COMMANDS"):
+        spec, pipeline = os.environ["NIFI_COMMANDS"], True
+    else:
+        spec, pipeline = os.environ.get("NIFI_ACTION_COMMAND"), False
+    sink = OutputSink(
+        detect_output_format(),
+        os.environ.get("NIFI_OUTPUT_FILE") or None,
+        jsonl_path=jsonl_output_path(),
+    )
+
+    # Runner progress to stderr; nipyapi logs are captured like the nipyapi CLI does
+    logging.basicConfig(stream=sys.stderr, format="%(message)s")
+    logging.getLogger(__package__).setLevel(logging.INFO)
+
+    try:
+        if not spec:
+            raise ValueError("command is required (or set NIFI_COMMANDS / NIFI_ACTION_COMMAND)")
+        steps = parse_steps(spec)
+    except ValueError as e:
+        return _fail(sink, str(e))
+
+    if os.environ.get("NIFI_VERIFY_SSL", "true").lower() in ("false", "0", "no"):
+        import urllib3
+
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    from nipyapi.cli import LogCapture
+
+    from .auth import login
+    from .metrics import install as install_metrics
+    from .metrics import to_output as metrics_output
+
+    # Count and time every NiFi REST call, including the login
+    metrics = install_metrics()
+    metrics.command = "login"
+    log_capture = LogCapture()
+    log_capture.setLevel(logging.DEBUG)
+    log_capture.setFormatter(logging.Formatter("%(name)s: %(message)s"))
+    nipyapi_logger = logging.getLogger("nipyapi")
+    nipyapi_logger.addHandler(log_capture)
+    nipyapi_logger.setLevel(logging.DEBUG)
+    nipyapi_logger.propagate = False
+
+    # One session for every step: configure and log in once (or reuse a cached token)
+    token, token_source = None, "none"
+    try:
+        if all(command in OFFLINE_COMMANDS for command, _ in steps):
+            log.debug("Login skipped: only offline commands requested")
+        else:
+            token, token_source = login()
+    except ValueError as e:
+        if not str(e).startswith(_NO_AUTH_CONFIGURED):
+            return _fail(sink, f"NiFi login failed: {e}", log_capture)
+        # Nothing to log in with; errors will surface on the first API call
+        log.debug("Login skipped: %s", e)
+    except Exception as e:
+        return _fail(sink, f"NiFi login failed: {e}", log_capture)
+
+    # Each step's outputs are written as soon as it finishes
+    outputs, failed = run_steps(steps, on_result=sink.write)
+
+    summary = metrics.summary()
+    log.info(
+        "NiFi API: %d request(s), %d error(s), %.3fs, %d bytes received",
+        summary["requests"],
+        summary["errors"],
+        summary["seconds"],
+        summary["bytes_received"],
+    )
+    metrics_file = os.environ.get("NIFI_METRICS_FILE")
+    if metrics_file:
+        try:
+            metrics.write(metrics_file)
+        except (OSError, ValueError) as e:
+            log.warning("Could not write metrics to %s: %s", metrics_file, e)
+
+    extra = {"token_source": token_source, "metrics": metrics_output(summary)}
+    if sink.jsonl_path:
+        extra["outputs_file"] = sink.jsonl_path
+    if pipeline:
+        for key in ("step_timings", "total_seconds", "failed_step"):
+            if key in outputs:
+                extra[key] = outputs[key]
+    if token and sink.mask(token):
+        # Later steps can pass this as nifi-bearer-token
+        extra["nifi_bearer_token"] = token
+
+    if failed:
+        if _log_on_error():
+            extra["logs"] = log_capture.get_all_logs()
+    elif _log_level() is not None:
+        logs = log_capture.get_logs(min_level=_log_level())
+        if logs:
+            extra["logs"] = logs
+
+    sink.write(extra)
+    sink.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
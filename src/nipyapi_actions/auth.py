@@ -0,0 +1,176 @@
+# pylint: disable=broad-exception-caught
+"""
+auth - configure the NiFi session, reusing bearer tokens across steps.
+
+Username/password logins are the slowest part of short commands on clusters
+backed by LDAP or OIDC, and every action step is a new process. The token
+NiFi issues at login is cached in a private file under the job's temporary
+directory (RUNNER_TEMP on GitHub Actions), keyed on endpoint, user and
+password, and reused by later steps until shortly before it expires. A cached token that
+NiFi rejects is discarded and a fresh login performed.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Optional, Tuple
+
+import nipyapi
+
+log = logging.getLogger(__name__)
+
+# Stop reusing a token this many seconds before it expires
+EXPIRY_MARGIN = 60
+# Lifetime assumed when the token carries no readable expiry
+DEFAULT_TTL = 3600
+
+
+def _cache_dir() -> Optional[str]:
+    """Return the token cache directory, or None if caching is disabled or unavailable."""
+    if not nipyapi.utils.getenv_bool("NIFI_TOKEN_CACHE", default=True):
+        return None
+    explicit = os.environ.get("NIFI_TOKEN_CACHE_DIR")
+    if explicit:
+        return explicit
+    runner_temp = os.environ.get("RUNNER_TEMP")
+    return os.path.join(runner_temp, "nipyapi-actions", "tokens") if runner_temp else None
+
+
+def _cache_path(cache_dir: str, endpoint: str, username: str, password: str) -> str:
+    """
+    Return the cache file for an endpoint and credentials (hashed, never the raw values).
+
+    The password is part of the key, so a rotated or wrong password never
+    picks up a token issued for the old one.
+    """
+    credentials = f"{endpoint.rstrip('/')}\0{username}\0{password}"
+    key = hashlib.sha256(credentials.encode()).hexdigest()[:32]
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def token_expiry(token: str) -> float:
+    """
+    Read the ``exp`` claim from a JWT without verifying it.
+
+    Returns:
+        Expiry as a Unix timestamp, or now + DEFAULT_TTL if unreadable
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return time.time() + DEFAULT_TTL
+
+
+def read_cached_token(path: str) -> Optional[str]:
+    """Return the cached token at path if present and not about to expire."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("expires", 0) - EXPIRY_MARGIN <= time.time():
+        return None
+    return entry.get("token")
+
+
+def write_cached_token(path: str, token: str) -> None:
+    """Write a token to the cache atomically, readable only by the current user."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    os.chmod(directory, 0o700)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")  # created 0600
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"token": token, "expires": token_expiry(token)}, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _current_token() -> Optional[str]:
+    """Return the bearer token the NiFi client is currently configured with."""
+    return nipyapi.config.nifi_config.api_key.get("bearerAuth")
+
+
+def _token_accepted() -> bool:
+    """Check the configured token with a cheap authenticated request."""
+    try:
+        user = nipyapi.nifi.FlowApi().get_current_user()
+    except Exception as e:
+        log.debug("Cached token check failed: %s", e)
+        return False
+    return not getattr(user, "anonymous", True)
+
+
+def _switch_with_token(token: str) -> None:
+    """Configure the session with a bearer token instead of logging in."""
+    saved = os.environ.get("NIFI_BEARER_TOKEN")
+    os.environ["NIFI_BEARER_TOKEN"] = token
+    try:
+        nipyapi.profiles.switch()
+    finally:
+        if saved is None:
+            os.environ.pop("NIFI_BEARER_TOKEN", None)
+        else:
+            os.environ["NIFI_BEARER_TOKEN"] = saved
+
+
+def login() -> Tuple[Optional[str], str]:
+    """
+    Configure the nipyapi session once for this process.
+
+    An explicit NIFI_BEARER_TOKEN is used as-is. With NIFI_USERNAME and
+    NIFI_PASSWORD, a cached token for the same endpoint and credentials is reused
+    if NiFi still accepts it; otherwise a normal login is performed and the
+    new token cached. Other profiles (OIDC, mTLS, profiles file) are passed
+    straight to ``nipyapi.profiles.switch``.
+
+    Cache location: NIFI_TOKEN_CACHE_DIR, else $RUNNER_TEMP/nipyapi-actions/tokens.
+    Disable with NIFI_TOKEN_CACHE=false.
+
+    Returns:
+        tuple of (bearer token in use or None, source) where source is one of
+        ``input``, ``cache``, ``login`` or ``none``
+
+    Raises:
+        ValueError: No configuration found, or login failed
+    """
+    if os.environ.get("NIFI_BEARER_TOKEN"):
+        nipyapi.profiles.switch()
+        return _current_token(), "input"
+
+    endpoint = os.environ.get("NIFI_API_ENDPOINT")
+    username = os.environ.get("NIFI_USERNAME")
+    password = os.environ.get("NIFI_PASSWORD")
+    cache_dir = _cache_dir()
+    if not (cache_dir and endpoint and username and password):
+        nipyapi.profiles.switch()
+        token = _current_token()
+        return token, "login" if token else "none"
+
+    path = _cache_path(cache_dir, endpoint, username, password)
+    token = read_cached_token(path)
+    if token:
+        _switch_with_token(token)
+        if _token_accepted():
+            log.info("Reusing cached NiFi token for %s", username)
+            return token, "cache"
+        log.info("Cached NiFi token was rejected, logging in again")
+
+    nipyapi.profiles.switch()
+    token = _current_token()
+    if token:
+        try:
+            write_cached_token(path, token)
+        except OSError as e:
+            log.warning("Could not cache NiFi token: %s", e)
+    return token, "login"
+
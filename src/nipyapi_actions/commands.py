@@ -0,0 +1,150 @@
+"""
+commands - registry of action command names and their implementations.
+
+Commands are referenced by dotted path and imported on first use, so
+looking up or checking command names does not import nipyapi or any
+command module. Running a command does: the runner imports nipyapi for log
+capture and request metrics even for OFFLINE_COMMANDS, which only skip the
+NiFi login.
+"""
+
+import importlib
+from typing import Callable
+
+# Action command name -> "module:function"
+COMMANDS = {
+    "ensure-registry": "nipyapi_actions.ensure_registry:ensure_registry",
+    "deploy-flow": "nipyapi.ci:deploy_flow",
+    "start-flow": "nipyapi_actions.lifecycle:start_flow",
+    "stop-flow": "nipyapi_actions.lifecycle:stop_flow",
+    "get-status": "nipyapi_actions.status:get_status",
+    "configure-params": "nipyapi_actions.configure_params:configure_params",
+    "change-version": "nipyapi.ci:change_flow_version",
+    "revert-flow": "nipyapi.ci:revert_flow",
+    "cleanup": "nipyapi_actions.lifecycle:cleanup",
+    "purge-flowfiles": "nipyapi_actions.purge:purge_flowfiles",
+    "export-flow-definition": "nipyapi_actions.export_flow:export_flow_definition",
+    "import-flow-definition": "nipyapi_actions.import_flow:import_flow_definition",
+    "list-registry-flows": "nipyapi_actions.registry_cache:list_registry_flows",
+    "get-versions": "nipyapi_actions.registry_cache:get_flow_versions",
+    "get-diff": "nipyapi.ci:get_flow_diff",
+    # Provided by this package
+    "deploy-flows": "nipyapi_actions.deploy_flows:deploy_flows",
+    "wait-for-state": "nipyapi_actions.wait_for_state:wait_for_state",
+    "garbage-collect": "nipyapi_actions.garbage_collect:garbage_collect",
+    "diff-definitions": "nipyapi_actions.diff_definitions:diff_definitions",
+    "promote-flow": "nipyapi_actions.promote_flow:promote_flow",
+    "load-test": "nipyapi_actions.load_test:load_test",
+    "validate-flow": "nipyapi_actions.validate_flow:validate_flow",
+    "resolve-params": "nipyapi_actions.resolve_params:resolve_params",
+}
+
+# Commands that work on local files only and never call NiFi; the runner skips the login
+OFFLINE_COMMANDS = frozenset(("diff-definitions", "validate-flow"))
+
+# Outputs that are exported to the environment of later pipeline steps
+FORWARDED_OUTPUTS = {
+    "registry_client_id": "NIFI_REGISTRY_CLIENT_ID",
+    "process_group_id": "NIFI_PROCESS_GROUP_ID",
+}
+
+# Action input name -> environment variable (mirrors the env block in action.yml)
+INPUT_ENV = {
+    "registry-token": "GH_REGISTRY_TOKEN",
+    "registry-repo": "NIFI_REGISTRY_REPO",
+    "registry-client-name": "NIFI_REGISTRY_CLIENT_NAME",
+    "registry-client-id": "NIFI_REGISTRY_CLIENT_ID",
+    "repository-path": "NIFI_REPOSITORY_PATH",
+    "bucket": "NIFI_BUCKET",
+    "flow": "NIFI_FLOW",
+    "branch": "NIFI_FLOW_BRANCH",
+    "version": "NIFI_TARGET_VERSION",
+    "process-group-id": "NIFI_PROCESS_GROUP_ID",
+    "process-group-ids": "NIFI_PROCESS_GROUP_IDS",
+    "children-of": "NIFI_CHILDREN_OF",
+    "parameters": "NIFI_PARAMETERS",
+    "parameters-file": "NIFI_PARAMETERS_FILE",
+    "parameters-format": "NIFI_PARAMETERS_FORMAT",
+    "parameters-sensitive": "NIFI_PARAMETERS_SENSITIVE",
+    "disable-controllers": "NIFI_DISABLE_CONTROLLERS",
+    "delete-parameter-context": "NIFI_DELETE_PARAMETER_CONTEXT",
+    "force": "NIFI_FORCE_DELETE",
+    "import-force": "NIFI_IMPORT_FORCE",
+    "drain": "NIFI_DRAIN",
+    "file-path": ("NIFI_EXPORT_FILE_PATH", "NIFI_FLOW_FILE_PATH"),
+    "parent-id": "NIFI_PARENT_ID",
+    "export-mode": "NIFI_EXPORT_MODE",
+    "compression": "NIFI_EXPORT_COMPRESSION",
+    "detailed": "NIFI_DETAILED",
+    "registry-cache": "NIFI_REGISTRY_CACHE",
+    "registry-cache-ttl": "NIFI_REGISTRY_CACHE_TTL",
+    "registry-head-sha": "NIFI_REGISTRY_HEAD_SHA",
+    "flows": "NIFI_FLOWS",
+    "max-workers": "NIFI_MAX_WORKERS",
+    "allow-partial": "NIFI_ALLOW_PARTIAL",
+    "wait": "NIFI_WAIT",
+    "wait-state": "NIFI_WAIT_STATE",
+    "wait-queue": "NIFI_WAIT_QUEUE",
+    "wait-controllers": "NIFI_WAIT_CONTROLLERS",
+    "wait-timeout": "NIFI_WAIT_TIMEOUT",
+    "patterns": "NIFI_GC_PATTERNS",
+    "older-than": "NIFI_GC_OLDER_THAN",
+    "label": "NIFI_GC_LABEL",
+    "context-patterns": "NIFI_GC_CONTEXT_PATTERNS",
+    "registry-client-patterns": "NIFI_GC_REGISTRY_CLIENTS",
+    "dry-run": "NIFI_DRY_RUN",
+    "base-file": "NIFI_DIFF_BASE_FILE",
+    "max-items": ("NIFI_DIFF_MAX_ITEMS", "NIFI_VALIDATE_MAX_ITEMS"),
+    "fail-on": "NIFI_VALIDATE_FAIL_ON",
+    "min-backpressure-objects": "NIFI_VALIDATE_MIN_BACKPRESSURE_OBJECTS",
+    "min-backpressure-size": "NIFI_VALIDATE_MIN_BACKPRESSURE_SIZE",
+    "health-url": "NIFI_HEALTH_URL",
+    "health-expect": "NIFI_HEALTH_EXPECT",
+    "cutover": "NIFI_PROMOTE_CUTOVER",
+    "keep-previous": "NIFI_KEEP_PREVIOUS",
+    "connections": "NIFI_PURGE_CONNECTIONS",
+    "max-duration": "NIFI_PURGE_MAX_DURATION",
+    "load-url": "NIFI_LOAD_URL",
+    "concurrency": "NIFI_LOAD_CONCURRENCY",
+    "rate": "NIFI_LOAD_RATE",
+    "duration": "NIFI_LOAD_DURATION",
+    "method": "NIFI_LOAD_METHOD",
+    "body": "NIFI_LOAD_BODY",
+    "report-file": "NIFI_LOAD_REPORT_FILE",
+    "max-error-rate": "NIFI_LOAD_MAX_ERROR_RATE",
+    "max-p95-ms": "NIFI_LOAD_MAX_P95_MS",
+    "min-rps": "NIFI_LOAD_MIN_RPS",
+}
+
+
+def get_command(name: str) -> Callable[[], dict]:
+    """
+    Resolve an action command name to its implementation.
+
+    Args:
+        name: Action command name, e.g. ``deploy-flow``
+
+    Returns:
+        The callable implementing the command
+
+    Raises:
+        ValueError: Unknown command name
+    """
+    target = COMMANDS.get(name)
+    if not target:
+        raise ValueError(f"Unknown command: {name}. Available: {', '.join(sorted(COMMANDS))}")
+    module_name, func_name = target.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def input_env_vars(input_name: str) -> tuple:
+    """
+    Return the environment variable name(s) an action input is passed as.
+
+    Raises:
+        ValueError: Unknown input name
+    """
+    env = INPUT_ENV.get(input_name)
+    if env is None:
+        raise ValueError(f"Unknown input: {input_name}. Available: {', '.join(sorted(INPUT_ENV))}")
+    return env if isinstance(env, tuple) else (env,)
@@ -0,0 +1,250 @@
+"""
+configure_params - set parameter values, writing only those that changed.
+
+A parameter context update is expensive on the NiFi side: every processor
+and controller service referencing an updated parameter is stopped, disabled,
+revalidated and restarted. ``nipyapi.ci.configure_params`` submits every
+requested parameter on every run, so re-running a pipeline with the same
+values still bounces the flow. This version resolves the group's context and
+the contexts it inherits from once (see ``resolve_params``), diffs the
+requested values against the effective ones and routes each changed parameter
+to the context that owns it: one update per owning context, containing only
+the parameters whose value differs - or no update at all when nothing changed.
+
+Values can also come from a parameters file or stdin (JSON, YAML or dotenv,
+see ``parameter_files``), so hundreds of secrets never pass through an
+environment variable; sensitive values are masked in the job log as they
+are read.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import nipyapi
+from nipyapi.nifi import ParameterContextDTO, ParameterContextEntity
+
+from .outputs import mask_secret
+from .parameter_files import read_parameters
+from .resolve_params import resolve_group_params
+from .utils import parse_list, to_json
+
+log = logging.getLogger(__name__)
+
+
+def diff_parameters(current: Dict[str, dict], requested: Dict[str, str]) -> Dict[str, list]:
+    """
+    Split requested parameter values into changed and unchanged names.
+
+    Sensitive values are never returned by NiFi, so they cannot be compared
+    and are always treated as changed.
+
+    Args:
+        current: Parameter name -> {"value", "sensitive"} from the context
+        requested: Parameter name -> requested string value
+
+    Returns:
+        dict with ``changed`` and ``unchanged`` lists of names, in request order
+    """
+    changed, unchanged = [], []
+    for name, value in requested.items():
+        existing = current.get(name)
+        if existing is not None and not existing["sensitive"] and existing["value"] == value:
+            unchanged.append(name)
+        else:
+            changed.append(name)
+    return {"changed": changed, "unchanged": unchanged}
+
+
+def _submit_update(ctx: ParameterContextEntity, parameters: list) -> None:
+    """Submit one update request for ``parameters`` and wait for it to finish."""
+    handle = nipyapi.nifi.ParameterContextsApi()
+    update_request = handle.submit_parameter_context_update(
+        context_id=ctx.id,
+        body=ParameterContextEntity(
+            id=ctx.id,
+            revision=ctx.revision,
+            component=ParameterContextDTO(id=ctx.id, parameters=parameters),
+        ),
+    )
+    request_id = update_request.request.request_id
+
+    def _update_complete():
+        return handle.get_parameter_context_update(ctx.id, request_id).request.complete
+
+    if not update_request.request.complete:
+        # Same long timeout as nipyapi: referencing components are stopped,
+        # revalidated and restarted before the request completes
+        nipyapi.utils.wait_to_complete(
+            _update_complete,
+            nipyapi_delay=1,
+            nipyapi_max_wait=nipyapi.config.long_max_wait,
+        )
+    handle.delete_update_request(context_id=ctx.id, request_id=request_id)
+
+
+def route_parameters(index: Dict[str, dict], names: List[str], root_id: str) -> Dict[str, list]:
+    """
+    Group parameter names by the context that owns them.
+
+    Names not defined anywhere in the chain are created in the group's own
+    context (``root_id``).
+
+    Returns:
+        dict of context ID -> names, in request order
+    """
+    routes: Dict[str, list] = {}
+    for name in names:
+        owner = index[name]["context_id"] if name in index else root_id
+        routes.setdefault(owner, []).append(name)
+    return routes
+
+
+def configure_params(  # pylint: disable=too-many-locals
+    process_group_id: Optional[str] = None,
+    parameters: Optional[Union[str, Dict[str, Any]]] = None,
+    parameters_file: Optional[str] = None,
+) -> dict:
+    """
+    Configure parameters on a process group's parameter context.
+
+    A parameter inherited from another context is updated in the context
+    that owns it, which also changes it for every other context inheriting
+    from that one.
+
+    A value is sensitive when the file marks it (``{"value": ..., "sensitive":
+    true}`` in JSON or YAML), its name matches NIFI_PARAMETERS_SENSITIVE (glob
+    patterns, YAML list or comma-separated) or the existing parameter is
+    sensitive. Sensitive values are masked with ``::add-mask::`` as they are
+    read (GitHub Actions), and new parameters are created sensitive. An
+    existing parameter keeps its sensitivity; NiFi rejects changing it.
+
+    Args:
+        process_group_id: ID of the process group. Env: NIFI_PROCESS_GROUP_ID
+        parameters: JSON string or dict of parameter name -> value pairs;
+            overrides values from the file. Env: NIFI_PARAMETERS
+        parameters_file: JSON, YAML or dotenv file of parameters, or ``-`` for
+            stdin. Env: NIFI_PARAMETERS_FILE; format from the extension or the
+            content, or NIFI_PARAMETERS_FORMAT
+
+    Returns:
+        dict with parameters_updated and parameters_count (the requested
+        parameters, all at the requested value afterwards), parameters_changed
+        (names actually written, empty when none), parameters_changed_count,
+        parameters_unchanged, context_name,
+        contexts_updated (names of the contexts written), parameters_routed
+        (JSON: context name -> updated parameter names), parameters_masked,
+        update_seconds and update_timings (JSON: context name -> seconds)
+
+    Raises:
+        ValueError: Missing required parameters, invalid JSON or no parameter context
+
+    Example::
+
+        configure_params(pg_id, {"version": "2.0.0"})
+        # first run:  parameters_changed="version", parameters_changed_count="1"
+        # second run: parameters_changed="", parameters_changed_count="0"
+
+        NIFI_PARAMETERS_FILE=- NIFI_PARAMETERS_SENSITIVE="*_password,*_key" \\
+            python -m nipyapi_actions configure-params < prod.env
+    """
+    process_group_id = process_group_id or os.environ.get("NIFI_PROCESS_GROUP_ID")
+    parameters = parameters or os.environ.get("NIFI_PARAMETERS") or None
+    parameters_file = parameters_file or os.environ.get("NIFI_PARAMETERS_FILE") or None
+    file_format = os.environ.get("NIFI_PARAMETERS_FORMAT") or None
+    sensitive_patterns = parse_list(os.environ.get("NIFI_PARAMETERS_SENSITIVE") or None)
+
+    if not process_group_id:
+        raise ValueError("process_group_id is required (or set NIFI_PROCESS_GROUP_ID)")
+    if not parameters and not parameters_file:
+        raise ValueError(
+            "parameters or parameters_file is required (or set NIFI_PARAMETERS "
+            "or NIFI_PARAMETERS_FILE)"
+        )
+
+    # Resolved first, so existing sensitive parameters are masked as they are read
+    pg, contexts, current, _ = resolve_group_params(process_group_id)
+    root_id = pg.component.parameter_context.id
+    ctx_name = contexts[root_id].component.name
+
+    masked = set()
+
+    def mask(name: str, value: str, sensitive: bool) -> None:
+        if sensitive or current.get(name, {}).get("sensitive"):
+            if mask_secret(value):
+                masked.add(name)
+
+    read = read_parameters(
+        parameters_file, parameters, file_format, sensitive_patterns, on_value=mask
+    )
+    if not read:
+        source = "stdin" if parameters_file == "-" else parameters_file
+        raise ValueError(
+            "parameters is required: no parameters were read"
+            + (f" from {source}" if source else "")
+        )
+    requested = {name: entry["value"] for name, entry in read.items()}
+    log.info(
+        "Configuring %d parameter(s) on %s%s",
+        len(requested),
+        process_group_id,
+        f" ({len(masked)} masked)" if masked else "",
+    )
+
+    diff = diff_parameters(current, requested)
+    changed = diff["changed"]
+    if diff["unchanged"]:
+        log.info("Unchanged, skipped: %s", ", ".join(diff["unchanged"]))
+
+    def sensitivity(name: str) -> bool:
+        wanted = read[name]["sensitive"]
+        if name not in current:
+            return bool(wanted)
+        existing = current[name]["sensitive"]
+        if wanted is not None and wanted != existing:
+            log.warning(
+                "'%s' stays %s; NiFi cannot change a parameter's sensitivity",
+                name,
+                "sensitive" if existing else "non-sensitive",
+            )
+        return existing
+
+    routed, timings = {}, {}
+    for context_id, names in route_parameters(current, changed, root_id).items():
+        ctx = contexts[context_id]
+        started = time.monotonic()
+        _submit_update(
+            ctx,
+            [
+                nipyapi.parameters.prepare_parameter(
+                    name=name, value=requested[name], sensitive=sensitivity(name)
+                )
+                for name in names
+            ],
+        )
+        timings[ctx.component.name] = round(time.monotonic() - started, 3)
+        routed[ctx.component.name] = names
+        log.info(
+            "Updated %d parameter(s) in '%s' in one request (%.3fs): %s",
+            len(names),
+            ctx.component.name,
+            timings[ctx.component.name],
+            ", ".join(names),
+        )
+    if not changed:
+        log.info("All parameters already up to date in '%s'; no update submitted", ctx_name)
+
+    return {
+        "parameters_updated": ",".join(requested),
+        "parameters_count": str(len(requested)),
+        "parameters_changed": ",".join(changed),
+        "parameters_changed_count": str(len(changed)),
+        "parameters_unchanged": ",".join(diff["unchanged"]),
+        "context_name": ctx_name,
+        "contexts_updated": ",".join(routed),
+        "parameters_routed": to_json(routed),
+        "parameters_masked": str(len(masked)),
+        "update_seconds": str(round(sum(timings.values()), 3)),
+        "update_timings": to_json(timings),
+    }
@@ -0,0 +1,195 @@
+# pylint: disable=broad-exception-caught
+"""
+deploy_flows - deploy many flows from one Git registry bucket concurrently.
+"""
+
+import fnmatch
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Union
+
+import nipyapi
+
+from .utils import getenv_int, parse_list, resolve_registry_client, to_json
+
+log = logging.getLogger(__name__)
+
+# Canvas grid used to place deployed groups so they do not overlap
+_GRID_COLUMNS = 4
+_GRID_SPACING = (450, 250)
+
+
+def _expand_flows(patterns: List[str], registry_client_id: str, bucket: str, branch) -> List[str]:
+    """Expand glob patterns against the bucket listing; plain names pass through."""
+    if not any(set(p) & set("*?[") for p in patterns):
+        return patterns
+    listing = nipyapi.versioning.list_git_registry_flows(
+        registry_client_id=registry_client_id, bucket_id=bucket, branch=branch
+    )
+    available = sorted(item.versioned_flow.flow_id for item in listing.versioned_flows or [])
+    flows = []
+    for pattern in patterns:
+        matches = fnmatch.filter(available, pattern) if set(pattern) & set("*?[") else [pattern]
+        if not matches:
+            log.warning("No flows in bucket '%s' match '%s'", bucket, pattern)
+        flows.extend(m for m in matches if m not in flows)
+    return flows
+
+
+def deploy_flows(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    flows: Optional[Union[str, List[str]]] = None,
+    registry_client: Optional[str] = None,
+    bucket: Optional[str] = None,
+    parent_id: Optional[str] = None,
+    branch: Optional[str] = None,
+    version: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    allow_partial: Optional[bool] = None,
+    parameter_context_handling: Optional[str] = None,
+) -> dict:
+    """
+    Deploy several flows from a Git registry bucket with a bounded worker pool.
+
+    Each flow is deployed independently: a failing flow is recorded in the
+    results and does not stop the others. All workers share the nipyapi
+    session (and its HTTP connection pool).
+
+    With KEEP_EXISTING parameter context handling (NiFi's default), a flow
+    reuses a context of the same name if one exists and creates it
+    otherwise. Two flows deployed at the same moment can both find it
+    missing and each create one, so the first flow is deployed on its own
+    before the pool starts: contexts it creates (typically the shared ones)
+    exist for every other flow. A context first introduced by two later
+    flows can still be duplicated; deploy one of them first, or use
+    ``max_workers=1``, if that matters.
+
+    Args:
+        flows: Flow names or glob patterns matched against the bucket listing
+            (e.g. ``ingest-*``), as a list, YAML list or comma-separated
+            string. Env: NIFI_FLOWS
+        registry_client: Registry client ID or name. Env: NIFI_REGISTRY_CLIENT_ID
+        bucket: Bucket (folder) containing the flows. Env: NIFI_BUCKET
+        parent_id: Parent Process Group ID. Env: NIFI_PARENT_ID (default: root)
+        branch: Branch to deploy from. Env: NIFI_FLOW_BRANCH
+        version: Version applied to every flow. Env: NIFI_TARGET_VERSION
+        max_workers: Concurrent deployments. Env: NIFI_MAX_WORKERS (default: 4)
+        allow_partial: Succeed even if some flows failed.
+            Env: NIFI_ALLOW_PARTIAL (default: false)
+        parameter_context_handling: KEEP_EXISTING or REPLACE, as for
+            deploy-flow. Env: NIFI_PARAMETER_CONTEXT_HANDLING (default: NiFi's)
+
+    Returns:
+        dict with deployed_count, failed_count, failed_flows and
+        ``deployments``: JSON mapping of flow name to process_group_id,
+        process_group_name, deployed_version and seconds (or error)
+
+    Raises:
+        ValueError: Missing required parameters or no flows matched
+    """
+    flows = parse_list(flows or os.environ.get("NIFI_FLOWS"))
+    bucket = bucket or os.environ.get("NIFI_BUCKET")
+    parent_id = parent_id or os.environ.get("NIFI_PARENT_ID")
+    branch = branch or os.environ.get("NIFI_FLOW_BRANCH") or None
+    version = version or os.environ.get("NIFI_TARGET_VERSION") or None
+    max_workers = max_workers or getenv_int("NIFI_MAX_WORKERS", 4)
+    if allow_partial is None:
+        allow_partial = nipyapi.utils.getenv_bool("NIFI_ALLOW_PARTIAL", default=False)
+    parameter_context_handling = (
+        parameter_context_handling or os.environ.get("NIFI_PARAMETER_CONTEXT_HANDLING") or None
+    )
+
+    if not flows:
+        raise ValueError("flows is required (or set NIFI_FLOWS)")
+    if not bucket:
+        raise ValueError("bucket is required (or set NIFI_BUCKET)")
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    # Resolve shared lookups once rather than per flow
+    client = resolve_registry_client(
+        registry_client or os.environ.get("NIFI_REGISTRY_CLIENT_ID")
+    )
+    if not parent_id:
+        parent_id = nipyapi.canvas.get_root_pg_id()
+    flows = _expand_flows(flows, client.id, bucket, branch)
+    if not flows:
+        raise ValueError(f"No flows matched in bucket '{bucket}'")
+
+    origin_x = getenv_int("NIFI_LOCATION_X", 0)
+    origin_y = getenv_int("NIFI_LOCATION_Y", 0)
+
+    def _deploy(index, flow):
+        location = (
+            origin_x + (index % _GRID_COLUMNS) * _GRID_SPACING[0],
+            origin_y + (index // _GRID_COLUMNS) * _GRID_SPACING[1],
+        )
+        started = time.monotonic()
+        try:
+            pg = nipyapi.versioning.deploy_git_registry_flow(
+                registry_client_id=client.id,
+                bucket_id=bucket,
+                flow_id=flow,
+                parent_id=parent_id,
+                location=location,
+                version=version,
+                branch=branch,
+                parameter_context_handling=parameter_context_handling,
+            )
+            vci = pg.component.version_control_information
+            entry = {
+                "process_group_id": pg.id,
+                "process_group_name": pg.component.name,
+                "deployed_version": vci.version if vci else "unknown",
+            }
+        except Exception as e:
+            log.error("Failed to deploy '%s': %s", flow, e)
+            entry = {"error": str(e), "error_type": type(e).__name__}
+        entry["seconds"] = round(time.monotonic() - started, 3)
+        return flow, entry
+
+    log.info(
+        "Deploying %d flow(s) from bucket '%s' with %d worker(s)",
+        len(flows),
+        bucket,
+        max_workers,
+    )
+    started = time.monotonic()
+    deployments = {}
+
+    def _record(flow, entry):
+        deployments[flow] = entry
+        log.info(
+            "%s: %s (%.3fs)",
+            flow,
+            entry.get("process_group_id", "FAILED"),
+            entry["seconds"],
+        )
+
+    pending = list(enumerate(flows))
+    keep_existing = (parameter_context_handling or "KEEP_EXISTING").upper() == "KEEP_EXISTING"
+    if keep_existing and max_workers > 1 and len(flows) > 1:
+        # Creates the contexts later flows look up by name before they run concurrently
+        _record(*_deploy(*pending.pop(0)))
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+        futures = [pool.submit(_deploy, i, flow) for i, flow in pending]
+        for future in as_completed(futures):
+            _record(*future.result())
+
+    failed = sorted(flow for flow, entry in deployments.items() if "error" in entry)
+    result = {
+        "registry_client_id": client.id,
+        "bucket": bucket,
+        "flow_count": str(len(flows)),
+        "deployed_count": str(len(flows) - len(failed)),
+        "failed_count": str(len(failed)),
+        "failed_flows": ",".join(failed),
+        "deployments": to_json(deployments),
+        "total_seconds": str(round(time.monotonic() - started, 3)),
+    }
+    if failed and not allow_partial:
+        result["error"] = (
+            f"{len(failed)} of {len(flows)} flow(s) failed to deploy: {', '.join(failed)}"
+        )
+    return result
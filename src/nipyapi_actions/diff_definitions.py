@@ -0,0 +1,281 @@
+"""
+diff_definitions - structural diff of two flow definition files, offline.
+
+``get-diff`` compares a deployed group with its registry version and needs
+NiFi. This compares two exported definitions (``export-flow-definition``
+output or files from a Git flow registry) on disk, for PR review. Each file
+is indexed once by component ``identifier`` across all nested groups, so the
+diff is a set comparison of two dicts plus a field comparison per shared
+component - linear in the size of the flows.
+
+Layout-only fields (positions, bends, label/z index) and per-instance IDs are
+ignored, as are ``propertyDescriptors``, which follow from the bundle
+version that is compared instead.
+"""
+
+import json
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+import yaml
+
+from .utils import getenv_int, to_json
+
+log = logging.getLogger(__name__)
+
+# flowContents list key -> component kind reported in the diff
+COMPONENT_KINDS = {
+    "processors": "processor",
+    "connections": "connection",
+    "controllerServices": "controller_service",
+    "inputPorts": "input_port",
+    "outputPorts": "output_port",
+    "funnels": "funnel",
+    "labels": "label",
+    "remoteProcessGroups": "remote_process_group",
+    "processGroups": "process_group",
+}
+
+# Fields that change without any functional difference
+_IGNORED_FIELDS = frozenset(
+    ("position", "bends", "labelIndex", "zIndex", "instanceIdentifier", "propertyDescriptors")
+)
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# (kind, identifier) -> (name, group path, comparable fields)
+Index = Dict[Tuple[str, str], Tuple[str, str, dict]]
+
+
+def load_definition(path: str) -> dict:
+    """
+    Load a JSON or YAML flow definition file.
+
+    Raises:
+        ValueError: Missing file or not a flow definition
+    """
+    if not os.path.exists(path):
+        raise ValueError(f"Flow definition file not found: {path}")
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    try:
+        definition = json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            definition = yaml.load(text, Loader=_YAML_LOADER)  # nosec B506 - safe loader
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid flow definition {path}: {e}") from e
+    if not isinstance(definition, dict) or not isinstance(definition.get("flowContents"), dict):
+        raise ValueError(f"{path} is not a flow definition (no flowContents)")
+    return definition
+
+
+# Mappings of user-chosen keys, never stripped of ignored field names
+_OPAQUE_FIELDS = frozenset(("properties", "variables"))
+
+
+def _strip_ignored(value):
+    """Drop ignored fields at every depth, e.g. a connection's ``source.instanceIdentifier``."""
+    if isinstance(value, dict):
+        return {
+            key: item if key in _OPAQUE_FIELDS else _strip_ignored(item)
+            for key, item in value.items()
+            if key not in _IGNORED_FIELDS
+        }
+    if isinstance(value, list):
+        return [_strip_ignored(item) for item in value]
+    return value
+
+
+def _comparable(component: dict) -> dict:
+    """Component fields that matter for the diff (child lists and ignored fields excluded)."""
+    return _strip_ignored(
+        {key: value for key, value in component.items() if key not in COMPONENT_KINDS}
+    )
+
+
+def _display_name(kind: str, component: dict) -> str:
+    name = component.get("name") or ""
+    if kind == "connection" and not name:
+        source = (component.get("source") or {}).get("name", "?")
+        destination = (component.get("destination") or {}).get("name", "?")
+        name = f"{source} -> {destination}"
+    return name
+
+
+def index_definition(definition: dict) -> Index:
+    """
+    Index every component of a definition by kind and identifier.
+
+    Covers all nested process groups (iteratively, so deep nesting cannot hit
+    the recursion limit), external controller services, parameter contexts
+    and their parameters (identified as ``context/parameter``).
+    """
+    index: Index = {}
+    root = definition["flowContents"]
+    index[("process_group", root.get("identifier", "root"))] = (
+        root.get("name", ""),
+        "",
+        _comparable(root),
+    )
+    stack = [(root, root.get("name", ""))]
+    while stack:
+        group, path = stack.pop()
+        for list_key, kind in COMPONENT_KINDS.items():
+            for component in group.get(list_key) or []:
+                identifier = component.get("identifier") or component.get("name")
+                index[(kind, identifier)] = (
+                    _display_name(kind, component),
+                    path,
+                    _comparable(component),
+                )
+                if kind == "process_group":
+                    stack.append((component, f"{path}/{component.get('name', '')}"))
+
+    for identifier, service in (definition.get("externalControllerServices") or {}).items():
+        index[("external_controller_service", identifier)] = (
+            service.get("name", ""),
+            "",
+            _comparable(service),
+        )
+
+    for ctx_name, ctx in (definition.get("parameterContexts") or {}).items():
+        fields = {k: v for k, v in ctx.items() if k != "parameters"}
+        index[("parameter_context", ctx_name)] = (ctx_name, "", fields)
+        for param in ctx.get("parameters") or []:
+            fields = dict(param)
+            if fields.get("sensitive"):
+                # Exports never contain sensitive values
+                fields.pop("value", None)
+            index[("parameter", f"{ctx_name}/{param.get('name')}")] = (
+                param.get("name", ""),
+                ctx_name,
+                fields,
+            )
+    return index
+
+
+def _changed_fields(old: dict, new: dict) -> list:
+    """Names of differing fields; mapping fields are reported per key (``properties.X``)."""
+    changed = []
+    for key in sorted(old.keys() | new.keys()):
+        old_value, new_value = old.get(key), new.get(key)
+        if old_value == new_value:
+            continue
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            changed.extend(
+                f"{key}.{sub}"
+                for sub in sorted(old_value.keys() | new_value.keys())
+                if old_value.get(sub) != new_value.get(sub)
+            )
+        else:
+            changed.append(key)
+    return changed
+
+
+def compare_indexes(base: Index, target: Index) -> list:
+    """
+    Diff two component indexes.
+
+    Returns:
+        list of {change, kind, id, name, group[, fields]} sorted by kind,
+        group and name; ``change`` is ``added``, ``removed`` or ``changed``
+    """
+    differences = []
+    for key in target.keys() - base.keys():
+        name, group, _ = target[key]
+        differences.append(
+            {"change": "added", "kind": key[0], "id": key[1], "name": name, "group": group}
+        )
+    for key in base.keys() - target.keys():
+        name, group, _ = base[key]
+        differences.append(
+            {"change": "removed", "kind": key[0], "id": key[1], "name": name, "group": group}
+        )
+    for key in base.keys() & target.keys():
+        _, _, old = base[key]
+        name, group, new = target[key]
+        if old == new:
+            continue
+        differences.append(
+            {
+                "change": "changed",
+                "kind": key[0],
+                "id": key[1],
+                "name": name,
+                "group": group,
+                "fields": _changed_fields(old, new),
+            }
+        )
+    differences.sort(key=lambda d: (d["kind"], d["group"], d["name"], d["change"], d["id"]))
+    return differences
+
+
+def diff_definitions(
+    base_file: Optional[str] = None,
+    file_path: Optional[str] = None,
+    max_items: Optional[int] = None,
+) -> dict:
+    """
+    Compare two flow definition files without NiFi.
+
+    Args:
+        base_file: Definition to compare against (e.g. the target branch).
+            Env: NIFI_DIFF_BASE_FILE
+        file_path: Changed definition (e.g. the PR branch). Env: NIFI_FLOW_FILE_PATH
+        max_items: Most differences listed in ``differences``; counts in
+            ``summary`` are always complete. Env: NIFI_DIFF_MAX_ITEMS (default: 200)
+
+    Returns:
+        dict with identical ("true"/"false"), change_count, summary (JSON:
+        kind -> added/removed/changed counts), differences (JSON list) and
+        truncated ("true"/"false")
+
+    Raises:
+        ValueError: Missing or invalid files
+
+    Example::
+
+        diff_definitions("main/flow.json", "flow.json")
+        # {"identical": "false", "change_count": "1",
+        #  "summary": '{"processor": {"added": 0, "changed": 1, "removed": 0}}',
+        #  "differences": '[{"change": "changed", "fields": ["properties.Listening Port"],
+        #                    "kind": "processor", "name": "HandleHTTPRequest", ...}]'}
+    """
+    base_file = base_file or os.environ.get("NIFI_DIFF_BASE_FILE")
+    file_path = file_path or os.environ.get("NIFI_FLOW_FILE_PATH")
+    if max_items is None:
+        max_items = getenv_int("NIFI_DIFF_MAX_ITEMS", 200)
+
+    if not base_file:
+        raise ValueError("base_file is required (or set NIFI_DIFF_BASE_FILE)")
+    if not file_path:
+        raise ValueError("file_path is required (or set NIFI_FLOW_FILE_PATH)")
+    if max_items < 0:
+        raise ValueError(f"max_items must be zero or more, got {max_items}")
+
+    base = index_definition(load_definition(base_file))
+    target = index_definition(load_definition(file_path))
+    differences = compare_indexes(base, target)
+
+    summary = {}
+    for diff in differences:
+        counts = summary.setdefault(diff["kind"], {"added": 0, "removed": 0, "changed": 0})
+        counts[diff["change"]] += 1
+
+    log.info(
+        "Compared %d and %d components: %d difference(s)",
+        len(base),
+        len(target),
+        len(differences),
+    )
+    return {
+        "base_file": base_file,
+        "file_path": file_path,
+        "identical": "false" if differences else "true",
+        "change_count": str(len(differences)),
+        "summary": to_json(summary),
+        "differences": to_json(differences[:max_items]),
+        "truncated": "true" if len(differences) > max_items else "false",
+    }
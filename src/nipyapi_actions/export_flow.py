@@ -0,0 +1,246 @@
+"""
+export_flow - export-flow-definition streamed to disk, optionally compressed.
+
+``nipyapi.ci.export_flow_definition`` holds the whole definition in memory
+as a string (twice over for YAML) before writing it. Flows with many nested
+groups and referenced controller services run to hundreds of MB, enough to
+get a small CI runner OOM-killed. Here the NiFi response is copied to the
+file in fixed-size chunks, through gzip or zstd when requested, so memory
+stays bounded for JSON exports whatever the flow size.
+"""
+
+import contextlib
+import gzip
+import io
+import json
+import logging
+import os
+import tempfile
+from typing import BinaryIO, Optional
+
+import nipyapi
+import yaml
+
+log = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("json", "yaml")
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+# File suffix -> compression, used when compression is not given explicitly
+_SUFFIXES = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _resolve_compression(compression: Optional[str], file_path: str) -> str:
+    """Explicit compression wins, otherwise infer it from the file suffix."""
+    if compression:
+        compression = compression.lower()
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"compression must be one of {', '.join(COMPRESSIONS)}, got: {compression}"
+            )
+        return compression
+    return _SUFFIXES.get(os.path.splitext(file_path)[1].lower(), "none")
+
+
+# Leading bytes of each compressed format, checked before the suffix when reading
+_MAGIC = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+
+
+def _zstd():
+    """The zstd module: compression.zstd on Python 3.14+, else zstandard."""
+    try:
+        from compression import zstd  # pylint: disable=import-outside-toplevel
+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        raise ValueError(
+            "zstd compression requires Python 3.14+ or the zstandard package "
+            "(pip install zstandard)"
+        ) from e
+    return zstandard
+
+
+def _open_output(path: str, compression: str) -> BinaryIO:
+    """Open ``path`` for binary writing through the requested compressor."""
+    if compression == "gzip":
+        # mtime=0 keeps the output identical for an identical flow
+        return gzip.GzipFile(path, "wb", compresslevel=6, mtime=0)
+    if compression == "zstd":
+        return _zstd().open(path, "wb")
+    return open(path, "wb")  # pylint: disable=consider-using-with
+
+
+def _detect_compression(path: str) -> str:
+    """Compression of an existing file, from its leading bytes, else its suffix."""
+    with open(path, "rb") as f:
+        head = f.read(4)
+    for magic, compression in _MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return _resolve_compression(None, path)
+
+
+def _open_input(path: str) -> BinaryIO:
+    """Open ``path`` for binary reading, decompressing gzip or zstd content."""
+    compression = _detect_compression(path)
+    if compression == "gzip":
+        return gzip.GzipFile(path, "rb")
+    if compression == "zstd":
+        return _zstd().open(path, "rb")
+    return open(path, "rb")  # pylint: disable=consider-using-with
+
+
+def _stream_export(process_group_id: str, include_referenced_services: bool, out: BinaryIO):
+    """Copy the export response body to ``out`` chunk by chunk."""
+    with nipyapi.utils.rest_exceptions():
+        response = nipyapi.nifi.ProcessGroupsApi().export_process_group(
+            process_group_id,
+            include_referenced_services=include_referenced_services,
+            _preload_content=False,
+        )
+    try:
+        for chunk in response.stream(_CHUNK_SIZE, decode_content=True):
+            out.write(chunk)
+    finally:
+        response.release_conn()
+
+
+def export_flow_definition(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    process_group_id: Optional[str] = None,
+    file_path: Optional[str] = None,
+    mode: Optional[str] = None,
+    include_referenced_services: Optional[bool] = None,
+    compression: Optional[str] = None,
+) -> dict:
+    """
+    Export a process group as a flow definition file, streamed to disk.
+
+    JSON is written as received from NiFi without being held in memory.
+    YAML has to be converted from the parsed definition, so the download is
+    spooled to a temporary file and the YAML is written straight to the
+    output; memory then scales with the flow but holds a single copy.
+
+    The file is written next to its destination and renamed into place, so
+    a failed export never leaves a truncated file at ``file_path``. Without
+    a file path the definition is returned in the result as before.
+
+    Args:
+        process_group_id: ID of the process group. Env: NIFI_PROCESS_GROUP_ID
+        file_path: Destination file. Env: NIFI_FLOW_FILE_PATH or NIFI_EXPORT_FILE_PATH
+        mode: ``json`` or ``yaml``. Env: NIFI_FLOW_FORMAT or NIFI_EXPORT_MODE
+            (default: json)
+        include_referenced_services: Include controller services from outside
+            the group referenced by components within.
+            Env: NIFI_INCLUDE_REFERENCED_SERVICES (default: false)
+        compression: ``none``, ``gzip`` or ``zstd``. Env: NIFI_EXPORT_COMPRESSION
+            (default: from the file suffix - ``.gz`` or ``.zst`` - else none)
+
+    Returns:
+        dict with process_group_id, process_group_name, file_path, format,
+        compression and bytes_written (size of the file on disk), or
+        flow_definition when no file path is given
+
+    Raises:
+        ValueError: Missing process group, unknown format or compression, or
+            zstd requested without a zstd implementation
+
+    Example::
+
+        export_flow_definition(pg_id, "flow.json.gz")
+        # {"file_path": "flow.json.gz", "format": "json", "compression": "gzip",
+        #  "bytes_written": "48213", ...}
+    """
+    process_group_id = process_group_id or os.environ.get("NIFI_PROCESS_GROUP_ID")
+    file_path = (
+        file_path
+        or os.environ.get("NIFI_FLOW_FILE_PATH")
+        or os.environ.get("NIFI_EXPORT_FILE_PATH")
+    )
+    mode = (
+        mode or os.environ.get("NIFI_FLOW_FORMAT") or os.environ.get("NIFI_EXPORT_MODE") or "json"
+    ).lower()
+    compression = compression or os.environ.get("NIFI_EXPORT_COMPRESSION")
+    if include_referenced_services is None:
+        include_referenced_services = nipyapi.utils.getenv_bool(
+            "NIFI_INCLUDE_REFERENCED_SERVICES", False
+        )
+
+    if not process_group_id:
+        raise ValueError("process_group_id is required (or set NIFI_PROCESS_GROUP_ID)")
+    if mode not in EXPORT_FORMATS:
+        raise ValueError(f"mode must be 'json' or 'yaml', got: {mode}")
+    if file_path:
+        compression = _resolve_compression(compression, file_path)
+    elif compression and compression.lower() != "none":
+        raise ValueError("compression requires file_path (or set NIFI_FLOW_FILE_PATH)")
+
+    pg = nipyapi.canvas.get_process_group(process_group_id, "id")
+    if not pg:
+        raise ValueError(f"Process group not found: {process_group_id}")
+    pg_name = pg.component.name
+
+    if not file_path:
+        flow_def = nipyapi.versioning.export_process_group_definition(
+            process_group=pg,
+            file_path=None,
+            mode=mode,
+            include_referenced_services=include_referenced_services,
+        )
+        log.info("Exported flow definition (%d bytes)", len(flow_def))
+        return {
+            "process_group_id": process_group_id,
+            "process_group_name": pg_name,
+            "file_path": "stdout",
+            "format": mode,
+            "flow_definition": flow_def,
+        }
+
+    log.info(
+        "Exporting %s (%s) to %s as %s%s",
+        pg_name,
+        process_group_id,
+        file_path,
+        mode,
+        "" if compression == "none" else f" ({compression})",
+    )
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    partial = f"{file_path}.part"
+    try:
+        with contextlib.ExitStack() as stack:
+            out = stack.enter_context(_open_output(partial, compression))
+            if mode == "json":
+                _stream_export(process_group_id, include_referenced_services, out)
+            else:
+                spool = stack.enter_context(tempfile.TemporaryFile(dir=directory))
+                _stream_export(process_group_id, include_referenced_services, spool)
+                spool.seek(0)
+                definition = json.load(io.TextIOWrapper(spool, encoding="utf-8"))
+                text = stack.enter_context(io.TextIOWrapper(out, encoding="utf-8"))
+                # Same layout as nipyapi.utils.dump(mode="yaml")
+                yaml.safe_dump(
+                    definition, text, default_flow_style=False, sort_keys=True, indent=4
+                )
+        os.replace(partial, file_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(partial)
+        raise
+
+    bytes_written = os.path.getsize(file_path)
+    log.info("Exported flow definition to %s (%d bytes)", file_path, bytes_written)
+    return {
+        "process_group_id": process_group_id,
+        "process_group_name": pg_name,
+        "file_path": file_path,
+        "format": mode,
+        "compression": compression,
+        "bytes_written": str(bytes_written),
+    }
@@ -0,0 +1,371 @@
+# pylint: disable=broad-exception-caught
+"""
+garbage_collect - remove stale process groups and what they leave behind.
+
+Shared test NiFi instances accumulate groups from failed or abandoned CI runs.
+Groups directly under a parent are selected by name pattern, age and/or a
+label in their comments, then torn down in dependency order:
+
+1. process groups (stopped, controller services disabled, deleted) with a
+   bounded worker pool, since independent groups do not affect each other
+2. parameter contexts left unbound by those deletions, and contexts they
+   alone inherited, deleted inheritors first (opt-in)
+3. registry clients matching a pattern, unless a surviving versioned group
+   still uses them
+"""
+
+import fnmatch
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Union
+
+import nipyapi
+
+from .utils import getenv_float, getenv_int, parse_duration, parse_list, to_json
+from .wait_for_state import wait_for_state
+
+log = logging.getLogger(__name__)
+
+# NiFi history timestamps, e.g. "10/17/2026 09:30:00 UTC" (millis on some versions)
+_HISTORY_TIME_FORMATS = ("%m/%d/%Y %H:%M:%S %Z", "%m/%d/%Y %H:%M:%S.%f %Z")
+
+
+def _matches(name: str, patterns: List[str]) -> bool:
+    return any(fnmatch.fnmatchcase(name or "", pattern) for pattern in patterns)
+
+
+def _created_at(process_group_id: str) -> Optional[float]:
+    """Return when a group was created, from the flow history, or None if unknown."""
+    history = nipyapi.nifi.FlowApi().query_history(
+        "0", "1", source_id=process_group_id, sort_column="timestamp", sort_order="asc"
+    )
+    actions = history.history.actions if history and history.history else None
+    if not actions:
+        return None
+    for fmt in _HISTORY_TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(actions[0].timestamp, fmt)
+        except (TypeError, ValueError):
+            continue
+        return parsed.replace(tzinfo=timezone.utc).timestamp()
+    log.debug("Unrecognised history timestamp: %s", actions[0].timestamp)
+    return None
+
+
+def _subtree_ids(process_group_id: str) -> Set[str]:
+    """Return the IDs of a group and all groups nested in it."""
+    flow = nipyapi.canvas.recurse_flow(process_group_id)
+    ids = {process_group_id}
+    pending = list(flow.process_group_flow.flow.process_groups or [])
+    while pending:
+        child = pending.pop()
+        ids.add(child.id)
+        extended = getattr(child, "nipyapi_extended", None)
+        if extended:
+            pending.extend(extended.process_group_flow.flow.process_groups or [])
+    return ids
+
+
+def _registry_ids_in_use(doomed_groups: Set[str]) -> Set[str]:
+    """Return the registry client IDs used by versioned groups outside doomed_groups."""
+    in_use = set()
+    pending = [nipyapi.canvas.get_root_pg_id()]
+    while pending:
+        flow = nipyapi.canvas.get_flow(pending.pop())
+        for child in flow.process_group_flow.flow.process_groups or []:
+            if child.id in doomed_groups:
+                continue
+            vci = child.component.version_control_information
+            if vci and vci.registry_id:
+                in_use.add(vci.registry_id)
+            pending.append(child.id)
+    return in_use
+
+
+def _plan_contexts(contexts, doomed_groups: Set[str], patterns: List[str]) -> List:
+    """
+    Select the parameter contexts that become unused once doomed_groups are gone.
+
+    A context is collected if every group bound to it is doomed, or if it is
+    unbound and matches a pattern; then, repeatedly, any unbound context only
+    inherited by collected contexts. Returned in deletion order: a context is
+    listed before every context it inherits from.
+    """
+    by_id = {c.id: c for c in contexts}
+    bound = {c.id: {g.id for g in c.component.bound_process_groups or []} for c in contexts}
+    inherits = {
+        c.id: [ref.id for ref in c.component.inherited_parameter_contexts or []]
+        for c in contexts
+    }
+
+    selected = set()
+    for ctx in contexts:
+        groups = bound[ctx.id]
+        if groups and groups <= doomed_groups:
+            selected.add(ctx.id)
+        elif not groups and patterns and _matches(ctx.component.name, patterns):
+            selected.add(ctx.id)
+
+    changed = True
+    while changed:
+        changed = False
+        for ctx_id in list(by_id):
+            if ctx_id in selected or bound[ctx_id]:
+                continue
+            inheritors = {c for c, parents in inherits.items() if ctx_id in parents}
+            if inheritors and inheritors <= selected:
+                selected.add(ctx_id)
+                changed = True
+
+    # Keep anything still inherited by a context that survives
+    changed = True
+    while changed:
+        changed = False
+        for ctx_id in list(selected):
+            if any(ctx_id in inherits[c] for c in by_id if c not in selected):
+                selected.discard(ctx_id)
+                changed = True
+
+    ordered = []
+    remaining = set(selected)
+    while remaining:
+        ready = [
+            c for c in sorted(remaining, key=lambda i: by_id[i].component.name)
+            if not any(c in inherits[other] for other in remaining if other != c)
+        ]
+        if not ready:  # inheritance cycle; NiFi would reject it, delete in name order
+            ready = sorted(remaining, key=lambda i: by_id[i].component.name)
+        ordered.extend(by_id[c] for c in ready)
+        remaining -= set(ready)
+    return ordered
+
+
+def garbage_collect(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals,too-many-branches,too-many-statements
+    patterns: Optional[Union[str, List[str]]] = None,
+    older_than: Optional[str] = None,
+    label: Optional[str] = None,
+    parent_id: Optional[str] = None,
+    context_patterns: Optional[Union[str, List[str]]] = None,
+    registry_client_patterns: Optional[Union[str, List[str]]] = None,
+    delete_parameter_contexts: Optional[bool] = None,
+    max_workers: Optional[int] = None,
+    dry_run: Optional[bool] = None,
+) -> dict:
+    """
+    Delete stale process groups and the resources only they used.
+
+    Only groups directly under the parent are candidates. All given selectors
+    must match. Failures are isolated: a group that cannot be deleted is
+    reported and its parameter contexts are kept.
+
+    Args:
+        patterns: Glob patterns on the group name, e.g. ``ci-*``, as a list,
+            YAML list or comma-separated string. Env: NIFI_GC_PATTERNS
+        older_than: Minimum age, e.g. ``2h`` or ``7d``, from the group's
+            creation in the flow history (groups without history are kept).
+            Env: NIFI_GC_OLDER_THAN
+        label: Text that must appear in the group's comments.
+            Env: NIFI_GC_LABEL
+        parent_id: Parent Process Group ID. Env: NIFI_PARENT_ID (default: root)
+        context_patterns: Also delete unbound parameter contexts whose names
+            match these patterns, e.g. leftovers of earlier runs.
+            Env: NIFI_GC_CONTEXT_PATTERNS
+        registry_client_patterns: Delete registry clients whose names match
+            these patterns, last; clients still used by a versioned group that
+            survives are skipped. Env: NIFI_GC_REGISTRY_CLIENTS
+        delete_parameter_contexts: Delete parameter contexts left unused, and
+            those matching context_patterns.
+            Env: NIFI_DELETE_PARAMETER_CONTEXT (default: false)
+        max_workers: Groups torn down concurrently. Env: NIFI_MAX_WORKERS (default: 4)
+        dry_run: Only report what would be deleted. Env: NIFI_DRY_RUN (default: false)
+
+    Returns:
+        dict with dry_run, selected_count, deleted_count, failed_count,
+        ``process_groups`` (JSON mapping of ID to name, age_seconds and
+        status), deleted_parameter_contexts, deleted_registry_clients,
+        skipped_registry_clients, ``failures`` (JSON) and total_seconds; includes ``error`` if
+        anything failed
+
+    Raises:
+        ValueError: No selector given, or an invalid value
+
+    Example::
+
+        # Preview, then remove CI groups older than a day
+        NIFI_GC_PATTERNS='ci-*' NIFI_GC_OLDER_THAN=1d NIFI_DRY_RUN=true \\
+            python -m nipyapi_actions garbage-collect
+    """
+    patterns = parse_list(patterns or os.environ.get("NIFI_GC_PATTERNS"))
+    older_than = older_than or os.environ.get("NIFI_GC_OLDER_THAN") or None
+    label = label or os.environ.get("NIFI_GC_LABEL") or None
+    parent_id = parent_id or os.environ.get("NIFI_PARENT_ID") or None
+    context_patterns = parse_list(
+        context_patterns or os.environ.get("NIFI_GC_CONTEXT_PATTERNS")
+    )
+    registry_client_patterns = parse_list(
+        registry_client_patterns or os.environ.get("NIFI_GC_REGISTRY_CLIENTS")
+    )
+    if delete_parameter_contexts is None:
+        delete_parameter_contexts = nipyapi.utils.getenv_bool(
+            "NIFI_DELETE_PARAMETER_CONTEXT", default=False
+        )
+    max_workers = max_workers or getenv_int("NIFI_MAX_WORKERS", 4)
+    if dry_run is None:
+        dry_run = nipyapi.utils.getenv_bool("NIFI_DRY_RUN", default=False)
+    wait_timeout = getenv_float("NIFI_WAIT_TIMEOUT", 120.0)
+
+    if not (patterns or older_than or label):
+        raise ValueError(
+            "At least one selector is required: patterns, older_than or label "
+            "(or set NIFI_GC_PATTERNS / NIFI_GC_OLDER_THAN / NIFI_GC_LABEL)"
+        )
+    min_age = parse_duration(older_than) if older_than else None
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    started = time.monotonic()
+    parent_id = parent_id or nipyapi.canvas.get_root_pg_id()
+    candidates = nipyapi.nifi.ProcessGroupsApi().get_process_groups(parent_id).process_groups
+    selected = [
+        pg
+        for pg in candidates or []
+        if (not patterns or _matches(pg.component.name, patterns))
+        and (not label or label in (pg.component.comments or ""))
+    ]
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        ages = {}
+        if min_age is not None and selected:
+            now = time.time()
+            created = dict(zip(
+                [pg.id for pg in selected], pool.map(lambda pg: _created_at(pg.id), selected)
+            ))
+            for pg in selected:
+                ages[pg.id] = None if created[pg.id] is None else round(now - created[pg.id])
+            selected = [pg for pg in selected if ages[pg.id] is not None and ages[pg.id] >= min_age]
+
+        log.info(
+            "%d of %d group(s) under %s selected%s",
+            len(selected),
+            len(candidates or []),
+            parent_id,
+            " (dry run)" if dry_run else "",
+        )
+
+        # Plan contexts from the full subtree of each group, so dry runs are accurate
+        subtrees: Dict[str, Set[str]] = {}
+        all_contexts, contexts = [], []
+        if delete_parameter_contexts and (selected or context_patterns):
+            subtrees = dict(zip(
+                [pg.id for pg in selected], pool.map(lambda pg: _subtree_ids(pg.id), selected)
+            ))
+            all_contexts = nipyapi.parameters.list_all_parameter_contexts() or []
+            contexts = _plan_contexts(
+                all_contexts, set().union(*subtrees.values()), context_patterns
+            )
+        clients = []
+        if registry_client_patterns:
+            listing = nipyapi.versioning.list_registry_clients()
+            clients = [
+                c for c in listing.registries or []
+                if _matches(c.component.name, registry_client_patterns)
+            ]
+
+        groups: Dict[str, dict] = {
+            pg.id: {
+                "name": pg.component.name,
+                "age_seconds": ages.get(pg.id),
+                "status": "would_delete" if dry_run else "pending",
+            }
+            for pg in selected
+        }
+        failures: Dict[str, str] = {}
+        deleted_contexts: List[str] = []
+        deleted_clients: List[str] = []
+        skipped_clients: List[str] = []
+
+        def _teardown(pg):
+            try:
+                nipyapi.canvas.schedule_process_group(pg.id, scheduled=False)
+                try:
+                    nipyapi.canvas.schedule_all_controllers(pg.id, scheduled=False)
+                except Exception as e:
+                    log.warning("%s: could not disable controllers: %s", pg.component.name, e)
+                settled = wait_for_state(
+                    pg.id, state="STOPPED", controllers="DISABLED", timeout=wait_timeout
+                )
+                if "error" in settled:
+                    log.warning("%s: %s; forcing deletion", pg.component.name, settled["error"])
+                nipyapi.canvas.delete_process_group(pg, force=True)
+                return pg.id, None
+            except Exception as e:
+                return pg.id, str(e)
+
+        if not dry_run:
+            for pg_id, error in pool.map(_teardown, selected):
+                groups[pg_id]["status"] = "failed" if error else "deleted"
+                if error:
+                    failures[groups[pg_id]["name"]] = error
+                    log.error("Failed to delete %s: %s", groups[pg_id]["name"], error)
+
+        # A group that failed to delete keeps its contexts (and their parents)
+        if failures and contexts:
+            gone = [subtrees[pg_id] for pg_id, g in groups.items() if g["status"] == "deleted"]
+            contexts = _plan_contexts(all_contexts, set().union(*gone), context_patterns)
+
+        for ctx in contexts:
+            if dry_run:
+                deleted_contexts.append(ctx.component.name)
+                continue
+            try:
+                nipyapi.parameters.delete_parameter_context(ctx, refresh=True)
+                deleted_contexts.append(ctx.component.name)
+            except Exception as e:
+                failures[f"parameter-context:{ctx.component.name}"] = str(e)
+                log.error("Failed to delete parameter context %s: %s", ctx.component.name, e)
+
+        if clients:
+            doomed = {
+                pg_id for pg_id, g in groups.items() if g["status"] in ("deleted", "would_delete")
+            }
+            in_use = _registry_ids_in_use(doomed)
+            for client in [c for c in clients if c.id in in_use]:
+                log.info("Keeping registry client %s: still in use", client.component.name)
+                skipped_clients.append(client.component.name)
+            clients = [c for c in clients if c.id not in in_use]
+
+        for client in clients:
+            if dry_run:
+                deleted_clients.append(client.component.name)
+                continue
+            try:
+                nipyapi.versioning.delete_registry_client(client, refresh=True)
+                deleted_clients.append(client.component.name)
+            except Exception as e:
+                failures[f"registry-client:{client.component.name}"] = str(e)
+                log.error("Failed to delete registry client %s: %s", client.component.name, e)
+    finally:
+        pool.shutdown(wait=True)
+
+    deleted = sum(1 for g in groups.values() if g["status"] == "deleted")
+    result = {
+        "dry_run": str(dry_run).lower(),
+        "selected_count": str(len(selected)),
+        "deleted_count": str(deleted),
+        "failed_count": str(len(failures)),
+        "process_groups": to_json(groups),
+        "deleted_parameter_contexts": ",".join(deleted_contexts),
+        "deleted_registry_clients": ",".join(deleted_clients),
+        "skipped_registry_clients": ",".join(skipped_clients),
+        "failures": to_json(failures),
+        "total_seconds": str(round(time.monotonic() - started, 3)),
+    }
+    if failures:
+        result["error"] = f"{len(failures)} resource(s) could not be deleted: " + ", ".join(
+            sorted(failures)
+        )
+    return result
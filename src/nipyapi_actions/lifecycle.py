@@ -0,0 +1,209 @@
+"""
+lifecycle - start-flow, stop-flow and cleanup with an optional wait.
+
+Scheduling in NiFi is asynchronous: the nipyapi CI functions return as soon
+as the request is accepted, before processors have actually started or their
+threads have finished. With ``wait`` enabled (NIFI_WAIT), these wrappers poll
+``wait_for_state`` until the group has settled, so later steps neither race
+the flow nor need fixed sleeps.
+
+``stop-flow`` with ``drain`` stops only the source processors first and lets
+the rest of the flow work off what is queued before stopping it, so a
+redeploy neither loses data (as a purge would) nor leaves it stranded in
+the old version's queues.
+"""
+
+import logging
+import os
+from typing import Optional
+
+import nipyapi
+from nipyapi import ci
+
+from .utils import getenv_float
+from .wait_for_state import _observe, wait_for_state, wait_until
+
+log = logging.getLogger(__name__)
+
+
+def _wait_enabled(wait: Optional[bool]) -> bool:
+    """Resolve the wait flag from the argument or NIFI_WAIT."""
+    if wait is None:
+        return bool(nipyapi.utils.getenv_bool("NIFI_WAIT", default=False))
+    return wait
+
+
+def _process_group_id(process_group_id: Optional[str]) -> Optional[str]:
+    """Resolve the process group ID from the argument or NIFI_PROCESS_GROUP_ID."""
+    return process_group_id or os.environ.get("NIFI_PROCESS_GROUP_ID")
+
+
+def source_processors(process_group_id: str) -> list:
+    """
+    Processors with no incoming connection: where data enters the group.
+
+    A connection from a processor back to itself (a retry or failure loop)
+    does not feed it from elsewhere, so it does not count.
+    """
+    processors = nipyapi.canvas.list_all_processors(process_group_id) or []
+    connections = nipyapi.canvas.list_all_connections(process_group_id, descendants=True) or []
+    fed = {
+        c.component.destination.id
+        for c in connections
+        if c.component.destination
+        and not (c.component.source and c.component.source.id == c.component.destination.id)
+    }
+    return [p for p in processors if p.id not in fed]
+
+
+def drain_flow(process_group_id: str, timeout: Optional[float] = None) -> dict:
+    """
+    Stop a group's source processors and wait for its queues to empty.
+
+    Downstream processors keep running to work off the queued FlowFiles; they
+    are left running whether or not the queues empty in time.
+
+    Args:
+        process_group_id: ID of the process group
+        timeout: Deadline in seconds. Env: NIFI_WAIT_TIMEOUT (default: 120)
+
+    Returns:
+        dict with drained ("true"/"false"), sources_stopped, drain_seconds,
+        drained_flowfiles, drain_rate (FlowFiles per second) and
+        queued_flowfiles left; includes ``error`` if the deadline passed first
+    """
+    timeout = getenv_float("NIFI_WAIT_TIMEOUT", 120.0) if timeout is None else timeout
+    sources = [p for p in source_processors(process_group_id) if p.component.state == "RUNNING"]
+    log.info("Stopping %d source processor(s) in %s", len(sources), process_group_id)
+    for processor in sources:
+        nipyapi.canvas.schedule_processor(processor, scheduled=False)
+    queued = _observe(process_group_id, check_controllers=False)["queued_flowfiles"]
+
+    def probe():
+        observed = _observe(process_group_id, check_controllers=False)
+        return observed["queued_flowfiles"] == 0, observed["queued_flowfiles"]
+
+    log.info("Draining %d queued FlowFile(s), waiting up to %ss", queued, timeout)
+    drained, remaining, _, seconds = wait_until(probe, timeout)
+    processed = max(0, queued - remaining)
+    result = {
+        "drained": str(drained).lower(),
+        "sources_stopped": str(len(sources)),
+        "drain_seconds": str(seconds),
+        "drained_flowfiles": str(processed),
+        "drain_rate": str(round(processed / seconds, 1) if seconds else 0.0),
+        "queued_flowfiles": str(remaining),
+    }
+    if drained:
+        log.info("Drained %d FlowFile(s) in %.3fs", processed, seconds)
+    else:
+        result["error"] = (
+            f"Queues did not drain within {timeout}s: {remaining} FlowFile(s) still queued "
+            f"({processed} drained)"
+        )
+        log.error(result["error"])
+    return result
+
+
+def start_flow(process_group_id: Optional[str] = None, wait: Optional[bool] = None) -> dict:
+    """
+    Start a process group, optionally waiting until its processors are running.
+
+    Args:
+        process_group_id: ID of the process group. Env: NIFI_PROCESS_GROUP_ID
+        wait: Wait for RUNNING before returning. Env: NIFI_WAIT (default: false)
+
+    Returns:
+        dict from ``nipyapi.ci.start_flow``, plus the ``wait_for_state``
+        outputs when waiting
+    """
+    result = ci.start_flow(process_group_id=_process_group_id(process_group_id))
+    if _wait_enabled(wait):
+        result.update(wait_for_state(_process_group_id(process_group_id), state="RUNNING"))
+    return result
+
+
+def stop_flow(
+    process_group_id: Optional[str] = None,
+    disable_controllers: Optional[bool] = None,
+    wait: Optional[bool] = None,
+    drain: Optional[bool] = None,
+) -> dict:
+    """
+    Stop a process group, optionally draining it first or waiting until no threads are active.
+
+    Args:
+        process_group_id: ID of the process group. Env: NIFI_PROCESS_GROUP_ID
+        disable_controllers: Also disable controller services.
+            Env: NIFI_DISABLE_CONTROLLERS (default: false)
+        wait: Wait for STOPPED (and DISABLED controllers, if disabling)
+            before returning. Env: NIFI_WAIT (default: false)
+        drain: Stop the source processors first and wait (up to
+            NIFI_WAIT_TIMEOUT) for the queues to empty before stopping the
+            rest. Env: NIFI_DRAIN (default: false)
+
+    Returns:
+        dict from ``nipyapi.ci.stop_flow``, plus the ``drain_flow`` outputs
+        when draining and the ``wait_for_state`` outputs when waiting. The
+        group is stopped even if it did not drain in time; ``error`` is set
+        so the pipeline does not go on to replace it with data queued
+    """
+    process_group_id = _process_group_id(process_group_id)
+    if drain is None:
+        drain = bool(nipyapi.utils.getenv_bool("NIFI_DRAIN", default=False))
+    drained = {}
+    if drain:
+        if not process_group_id:
+            raise ValueError("process_group_id is required (or set NIFI_PROCESS_GROUP_ID)")
+        drained = drain_flow(process_group_id)
+    result = ci.stop_flow(
+        process_group_id=process_group_id, disable_controllers=disable_controllers
+    )
+    result.update(drained)
+    if _wait_enabled(wait):
+        controllers = "DISABLED" if result.get("controllers_disabled") == "true" else None
+        result.update(wait_for_state(process_group_id, state="STOPPED", controllers=controllers))
+    return result
+
+
+def cleanup(process_group_id: Optional[str] = None, wait: Optional[bool] = None) -> dict:
+    """
+    Stop and delete a process group, optionally letting it settle first.
+
+    Deleting a group whose processors still have active threads, or whose
+    controller services are still disabling, fails. With ``wait`` the group is
+    stopped (and its controllers disabled, if requested) and polled until
+    settled before ``nipyapi.ci.cleanup`` runs. Other options are read from
+    the environment by ``nipyapi.ci.cleanup`` as usual.
+
+    Args:
+        process_group_id: ID of the process group. Env: NIFI_PROCESS_GROUP_ID
+        wait: Wait for the group to settle before deleting.
+            Env: NIFI_WAIT (default: false)
+
+    Returns:
+        dict from ``nipyapi.ci.cleanup``, plus the ``wait_for_state`` outputs
+        when waiting
+    """
+    process_group_id = _process_group_id(process_group_id)
+    settled = {}
+    if _wait_enabled(wait) and process_group_id:
+        try:
+            exists = nipyapi.canvas.get_process_group(process_group_id, "id") is not None
+        except nipyapi.nifi.rest.ApiException as e:
+            if e.status != 404:
+                raise
+            exists = False
+        if exists:
+            log.info("Stopping %s and waiting for it to settle before cleanup", process_group_id)
+            nipyapi.canvas.schedule_process_group(process_group_id, scheduled=False)
+            controllers = None
+            if nipyapi.utils.getenv_bool("NIFI_DISABLE_CONTROLLERS", default=True):
+                nipyapi.canvas.schedule_all_controllers(process_group_id, scheduled=False)
+                controllers = "DISABLED"
+            settled = wait_for_state(process_group_id, state="STOPPED", controllers=controllers)
+            if "error" in settled:
+                return settled
+    result = ci.cleanup(process_group_id=process_group_id)
+    result.update(settled)
+    return result
@@ -0,0 +1,390 @@
+# pylint: disable=broad-exception-caught
+"""
+load_test - drive a deployed HTTP flow and report throughput and latency.
+
+The CI workflow checks a flow's HTTP endpoint with a single request. This
+sends requests from ``concurrency`` asyncio workers, each over its own
+keep-alive connection, optionally paced to a target rate, for a fixed
+duration. Latencies go into the same histogram buckets as the request
+metrics, and the process group's status (queue depth, FlowFiles and bytes
+in and out, active threads) is sampled alongside, so slow responses can be
+matched to a backing-up queue. The report can gate a promotion on a maximum
+error rate, a maximum p95 latency and a minimum sustained request rate.
+
+With a rate, latency is measured from when each request was due rather than
+when it was sent, so a server that falls behind is not flattered by workers
+waiting on it (coordinated omission).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import ssl
+import time
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+import nipyapi
+
+from .metrics import BUCKETS
+from .utils import getenv_float, getenv_int, parse_duration, to_json
+
+log = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Seconds allowed to connect, send and read one response
+_REQUEST_TIMEOUT = 30.0
+
+# Pause after a failed request when unpaced, so a refused connection is not retried in a spin
+_ERROR_BACKOFF = 0.1
+
+
+def _percentile(ordered: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an ascending list (0 if empty)."""
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(percent / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+async def _read_response(reader: asyncio.StreamReader, method: str):
+    """Read one HTTP/1.x response; returns (status, body bytes, keep_alive)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed before a response")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    # HTTP/1.1 keeps the connection open unless told otherwise; HTTP/1.0 only if asked
+    connection = headers.get("connection", "").lower()
+    if status_line.split()[0].upper() == b"HTTP/1.0":
+        keep_alive = connection == "keep-alive"
+    else:
+        keep_alive = connection != "close"
+    size = 0
+    if method == "HEAD" or status in (204, 304):
+        pass
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            chunk = int((await reader.readline()).split(b";")[0], 16)
+            if not chunk:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            size += len(await reader.readexactly(chunk + 2)) - 2
+    elif "content-length" in headers:
+        size = len(await reader.readexactly(int(headers["content-length"])))
+    else:
+        size = len(await reader.read())
+        keep_alive = False
+    return status, size, keep_alive
+
+
+class _LoadRun:  # pylint: disable=too-many-instance-attributes
+    """State shared by the workers of one load test."""
+
+    def __init__(self, url: str, method: str, body: bytes, rate: float, duration: float):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"url must be an http(s) URL, got '{url}'")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = None
+        if parts.scheme == "https":
+            self.ssl = ssl.create_default_context()
+            if not nipyapi.utils.getenv_bool("NIFI_VERIFY_SSL", default=True):
+                self.ssl.check_hostname = False
+                self.ssl.verify_mode = ssl.CERT_NONE
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        host_header = parts.netloc.rsplit("@", 1)[-1]
+        head = f"{method} {path} HTTP/1.1\r\nHost: {host_header}\r\nUser-Agent: nipyapi-actions\r\n"
+        if body:
+            head += f"Content-Length: {len(body)}\r\n"
+        self.method = method
+        self.request = (head + "\r\n").encode("latin-1") + body
+        self.rate = rate
+        self.duration = duration
+        self.started = 0.0
+        self.issued = 0
+        self.latencies: List[float] = []
+        self.statuses = {}
+        self.errors = {}
+        self.bytes_received = 0
+
+    def next_slot(self) -> Optional[float]:
+        """Claim the next request: when it is due, or None once the duration is up."""
+        now = time.monotonic()
+        if self.rate:
+            due = self.started + self.issued / self.rate
+        else:
+            due = now
+        if due - self.started >= self.duration or now - self.started >= self.duration:
+            return None
+        self.issued += 1
+        return due
+
+    async def worker(self) -> None:
+        """Send requests over one keep-alive connection until the duration is up."""
+        connection = None
+        while True:
+            due = self.next_slot()
+            if due is None:
+                break
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sent = time.monotonic()
+            try:
+                if connection is None:
+                    connection = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port, ssl=self.ssl),
+                        _REQUEST_TIMEOUT,
+                    )
+                reader, writer = connection
+                writer.write(self.request)
+                status, size, keep_alive = await asyncio.wait_for(
+                    self._exchange(reader, writer), _REQUEST_TIMEOUT
+                )
+            except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                kind = "timeout" if isinstance(e, asyncio.TimeoutError) else type(e).__name__
+                self.errors[kind] = self.errors.get(kind, 0) + 1
+                connection = self._close(connection)
+                if not self.rate:
+                    await asyncio.sleep(_ERROR_BACKOFF)
+                continue
+            # From when the request was due, so queueing behind a slow server counts
+            self.latencies.append(time.monotonic() - (due if self.rate else sent))
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.bytes_received += size
+            if not keep_alive:
+                connection = self._close(connection)
+        self._close(connection)
+
+    async def _exchange(self, reader, writer):
+        await writer.drain()
+        return await _read_response(reader, self.method)
+
+    @staticmethod
+    def _close(connection) -> None:
+        if connection is not None:
+            connection[1].close()
+
+
+def _sample(process_group_id: str, elapsed: float) -> dict:
+    """One process group status sample (NiFi's in/out counters cover the last 5 minutes)."""
+    status = nipyapi.canvas.get_process_group_status(process_group_id, detail="all")
+    snapshot = status.status.aggregate_snapshot
+    return {
+        "seconds": round(elapsed, 3),
+        "queued_flowfiles": snapshot.flow_files_queued or 0,
+        "queued_bytes": snapshot.bytes_queued or 0,
+        "flowfiles_in": snapshot.flow_files_in or 0,
+        "bytes_in": snapshot.bytes_in or 0,
+        "flowfiles_out": snapshot.flow_files_out or 0,
+        "bytes_out": snapshot.bytes_out or 0,
+        "active_threads": snapshot.active_thread_count or 0,
+    }
+
+
+async def _run(run: _LoadRun, concurrency: int, process_group_id, interval: float) -> list:
+    """Run the workers, sampling the process group status until they finish."""
+    loop = asyncio.get_running_loop()
+    samples = []
+
+    async def take_sample():
+        try:
+            samples.append(
+                await loop.run_in_executor(
+                    None, _sample, process_group_id, time.monotonic() - run.started
+                )
+            )
+        except Exception as e:
+            log.warning("Could not sample status of %s: %s", process_group_id, e)
+
+    async def sampler():
+        while True:
+            await take_sample()
+            await asyncio.sleep(interval)
+
+    run.started = time.monotonic()
+    sampling = asyncio.ensure_future(sampler()) if process_group_id else None
+    try:
+        await asyncio.gather(*(run.worker() for _ in range(concurrency)))
+    finally:
+        if sampling:
+            sampling.cancel()
+    if process_group_id:
+        # Final sample: what the flow still had queued when the load stopped
+        await take_sample()
+    return samples
+
+
+def load_test(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    url: Optional[str] = None,
+    process_group_id: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    rate: Optional[float] = None,
+    duration: Optional[str] = None,
+    method: Optional[str] = None,
+    body: Optional[str] = None,
+    report_file: Optional[str] = None,
+) -> dict:
+    """
+    Load-test a flow's HTTP endpoint and check the result against gates.
+
+    Args:
+        url: Endpoint exposed by the flow. Env: NIFI_LOAD_URL
+        process_group_id: Group to sample status from while loading (optional).
+            Env: NIFI_PROCESS_GROUP_ID
+        concurrency: Concurrent connections. Env: NIFI_LOAD_CONCURRENCY (default: 10)
+        rate: Target requests per second across all connections, 0 for as
+            fast as they go. Env: NIFI_LOAD_RATE (default: 0)
+        duration: How long to send for, e.g. ``30s`` or ``5m``.
+            Env: NIFI_LOAD_DURATION (default: 30s)
+        method: HTTP method. Env: NIFI_LOAD_METHOD (default: GET)
+        body: Request body. Env: NIFI_LOAD_BODY
+        report_file: Also write the full report, with status samples, to
+            this file. Env: NIFI_LOAD_REPORT_FILE
+
+    Gates (each optional): NIFI_LOAD_MAX_ERROR_RATE (fraction of requests
+    that failed or returned non-2xx), NIFI_LOAD_MAX_P95_MS and
+    NIFI_LOAD_MIN_RPS. Status samples are taken every
+    NIFI_LOAD_SAMPLE_INTERVAL seconds (default: 1).
+
+    Returns:
+        dict with passed ("true"/"false"), requests, error_count, error_rate,
+        requests_per_second, latency_p50_ms/p95_ms/p99_ms,
+        max_queued_flowfiles and report (JSON: latency percentiles and
+        histogram, status codes, error types and the status summary);
+        error naming the gates that failed
+
+    Raises:
+        ValueError: Missing or invalid parameters
+
+    Example::
+
+        load_test("http://nifi:8080/version", pg_id, concurrency=20, rate=200)
+        # {"passed": "true", "requests": "6000", "requests_per_second": "199.9",
+        #  "latency_p95_ms": "12.4", "error_rate": "0.0", ...}
+    """
+    url = url or os.environ.get("NIFI_LOAD_URL")
+    process_group_id = process_group_id or os.environ.get("NIFI_PROCESS_GROUP_ID") or None
+    concurrency = concurrency or getenv_int("NIFI_LOAD_CONCURRENCY", 10)
+    rate = getenv_float("NIFI_LOAD_RATE", 0.0) if rate is None else rate
+    duration = parse_duration(duration or os.environ.get("NIFI_LOAD_DURATION") or "30s")
+    method = (method or os.environ.get("NIFI_LOAD_METHOD") or "GET").upper()
+    body = body if body is not None else os.environ.get("NIFI_LOAD_BODY", "")
+    report_file = report_file or os.environ.get("NIFI_LOAD_REPORT_FILE") or None
+    max_error_rate = getenv_float("NIFI_LOAD_MAX_ERROR_RATE", None)
+    max_p95_ms = getenv_float("NIFI_LOAD_MAX_P95_MS", None)
+    min_rps = getenv_float("NIFI_LOAD_MIN_RPS", None)
+    interval = getenv_float("NIFI_LOAD_SAMPLE_INTERVAL", 1.0)
+
+    if not url:
+        raise ValueError("url is required (or set NIFI_LOAD_URL)")
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if rate < 0 or duration <= 0:
+        raise ValueError("rate must be zero or more and duration more than zero")
+
+    run = _LoadRun(url, method, body.encode("utf-8"), rate, duration)
+    log.info(
+        "Sending %s %s for %ss from %d connection(s)%s",
+        method,
+        url,
+        duration,
+        concurrency,
+        f" at {rate}/s" if rate else "",
+    )
+    samples = asyncio.run(_run(run, concurrency, process_group_id, interval))
+    seconds = time.monotonic() - run.started
+
+    latencies = sorted(run.latencies)
+    failures = sum(run.errors.values()) + sum(
+        count for status, count in run.statuses.items() if not 200 <= status <= 299
+    )
+    total = len(latencies) + sum(run.errors.values())
+    histogram = [0] * len(BUCKETS)
+    for latency in latencies:
+        histogram[next(i for i, bound in enumerate(BUCKETS) if latency <= bound)] += 1
+    latency_ms = {f"p{p}": round(_percentile(latencies, p) * 1000, 3) for p in PERCENTILES}
+    latency_ms["max"] = round(latencies[-1] * 1000, 3) if latencies else 0.0
+    latency_ms["mean"] = round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0
+
+    report = {
+        "url": url,
+        "method": method,
+        "concurrency": concurrency,
+        "target_rate": rate,
+        "seconds": round(seconds, 3),
+        "requests": total,
+        "errors": failures,
+        "error_rate": round(failures / total, 6) if total else 0.0,
+        "requests_per_second": round(total / seconds, 1) if seconds else 0.0,
+        "bytes_received": run.bytes_received,
+        "latency_ms": latency_ms,
+        "histogram": {
+            "buckets": [str(b) if b != float("inf") else "+Inf" for b in BUCKETS],
+            "counts": histogram,
+        },
+        "status_codes": {str(k): v for k, v in sorted(run.statuses.items())},
+        "error_types": run.errors,
+    }
+    if samples:
+        report["nifi"] = {
+            "process_group_id": process_group_id,
+            "samples": len(samples),
+            "max_queued_flowfiles": max(s["queued_flowfiles"] for s in samples),
+            "max_queued_bytes": max(s["queued_bytes"] for s in samples),
+            "max_active_threads": max(s["active_threads"] for s in samples),
+            "end": samples[-1],
+        }
+
+    gates = []
+    if max_error_rate is not None and report["error_rate"] > max_error_rate:
+        gates.append(f"error rate {report['error_rate']} > {max_error_rate}")
+    if max_p95_ms is not None and latency_ms["p95"] > max_p95_ms:
+        gates.append(f"p95 latency {latency_ms['p95']}ms > {max_p95_ms}ms")
+    if min_rps is not None and report["requests_per_second"] < min_rps:
+        gates.append(f"{report['requests_per_second']} requests/s < {min_rps}")
+    report["passed"] = not gates
+
+    if report_file:
+        directory = os.path.dirname(report_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(report_file, "w", encoding="utf-8") as f:
+            json.dump(dict(report, samples=samples), f, indent=2)
+
+    log.info(
+        "%d request(s), %.1f/s, p95 %.1fms, %d error(s)",
+        total,
+        report["requests_per_second"],
+        latency_ms["p95"],
+        failures,
+    )
+    result = {
+        "passed": str(not gates).lower(),
+        "requests": str(total),
+        "error_count": str(failures),
+        "error_rate": str(report["error_rate"]),
+        "requests_per_second": str(report["requests_per_second"]),
+        "latency_p50_ms": str(latency_ms["p50"]),
+        "latency_p95_ms": str(latency_ms["p95"]),
+        "latency_p99_ms": str(latency_ms["p99"]),
+        "max_queued_flowfiles": str(report.get("nifi", {}).get("max_queued_flowfiles", "")),
+        "report": to_json(report),
+    }
+    if report_file:
+        result["report_file"] = report_file
+    if gates:
+        result["error"] = f"Load test gates failed: {'; '.join(gates)}"
+    return result
@@ -0,0 +1,322 @@
+# pylint: disable=broad-exception-caught
+"""
+metrics - count and time the NiFi REST calls made by a command.
+
+The nipyapi generated clients are instrumented in place: ``ApiClient.call_api``
+supplies the endpoint template (``/process-groups/{id}``) and
+``RESTClientObject.request`` the status, bytes and latency of each HTTP
+request. Aggregating by template rather than URL makes N+1 patterns (one
+call per component) and slow endpoints stand out.
+
+The summary is returned as the ``metrics`` output; with NIFI_METRICS_FILE it
+is also written as JSON lines (one record per request, appended) or in the
+OpenMetrics text format (NIFI_METRICS_FORMAT=openmetrics, rewritten).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+log = logging.getLogger(__name__)
+
+# Latency histogram upper bounds in seconds (Prometheus client defaults)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+METRICS_FORMATS = ("jsonl", "openmetrics")
+
+# API base paths stripped from URLs that did not come through call_api
+_BASE_PATHS = ("/nifi-api", "/nifi-registry-api")
+
+
+class RequestMetrics:
+    """Thread-safe per-endpoint request counters and latency histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.command = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        with self._lock:
+            self.endpoints = {}
+            self.events = []
+
+    @property
+    def requests(self) -> int:
+        """Total number of requests recorded."""
+        with self._lock:
+            return sum(e["count"] for e in self.endpoints.values())
+
+    def record(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        method: str,
+        endpoint: str,
+        status: int,
+        seconds: float,
+        bytes_sent: int,
+        bytes_received: int,
+    ) -> None:
+        """Record one completed (or failed) request."""
+        key = f"{method} {endpoint}"
+        bucket = next(i for i, bound in enumerate(BUCKETS) if seconds <= bound)
+        with self._lock:
+            entry = self.endpoints.get(key)
+            if entry is None:
+                entry = self.endpoints[key] = {
+                    "count": 0,
+                    "errors": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "bytes_sent": 0,
+                    "bytes_received": 0,
+                    "histogram": [0] * len(BUCKETS),
+                }
+            entry["count"] += 1
+            entry["errors"] += 1 if not 200 <= status <= 299 else 0
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["bytes_sent"] += bytes_sent
+            entry["bytes_received"] += bytes_received
+            entry["histogram"][bucket] += 1
+            self.events.append(
+                {
+                    "ts": round(time.time(), 3),
+                    "command": self.command,
+                    "method": method,
+                    "endpoint": endpoint,
+                    "status": status,
+                    "seconds": round(seconds, 6),
+                    "bytes_sent": bytes_sent,
+                    "bytes_received": bytes_received,
+                }
+            )
+
+    def summary(self) -> dict:
+        """
+        Summarise the recorded requests.
+
+        Returns:
+            dict with totals and ``endpoints``: ``"METHOD /template"`` ->
+            count, errors, seconds, max_seconds, bytes and a latency
+            histogram (counts per ``buckets`` upper bound), slowest first
+        """
+        with self._lock:
+            endpoints = {
+                key: dict(entry, histogram=list(entry["histogram"]))
+                for key, entry in self.endpoints.items()
+            }
+        for entry in endpoints.values():
+            entry["seconds"] = round(entry["seconds"], 4)
+            entry["max_seconds"] = round(entry["max_seconds"], 4)
+        return {
+            "requests": sum(e["count"] for e in endpoints.values()),
+            "errors": sum(e["errors"] for e in endpoints.values()),
+            "seconds": round(sum(e["seconds"] for e in endpoints.values()), 4),
+            "bytes_sent": sum(e["bytes_sent"] for e in endpoints.values()),
+            "bytes_received": sum(e["bytes_received"] for e in endpoints.values()),
+            "buckets": [str(b) if b != float("inf") else "+Inf" for b in BUCKETS],
+            "endpoints": dict(
+                sorted(endpoints.items(), key=lambda item: item[1]["seconds"], reverse=True)
+            ),
+        }
+
+    def openmetrics(self) -> str:
+        """Render the recorded requests in the OpenMetrics text format."""
+        summary = self.summary()
+        families = {
+            "requests": ("counter", "NiFi REST requests", "count"),
+            "request_errors": ("counter", "NiFi REST requests with a non-2xx status", "errors"),
+            "request_sent_bytes": ("counter", "Request body bytes sent", "bytes_sent"),
+            "response_bytes": ("counter", "Response body bytes received", "bytes_received"),
+        }
+        lines = []
+        for name, (kind, help_text, field) in families.items():
+            lines.append(f"# TYPE nifi_http_{name} {kind}")
+            lines.append(f"# HELP nifi_http_{name} {help_text}.")
+            for key, entry in summary["endpoints"].items():
+                lines.append(f"nifi_http_{name}_total{{{_labels(key)}}} {entry[field]}")
+
+        lines.append("# TYPE nifi_http_request_duration_seconds histogram")
+        lines.append("# HELP nifi_http_request_duration_seconds NiFi REST request latency.")
+        for key, entry in summary["endpoints"].items():
+            labels = _labels(key)
+            cumulative = 0
+            for bound, count in zip(summary["buckets"], entry["histogram"]):
+                cumulative += count
+                lines.append(
+                    f'nifi_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(f"nifi_http_request_duration_seconds_count{{{labels}}} {entry['count']}")
+            lines.append(f"nifi_http_request_duration_seconds_sum{{{labels}}} {entry['seconds']}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, metrics_format: Optional[str] = None) -> None:
+        """
+        Write the recorded requests to a file.
+
+        Args:
+            path: Destination file
+            metrics_format: ``jsonl`` (default; one record per request,
+                appended so several steps can share a file) or
+                ``openmetrics`` (file rewritten). Env: NIFI_METRICS_FORMAT
+
+        Raises:
+            ValueError: Unknown format
+        """
+        metrics_format = (
+            metrics_format or os.environ.get("NIFI_METRICS_FORMAT") or "jsonl"
+        ).lower()
+        if metrics_format not in METRICS_FORMATS:
+            raise ValueError(
+                f"metrics_format must be one of {', '.join(METRICS_FORMATS)}, "
+                f"got '{metrics_format}'"
+            )
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if metrics_format == "openmetrics":
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.openmetrics())
+            return
+        with self._lock:
+            events = list(self.events)
+        with open(path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+    # -- instrumentation hooks -------------------------------------------
+
+    def _set_template(self, template: Optional[str]) -> None:
+        self._local.template = template
+
+    def _endpoint(self, url: str) -> str:
+        template = getattr(self._local, "template", None)
+        if template:
+            return template.split("?", 1)[0]
+        path = urlparse(url).path
+        for base in _BASE_PATHS:
+            if base in path:
+                return path.split(base, 1)[1] or "/"
+        return path
+
+
+def _labels(key: str) -> str:
+    method, endpoint = key.split(" ", 1)
+    endpoint = endpoint.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",endpoint="{endpoint}"'
+
+
+def _body_size(body, post_params) -> int:
+    """Approximate request body size without re-encoding multipart uploads."""
+    if body is None and not post_params:
+        return 0
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    if body is not None:
+        return len(json.dumps(body))
+    size = 0
+    for _, value in post_params or []:
+        if isinstance(value, tuple):
+            size += len(value[1] or b"")
+        else:
+            size += len(str(value))
+    return size
+
+
+def _response_size(response) -> int:
+    urllib3_response = getattr(response, "urllib3_response", None)
+    if urllib3_response is not None:
+        return len(urllib3_response.data or b"")
+    try:
+        return int(response.headers.get("Content-Length") or 0)
+    except (AttributeError, TypeError, ValueError):
+        return 0
+
+
+# Process-wide collector used by the entry point, runner and tests
+METRICS = RequestMetrics()
+
+
+def _instrument_api_client(api_client_class, prefix: str = "") -> None:
+    original = api_client_class.call_api
+    if getattr(original, "_nipyapi_actions_metrics", False):
+        return
+
+    def call_api(self, resource_path, method, *args, **kwargs):
+        METRICS._set_template(prefix + resource_path)  # pylint: disable=protected-access
+        try:
+            return original(self, resource_path, method, *args, **kwargs)
+        finally:
+            METRICS._set_template(None)  # pylint: disable=protected-access
+
+    call_api._nipyapi_actions_metrics = True
+    api_client_class.call_api = call_api
+
+
+def _instrument_rest_client(rest_module) -> None:
+    original = rest_module.RESTClientObject.request
+    if getattr(original, "_nipyapi_actions_metrics", False):
+        return
+
+    def request(self, method, url, *args, **kwargs):
+        # request(method, url, query_params, headers, body, post_params, ...)
+        body = kwargs.get("body", args[2] if len(args) > 2 else None)
+        post_params = kwargs.get("post_params", args[3] if len(args) > 3 else None)
+        endpoint = METRICS._endpoint(url)  # pylint: disable=protected-access
+        started = time.perf_counter()
+        status, received = 0, 0
+        try:
+            response = original(self, method, url, *args, **kwargs)
+            status, received = response.status, _response_size(response)
+            return response
+        except rest_module.ApiException as e:
+            status, received = e.status or 0, len(e.body or "")
+            raise
+        finally:
+            try:
+                METRICS.record(
+                    method.upper(),
+                    endpoint,
+                    status,
+                    time.perf_counter() - started,
+                    _body_size(body, post_params),
+                    received,
+                )
+            except Exception as e:
+                log.debug("Could not record request metrics: %s", e)
+
+    request._nipyapi_actions_metrics = True
+    rest_module.RESTClientObject.request = request
+
+
+def install() -> RequestMetrics:
+    """
+    Instrument the nipyapi NiFi and Registry clients (idempotent).
+
+    Returns:
+        The process-wide ``METRICS`` collector
+    """
+    import nipyapi.nifi.api_client
+    import nipyapi.nifi.rest
+    import nipyapi.registry.api_client
+    import nipyapi.registry.rest
+
+    _instrument_api_client(nipyapi.nifi.api_client.ApiClient)
+    # NiFi Registry endpoints are labelled so they are not mistaken for NiFi's
+    _instrument_api_client(nipyapi.registry.api_client.ApiClient, prefix="registry:")
+    _instrument_rest_client(nipyapi.nifi.rest)
+    _instrument_rest_client(nipyapi.registry.rest)
+    return METRICS
+
+
+def to_output(summary: dict) -> str:
+    """Compact JSON for the ``metrics`` output (histograms as bucket counts)."""
+    return json.dumps(summary, separators=(",", ":"))
@@ -0,0 +1,260 @@
+"""
+outputs - format command results for the CI platform.
+
+Follows the same conventions as the nipyapi CLI so outputs look identical
+whether a command was run through ``nipyapi ci`` or through this package:
+
+- github: ``key=value`` with kebab-case keys, heredoc for multiline/long values
+- dotenv: ``KEY=VALUE`` for GitLab CI, multiline values skipped
+- json: a single JSON document (default outside CI)
+
+``OutputSink`` writes key=value formats as results arrive, appending each
+line straight to an output file (NIFI_OUTPUT_FILE, e.g. $GITHUB_OUTPUT) and
+echoing it to the console, so nothing is held back until the end and log
+noise on stderr never reaches the output file.
+
+With NIFI_OUTPUT_JSONL, every output is also written as one typed JSON
+record per line to a sidecar file, so large lists and values with newlines
+reach later steps without flattening or quoting (see ``read_outputs``).
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+from typing import Optional
+
+# Characters that require quoting for safe shell parsing of dotenv values
+_DOTENV_SPECIAL = set(" \t|&;<>()$`\\\"'*?[]#~=!{}^")
+
+
+def detect_output_format() -> str:
+    """
+    Detect the output format from the environment.
+
+    Priority: NIFI_OUTPUT_FORMAT, then GITHUB_ACTIONS / GITLAB_CI, then json.
+    """
+    explicit = os.environ.get("NIFI_OUTPUT_FORMAT")
+    if explicit:
+        return explicit.lower()
+    if os.environ.get("GITHUB_ACTIONS"):
+        return "github"
+    if os.environ.get("GITLAB_CI"):
+        return "dotenv"
+    return "json"
+
+
+# Outputs never written to the JSON lines sidecar
+_SIDECAR_EXCLUDED = frozenset(("nifi_bearer_token",))
+
+_TRUE = ("true", "1", "yes", "on")
+
+
+def jsonl_output_path() -> Optional[str]:
+    """
+    Return the JSON lines sidecar path from NIFI_OUTPUT_JSONL, or None.
+
+    ``true`` picks a file per step (GITHUB_ACTION) or job (CI_JOB_ID) under
+    RUNNER_TEMP or the system temporary directory.
+    """
+    value = os.environ.get("NIFI_OUTPUT_JSONL") or ""
+    if not value or value.lower() in ("false", "0", "no", "off"):
+        return None
+    if value.lower() not in _TRUE:
+        return value
+    name = os.environ.get("GITHUB_ACTION") or os.environ.get("CI_JOB_ID") or "outputs"
+    temp = os.environ.get("RUNNER_TEMP") or tempfile.gettempdir()
+    directory = os.path.join(temp, "nipyapi-actions")
+    return os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]", "_", name) + ".jsonl")
+
+
+def jsonl_record(key: str, value) -> str:
+    """
+    Format one output as a JSON lines record: ``{"key":...,"type":...,"value":...}``.
+
+    JSON outputs (lists and objects serialized by the commands) are decoded
+    and ``"true"``/``"false"`` become booleans; other strings, including
+    numbers such as versions and counts, are kept as given. The key comes
+    first so a reader can skip records by prefix without parsing them.
+    """
+    typed = value
+    if isinstance(value, str):
+        if value[:1] in ("[", "{"):
+            try:
+                typed = json.loads(value)
+            except ValueError:
+                pass
+        elif value in ("true", "false"):
+            typed = value == "true"
+    if isinstance(typed, bool):
+        kind = "boolean"
+    elif isinstance(typed, (int, float)):
+        kind = "number"
+    elif isinstance(typed, list):
+        kind = "array"
+    elif isinstance(typed, dict):
+        kind = "object"
+    elif typed is None:
+        kind = "null"
+    else:
+        kind, typed = "string", str(typed)
+    record = {"key": key.replace("_", "-"), "type": kind, "value": typed}
+    return json.dumps(record, default=str, separators=(",", ":"))
+
+
+def write_mask(value: str, echo) -> None:
+    """Write ``::add-mask::`` for each line of a secret (GitHub masks line by line)."""
+    for line in str(value).splitlines():
+        if line.strip():
+            echo.write(f"::add-mask::{line}\n")
+    echo.flush()
+
+
+def mask_secret(value: str) -> bool:
+    """
+    Mask a secret in the GitHub Actions log from inside a command.
+
+    Same condition as ``OutputSink.mask``: GitHub format with outputs going
+    to NIFI_OUTPUT_FILE, so stdout is the job log and never the output file.
+
+    Returns:
+        True if the mask was written
+    """
+    if detect_output_format() != "github" or not os.environ.get("NIFI_OUTPUT_FILE"):
+        return False
+    if not value or not str(value).strip():
+        return False
+    write_mask(value, sys.stdout)
+    return True
+
+
+def _value_str(value) -> str:
+    """Serialize lists/dicts as JSON and scalars with str()."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+def format_output(key: str, value, output_format: str):
+    """
+    Format a single output for the given format.
+
+    Returns:
+        The formatted line(s), or None if the value cannot be represented
+    """
+    v_str = _value_str(value)
+    if output_format == "github":
+        key = key.replace("_", "-")
+        if "\n" in v_str or len(v_str) > 500:
+            return f"{key}<<EOF\n{v_str}\nEOF"
+        return f"{key}={v_str}"
+    if output_format == "dotenv":
+        # GitLab dotenv reports reject multiline and very long values
+        if "\n" in v_str or len(v_str) >= 1000:
+            return None
+        if any(c in v_str for c in _DOTENV_SPECIAL):
+            v_escaped = v_str.replace('"', '\\"')
+            return f'{key.upper()}="{v_escaped}"'
+        return f"{key.upper()}={v_str}"
+    return json.dumps({key: value}, default=str)
+
+
+def flatten(result: dict, parent_key: str = "") -> dict:
+    """Flatten nested dicts into ``parent_child`` keys for key=value formats."""
+    items = {}
+    for k, v in result.items():
+        key = f"{parent_key}_{k}" if parent_key else k
+        if isinstance(v, dict):
+            items.update(flatten(v, key))
+        else:
+            items[key] = v
+    return items
+
+
+def format_outputs(result: dict, output_format: str) -> str:
+    """Format a result dict for the given output format."""
+    if output_format not in ("github", "dotenv"):
+        return json.dumps(result, indent=2, default=str)
+    lines = [format_output(k, v, output_format) for k, v in flatten(result).items()]
+    return "\n".join(line for line in lines if line is not None)
+
+
+class OutputSink:
+    """
+    Stream outputs to an output file and the console as they are produced.
+
+    Args:
+        output_format: github, dotenv or json
+        path: File to append outputs to (e.g. $GITHUB_OUTPUT); if None,
+            outputs only go to ``echo``
+        echo: Console stream (default: stdout)
+        jsonl_path: JSON lines sidecar to append typed records to
+            (default: none)
+    """
+
+    def __init__(self, output_format: str, path=None, echo=None, jsonl_path=None):
+        self.output_format = output_format
+        self.path = path
+        self.echo = echo or sys.stdout
+        # pylint: disable-next=consider-using-with
+        self._file = open(path, "a", encoding="utf-8") if path else None
+        self._pending = {}  # json format is one document, written on close
+        self.jsonl_path = jsonl_path
+        self._jsonl = None
+        if jsonl_path:
+            os.makedirs(os.path.dirname(os.path.abspath(jsonl_path)), exist_ok=True)
+            # pylint: disable-next=consider-using-with
+            self._jsonl = open(jsonl_path, "a", encoding="utf-8")
+
+    @property
+    def streaming(self) -> bool:
+        """Whether outputs are written line by line (key=value formats)."""
+        return self.output_format in ("github", "dotenv")
+
+    def write(self, result: dict) -> None:
+        """Write the outputs in result, one line (or heredoc) per key."""
+        if self._jsonl:
+            for key, value in result.items():
+                if key not in _SIDECAR_EXCLUDED:
+                    self._jsonl.write(jsonl_record(key, value) + "\n")
+            self._jsonl.flush()
+        if not self.streaming:
+            self._pending.update(result)
+            return
+        for key, value in flatten(result).items():
+            line = format_output(key, value, self.output_format)
+            if line is None:
+                continue
+            if self._file:
+                self._file.write(line + "\n")
+                self._file.flush()
+            self.echo.write(line + "\n")
+            self.echo.flush()
+
+    def mask(self, value: str) -> bool:
+        """
+        Ask GitHub Actions to mask a secret in the console log.
+
+        Only possible when outputs go to a file and the console is the job
+        log; callers must not output the secret when this returns False.
+        """
+        if self.output_format != "github" or not self._file or not value:
+            return False
+        write_mask(value, self.echo)
+        return True
+
+    def close(self) -> None:
+        """Flush the json document (if any) and close the output file."""
+        if not self.streaming:
+            document = json.dumps(self._pending, indent=2, default=str)
+            if self._file:
+                self._file.write(document + "\n")
+            self.echo.write(document + "\n")
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self._jsonl:
+            self._jsonl.close()
+            self._jsonl = None
+        self.echo.flush()
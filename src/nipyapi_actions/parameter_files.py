@@ -0,0 +1,207 @@
+"""
+parameter_files - read parameter values from a JSON, YAML or dotenv file, or stdin.
+
+Passing hundreds of parameters as one JSON string through NIFI_PARAMETERS
+runs into environment size limits, and secrets end up re-serialized by the
+shell. A parameters file (or ``-`` for stdin) is read from the stream
+instead: dotenv line by line, JSON and YAML as a single mapping. Every
+value is handed to a callback as soon as it is read, so a secret can be
+masked before anything else touches it.
+
+A value may be given as ``{"value": ..., "sensitive": true}`` in JSON or
+YAML to mark it sensitive; names matching the sensitive patterns are
+sensitive in every format. JSON numbers and booleans are kept as written;
+YAML values that do not load as strings (``yes``, ``1.10``) must be quoted.
+"""
+
+import fnmatch
+import itertools
+import json
+import os
+import re
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import yaml
+
+FORMATS = ("json", "yaml", "dotenv")
+
+_EXTENSIONS = {".json": "json", ".yaml": "yaml", ".yml": "yaml", ".env": "dotenv"}
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_DOTENV_LINE = re.compile(r"^\s*(?:export\s+)?([A-Za-z0-9_.\- ]+?)\s*=\s*(.*?)\s*$")
+_DOTENV_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", '"': '"', "\\": "\\"}
+
+# (name, value, sensitive or None when the source does not say)
+Entry = Tuple[str, str, Optional[bool]]
+
+
+def _unquote(value: str) -> str:
+    """Strip dotenv quoting: double quotes allow escapes, single quotes are literal."""
+    if len(value) > 1 and value[0] == value[-1] == "'":
+        return value[1:-1]
+    if len(value) > 1 and value[0] == value[-1] == '"':
+        return re.sub(
+            r"\\(.)", lambda m: _DOTENV_ESCAPES.get(m.group(1), m.group(0)), value[1:-1]
+        )
+    # Unquoted values end at an inline comment
+    return re.split(r"\s+#", value, maxsplit=1)[0]
+
+
+def _dotenv_entries(lines: Iterable[str], source: str) -> Iterator[Entry]:
+    for number, line in enumerate(lines, 1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        match = _DOTENV_LINE.match(line)
+        if not match:
+            raise ValueError(f"{source}:{number}: expected NAME=value")
+        yield match.group(1), _unquote(match.group(2)), None
+
+
+def _load_json(text: str):
+    """Parse JSON keeping numbers as written, e.g. ``1.10`` stays "1.10"."""
+    return json.loads(text, parse_int=str, parse_float=str)
+
+
+def _mapping_entries(mapping, source: str, strings_only: bool = False) -> Iterator[Entry]:
+    """
+    Yield the entries of a parsed mapping.
+
+    Non-string scalars are written back as JSON (``true``, ``8080``). YAML
+    resolves ``yes``, ``1.10`` or ``2024-01-01`` to other types and loses how
+    they were written, so with strings_only they are refused instead.
+    """
+    if not isinstance(mapping, dict):
+        raise ValueError(f"{source} must contain a mapping of parameter name -> value")
+    for name, item in mapping.items():
+        sensitive = None
+        if isinstance(item, dict):
+            if "value" not in item:
+                raise ValueError(f"{source}: parameter '{name}' has no value")
+            sensitive = bool(item["sensitive"]) if "sensitive" in item else None
+            item = item["value"]
+        if item is None or isinstance(item, (list, dict)):
+            raise ValueError(f"{source}: parameter '{name}' must have a scalar value")
+        if not isinstance(item, str):
+            if strings_only or not isinstance(item, (bool, int, float)):
+                raise ValueError(
+                    f"{source}: parameter '{name}' was read as a {type(item).__name__}; "
+                    "quote the value to keep it exactly as written"
+                )
+            item = json.dumps(item)
+        yield str(name), item, sensitive
+
+
+def _detect_format(path: str, first_line: str) -> str:
+    """Format from the file extension, else from the first line with content."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in _EXTENSIONS:
+        return _EXTENSIONS[extension]
+    stripped = first_line.strip()
+    if stripped.startswith(("{", "[")):
+        return "json"
+    if _DOTENV_LINE.match(first_line) and not re.match(r"^[^=]*:\s", first_line):
+        return "dotenv"
+    return "yaml"
+
+
+def iter_parameter_file(stream, path: str = "-", file_format: Optional[str] = None):
+    """
+    Yield (name, value, sensitive) entries from an open text stream.
+
+    Args:
+        stream: Text stream to read
+        path: Name used for format detection and error messages
+        file_format: ``json``, ``yaml`` or ``dotenv`` (default: detected)
+
+    Raises:
+        ValueError: Unknown format or malformed content
+    """
+    source = "stdin" if path == "-" else path
+    # Look at the first line that is not blank or a comment without losing it
+    leading: List[str] = []
+    for line in stream:
+        leading.append(line)
+        if line.strip() and not line.lstrip().startswith("#"):
+            break
+    lines = itertools.chain(leading, stream)
+    file_format = (file_format or _detect_format(path, leading[-1] if leading else "")).lower()
+    if file_format not in FORMATS:
+        raise ValueError(
+            f"Parameters format must be one of {', '.join(FORMATS)}, got '{file_format}'"
+        )
+    if file_format == "dotenv":
+        yield from _dotenv_entries(lines, source)
+        return
+    text = "".join(lines)
+    if not text.strip():
+        return
+    try:
+        if file_format == "json":
+            mapping = _load_json(text)
+        else:
+            mapping = yaml.load(text, Loader=_YAML_LOADER)  # nosec B506 - safe loader
+    except (json.JSONDecodeError, yaml.YAMLError) as e:
+        raise ValueError(f"Invalid {file_format} in {source}: {e}") from e
+    yield from _mapping_entries(mapping, source, strings_only=file_format == "yaml")
+
+
+def read_parameters(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    path: Optional[str] = None,
+    inline=None,
+    file_format: Optional[str] = None,
+    sensitive_patterns: Iterable[str] = (),
+    on_value: Optional[Callable[[str, str, bool], None]] = None,
+    stdin=None,
+) -> Dict[str, dict]:
+    """
+    Read parameters from a file (``-`` for stdin) and an inline JSON object.
+
+    Inline values override values from the file.
+
+    Args:
+        path: Parameters file, or ``-`` for stdin
+        inline: JSON string or dict of name -> value (or {value, sensitive})
+        file_format: Format of the file (default: from the extension or content)
+        sensitive_patterns: Glob patterns of names that are always sensitive
+        on_value: Called with (name, value, sensitive) as each value is read
+        stdin: Stream used for ``-`` (default: sys.stdin)
+
+    Returns:
+        dict of name -> {"value", "sensitive"}; sensitive is None when neither
+        the source nor a pattern says
+
+    Raises:
+        ValueError: Missing file, invalid content or invalid inline JSON
+    """
+    patterns = list(sensitive_patterns)
+    parameters: Dict[str, dict] = {}
+
+    def add(entries: Iterable[Entry]):
+        for name, value, sensitive in entries:
+            if any(fnmatch.fnmatchcase(name, p) for p in patterns):
+                sensitive = True
+            if on_value:
+                on_value(name, value, bool(sensitive))
+            parameters[name] = {"value": value, "sensitive": sensitive}
+
+    if path == "-":
+        add(iter_parameter_file(stdin or sys.stdin, "-", file_format))
+    elif path:
+        if not os.path.exists(path):
+            raise ValueError(f"Parameters file not found: {path}")
+        with open(path, encoding="utf-8") as f:
+            add(iter_parameter_file(f, path, file_format))
+
+    if isinstance(inline, str) and inline:
+        try:
+            inline = _load_json(inline)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in parameters: {e}") from e
+    if inline:
+        if not isinstance(inline, dict):
+            raise ValueError("parameters must be a JSON object with key-value pairs")
+        add(_mapping_entries(inline, "parameters"))
+    return parameters
+
@@ -0,0 +1,290 @@
+# pylint: disable=broad-exception-caught
+"""
+promote_flow - blue/green version promotion with a health-checked cutover.
+
+``change-version`` updates a running group in place, and NiFi stops the
+affected components while it swaps them, so ingest pauses for the whole
+update. ``promote-flow`` instead deploys the target version as a second
+group under the same parent, configures and starts it, and waits for it to
+pass a health check (every processor running, plus an optional HTTP probe)
+before draining and removing the old group. If the new group never becomes
+healthy it is removed and the old one is left as it was.
+
+Flows that bind a fixed resource (an HTTP listener port, say) cannot run
+twice at once; ``cutover: stop-first`` drains the old group before starting
+the new one, with the new group deployed, configured and its controller
+services enabled beforehand so the gap is only the start and health check.
+The ``downtime_seconds`` output is the time from the old group's sources
+stopping until the new group was healthy.
+"""
+
+import logging
+import os
+import time
+import urllib.error
+import urllib.request
+from typing import Optional, Tuple
+
+import nipyapi
+from nipyapi import ci
+
+from .configure_params import configure_params
+from .lifecycle import drain_flow
+from .utils import getenv_float
+from .wait_for_state import _observe, _reached, wait_for_state, wait_until
+
+log = logging.getLogger(__name__)
+
+CUTOVERS = ("overlap", "stop-first")
+
+
+def _registry_token(provider: str) -> Optional[str]:
+    """Token used to resolve tags, chosen as ``nipyapi.ci.change_flow_version`` does."""
+    if provider == "gitlab":
+        return os.environ.get("GL_REGISTRY_TOKEN")
+    return os.environ.get("GH_REGISTRY_TOKEN")
+
+
+def probe_http(url: str, expect: Optional[str] = None) -> Tuple[bool, str]:
+    """
+    Check an HTTP endpoint exposed by a flow.
+
+    Healthy means a 2xx response whose body or a header value contains
+    ``expect`` (if given).
+
+    Returns:
+        tuple of (healthy, short description of the response or error)
+    """
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:  # nosec B310 - user URL
+            body = response.read(65536).decode("utf-8", errors="replace")
+            status = response.status
+            headers = list(response.headers.values())
+    except urllib.error.HTTPError as e:
+        return False, f"HTTP {e.code}"
+    except (urllib.error.URLError, OSError) as e:
+        return False, str(getattr(e, "reason", e))
+    if not 200 <= status < 300:
+        return False, f"HTTP {status}"
+    if expect and expect not in body and not any(expect in h for h in headers):
+        return False, f"HTTP {status} without '{expect}'"
+    return True, f"HTTP {status}"
+
+
+def _wait_healthy(process_group_id: str, url: Optional[str], expect: Optional[str], timeout):
+    """Wait until every processor is running and the HTTP probe (if any) passes."""
+
+    def probe():
+        observed = _observe(process_group_id, check_controllers=False)
+        done = _reached(observed, "RUNNING", None, None)
+        if url:
+            healthy, observed["http"] = probe_http(url, expect)
+            done = done and healthy
+        return done, observed
+
+    return wait_until(probe, timeout)
+
+
+def _remove(process_group_id: str, delete_parameter_context: bool) -> dict:
+    """Stop a group, let its threads finish, then delete it."""
+    nipyapi.canvas.schedule_process_group(process_group_id, scheduled=False)
+    nipyapi.canvas.schedule_all_controllers(process_group_id, scheduled=False)
+    settled = wait_for_state(process_group_id, state="STOPPED", controllers="DISABLED")
+    if "error" in settled:
+        return settled
+    return ci.cleanup(
+        process_group_id=process_group_id,
+        delete_parameter_context=delete_parameter_context,
+        force=False,
+    )
+
+
+def promote_flow(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals,too-many-statements
+    process_group_id: Optional[str] = None,
+    version: Optional[str] = None,
+    parameters: Optional[str] = None,
+    health_url: Optional[str] = None,
+    health_expect: Optional[str] = None,
+    cutover: Optional[str] = None,
+    keep_previous: Optional[bool] = None,
+) -> dict:
+    """
+    Promote a deployed flow to another version next to the running one.
+
+    With parameters, the new group gets its own copy of the parameter
+    context (deployed with REPLACE), so updating it never restarts the old
+    group; the old copy is deleted with the old group. Without parameters
+    both groups share the context and it is kept.
+
+    Args:
+        process_group_id: Group running the current version. Env: NIFI_PROCESS_GROUP_ID
+        version: Target version (commit SHA, tag or branch). Env: NIFI_TARGET_VERSION
+            (default: latest)
+        parameters: JSON parameters to set on the new group. Env: NIFI_PARAMETERS
+        health_url: HTTP endpoint of the new group that must return 2xx.
+            Env: NIFI_HEALTH_URL
+        health_expect: Text the health response body or a header must contain.
+            Env: NIFI_HEALTH_EXPECT
+        cutover: ``overlap`` (start the new group before draining the old) or
+            ``stop-first``. Env: NIFI_PROMOTE_CUTOVER (default: overlap)
+        keep_previous: Leave the old group stopped instead of deleting it.
+            Env: NIFI_KEEP_PREVIOUS (default: false)
+
+    Deadlines for the health check and the drain: NIFI_WAIT_TIMEOUT (default: 120s each).
+
+    Returns:
+        dict with promoted ("true"/"false"), process_group_id (the new group,
+        forwarded to later steps), previous_process_group_id,
+        previous_version, deployed_version, cutover, health_seconds,
+        drain_seconds, downtime_seconds, promotion_seconds and
+        previous_deleted; error if the promotion was rolled back
+
+    Raises:
+        ValueError: Missing or invalid parameters, or the group is not
+            under version control
+
+    Example::
+
+        promote_flow(pg_id, version="v2.0.0", health_url="http://nifi:8081/health")
+        # {"promoted": "true", "process_group_id": "<new>", "downtime_seconds": "0.0",
+        #  "health_seconds": "3.2", "drain_seconds": "1.4", ...}
+    """
+    process_group_id = process_group_id or os.environ.get("NIFI_PROCESS_GROUP_ID")
+    version = version or os.environ.get("NIFI_TARGET_VERSION") or None
+    parameters = parameters or os.environ.get("NIFI_PARAMETERS") or None
+    health_url = health_url or os.environ.get("NIFI_HEALTH_URL") or None
+    health_expect = health_expect or os.environ.get("NIFI_HEALTH_EXPECT") or None
+    cutover = (cutover or os.environ.get("NIFI_PROMOTE_CUTOVER") or "overlap").lower()
+    if keep_previous is None:
+        keep_previous = bool(nipyapi.utils.getenv_bool("NIFI_KEEP_PREVIOUS", default=False))
+    timeout = getenv_float("NIFI_WAIT_TIMEOUT", 120.0)
+
+    if not process_group_id:
+        raise ValueError("process_group_id is required (or set NIFI_PROCESS_GROUP_ID)")
+    if cutover not in CUTOVERS:
+        raise ValueError(f"cutover must be one of {', '.join(CUTOVERS)}, got '{cutover}'")
+
+    started = time.monotonic()
+    old = nipyapi.canvas.get_process_group(process_group_id, "id")
+    if not old:
+        raise ValueError(f"Process group not found: {process_group_id}")
+    vci = old.component.version_control_information
+    if not vci:
+        raise ValueError(f"Process group '{old.component.name}' is not under version control")
+
+    provider = (os.environ.get("NIFI_REGISTRY_PROVIDER") or "github").lower()
+    target = ci.resolve_git_ref(
+        version, os.environ.get("NIFI_REGISTRY_REPO"), _registry_token(provider), provider
+    )
+    result = {
+        "previous_process_group_id": process_group_id,
+        "previous_version": vci.version,
+        "cutover": cutover,
+    }
+    # Without a target, an UP_TO_DATE group already runs the latest version
+    if (target and target == vci.version) or (not target and vci.state == "UP_TO_DATE"):
+        log.info("%s is already at %s; nothing to promote", old.component.name, vci.version[:12])
+        return dict(
+            result,
+            promoted="false",
+            process_group_id=process_group_id,
+            deployed_version=vci.version,
+        )
+
+    # Warm standby: deployed, configured and with controllers enabled
+    log.info(
+        "Deploying %s %s next to %s", vci.flow_id, (target or "latest")[:12], process_group_id
+    )
+    new = nipyapi.versioning.deploy_git_registry_flow(
+        registry_client_id=vci.registry_id,
+        bucket_id=vci.bucket_id,
+        flow_id=vci.flow_id,
+        parent_id=old.component.parent_group_id,
+        location=nipyapi.layout.suggest_pg_position(old.component.parent_group_id),
+        version=target,
+        branch=vci.branch,
+        parameter_context_handling="REPLACE" if parameters else None,
+    )
+    new_vci = new.component.version_control_information
+    result.update(
+        process_group_id=new.id,
+        process_group_name=new.component.name,
+        deployed_version=new_vci.version if new_vci else "unknown",
+    )
+    if parameters:
+        configure_params(new.id, parameters)
+    nipyapi.canvas.schedule_all_controllers(new.id, scheduled=True)
+
+    def roll_back(reason: str) -> dict:
+        log.warning("Promotion failed (%s); removing %s", reason, new.id)
+        try:
+            _remove(new.id, delete_parameter_context=bool(parameters))
+        except Exception as e:
+            log.warning("Could not remove %s: %s", new.id, e)
+        return dict(
+            result,
+            promoted="false",
+            process_group_id=process_group_id,
+            promotion_seconds=str(round(time.monotonic() - started, 3)),
+            error=f"{reason}; {old.component.name} ({process_group_id}) left in service",
+        )
+
+    drain_seconds, ingest_stopped = 0.0, None
+    if cutover == "stop-first":
+        ingest_stopped = time.monotonic()
+        drain = drain_flow(process_group_id, timeout)
+        drain_seconds = float(drain["drain_seconds"])
+        nipyapi.canvas.schedule_process_group(process_group_id, scheduled=False)
+        if "error" in drain:
+            ci.start_flow(process_group_id=process_group_id)
+            return roll_back(f"Previous group did not drain: {drain['error']}")
+
+    nipyapi.canvas.schedule_process_group(new.id, scheduled=True)
+    healthy, observed, _, health_seconds = _wait_healthy(
+        new.id, health_url, health_expect, timeout
+    )
+    healthy_at = time.monotonic()
+    if not healthy:
+        if cutover == "stop-first":
+            ci.start_flow(process_group_id=process_group_id)
+        return roll_back(f"New group not healthy after {timeout}s: {observed}")
+    log.info("%s healthy after %.3fs", new.id, health_seconds)
+
+    if cutover == "overlap":
+        ingest_stopped = time.monotonic()
+        drain = drain_flow(process_group_id, timeout)
+        drain_seconds = float(drain["drain_seconds"])
+        if "error" in drain:
+            # The new group serves; keep the old one's data rather than delete it
+            nipyapi.canvas.schedule_process_group(process_group_id, scheduled=False)
+            result["error"] = (
+                f"Previous group did not drain: {drain['error']}; it was stopped "
+                f"with {drain['queued_flowfiles']} FlowFile(s) queued and not deleted"
+            )
+
+    previous_deleted = False
+    if keep_previous or "error" in result:
+        nipyapi.canvas.schedule_process_group(process_group_id, scheduled=False)
+    else:
+        # A separate copy of the context was made only when parameters were given
+        removed = _remove(process_group_id, delete_parameter_context=bool(parameters))
+        previous_deleted = removed.get("deleted") == "true"
+        if "error" in removed:
+            result["error"] = f"Could not delete previous group: {removed['error']}"
+
+    downtime = max(0.0, healthy_at - ingest_stopped)
+    result.update(
+        promoted="true",
+        health_seconds=str(health_seconds),
+        drain_seconds=str(drain_seconds),
+        downtime_seconds=str(round(downtime, 3)),
+        promotion_seconds=str(round(time.monotonic() - started, 3)),
+        previous_deleted=str(previous_deleted).lower(),
+    )
+    log.info(
+        "Promoted %s -> %s (downtime %.3fs)",
+        (vci.version or "")[:12],
+        result["deployed_version"][:12],
+        downtime,
+    )
+    return result
@@ -0,0 +1,244 @@
+# pylint: disable=broad-exception-caught
+"""
+purge - drop queued FlowFiles from a process group, one drop request per connection.
+
+``nipyapi.ci.purge_flowfiles`` empties connections one at a time and waits
+for each drop request to finish before submitting the next, so a group with
+hundreds of backed-up connections takes as long as all of the drops added
+together. Here one drop request per connection is kept in flight per worker
+of a bounded pool, each polled with adaptive backoff, and progress
+(connections, FlowFiles per second, bytes removed) is logged as it goes.
+Connections can be selected by name or ID, and a maximum duration cancels
+whatever is still running so a purge never outlives the job.
+"""
+
+import fnmatch
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Optional, Union
+
+import nipyapi
+
+from .utils import getenv_int, parse_duration, parse_list
+
+log = logging.getLogger(__name__)
+
+# Seconds between progress lines
+PROGRESS_INTERVAL = 5.0
+
+# Drop request polling: start close, back off while a large queue is dropped
+_POLL_INTERVAL = 0.1
+_MAX_POLL_INTERVAL = 2.0
+
+
+def _connection_names(connection) -> List[str]:
+    """Names a connection filter can match: ID, name and ``source -> destination``."""
+    component = connection.component
+    source = (component.source.name if component.source else None) or "?"
+    destination = (component.destination.name if component.destination else None) or "?"
+    names = [connection.id, f"{source} -> {destination}"]
+    if component.name:
+        names.append(component.name)
+    return names
+
+
+def _queued(connection) -> int:
+    snapshot = connection.status.aggregate_snapshot if connection.status else None
+    return (snapshot.flow_files_queued or 0) if snapshot else 0
+
+
+def select_connections(connections: list, patterns: List[str]) -> list:
+    """Connections whose ID, name or ``source -> destination`` matches any glob pattern."""
+    if not patterns:
+        return list(connections)
+    return [
+        c
+        for c in connections
+        if any(fnmatch.fnmatchcase(n, p) for n in _connection_names(c) for p in patterns)
+    ]
+
+
+def _drop(connection_id: str, cancelled: threading.Event) -> dict:
+    """Drop one connection's queue; a cancelled drop request is removed, stopping it."""
+    api = nipyapi.nifi.FlowFileQueuesApi()
+    with nipyapi.utils.rest_exceptions():
+        request = api.create_drop_request(connection_id).drop_request
+    delay = _POLL_INTERVAL
+    while not request.finished and not cancelled.wait(delay):
+        with nipyapi.utils.rest_exceptions():
+            request = api.get_drop_request(connection_id, request.id).drop_request
+        delay = min(delay * 2, _MAX_POLL_INTERVAL)
+    if not request.finished:
+        with nipyapi.utils.rest_exceptions():
+            request = api.remove_drop_request(connection_id, request.id).drop_request
+    if request.failure_reason:
+        raise ValueError(request.failure_reason)
+    return {
+        "finished": bool(request.finished),
+        "flowfiles": request.dropped_count or 0,
+        "bytes": request.dropped_size or 0,
+    }
+
+
+def purge_flowfiles(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals,too-many-branches,too-many-statements
+    process_group_id: Optional[str] = None,
+    stop: bool = True,
+    connections: Optional[Union[str, List[str]]] = None,
+    max_workers: Optional[int] = None,
+    max_duration: Optional[str] = None,
+) -> dict:
+    """
+    Purge queued FlowFiles from a process group's connections concurrently.
+
+    Args:
+        process_group_id: ID of the process group. Env: NIFI_PROCESS_GROUP_ID
+        stop: Stop the process group before purging (recommended).
+            Default: True
+        connections: Glob patterns on connection ID, name or
+            ``source -> destination`` processor names selecting the connections
+            to purge, as a list, YAML list or comma-separated string.
+            Env: NIFI_PURGE_CONNECTIONS (default: all)
+        max_workers: Drop requests in flight at once.
+            Env: NIFI_MAX_WORKERS (default: 4)
+        max_duration: Cancel the drops still running after this long, e.g.
+            ``90s`` or ``10m``. Env: NIFI_PURGE_MAX_DURATION (default: no limit)
+
+    Returns:
+        dict with purged ("true"/"false"), stopped, connections_purged,
+        connections_selected, flowfiles_before, flowfiles_after,
+        flowfiles_removed, bytes_removed, purge_seconds and purge_rate
+        (FlowFiles per second); error if a drop failed or was cancelled
+
+    Raises:
+        ValueError: Missing or invalid parameters, or process group not found
+
+    Example::
+
+        NIFI_PURGE_CONNECTIONS="*-> PutDatabaseRecord" NIFI_PURGE_MAX_DURATION=10m \\
+            python -m nipyapi_actions purge-flowfiles
+        # {"purged": "true", "connections_purged": "12", "flowfiles_removed": "1840233",
+        #  "bytes_removed": "9418713088", "purge_rate": "61341.1", ...}
+    """
+    process_group_id = process_group_id or os.environ.get("NIFI_PROCESS_GROUP_ID")
+    patterns = parse_list(connections or os.environ.get("NIFI_PURGE_CONNECTIONS") or None)
+    max_workers = max_workers or getenv_int("NIFI_MAX_WORKERS", 4)
+    max_duration = max_duration or os.environ.get("NIFI_PURGE_MAX_DURATION") or None
+    limit = parse_duration(max_duration) if max_duration else None
+
+    if not process_group_id:
+        raise ValueError("process_group_id is required (or set NIFI_PROCESS_GROUP_ID)")
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    try:
+        process_group = nipyapi.canvas.get_process_group(process_group_id, "id")
+    except nipyapi.nifi.rest.ApiException as e:
+        if e.status == 404:
+            raise ValueError(f"Process group not found: {process_group_id}") from e
+        raise
+    if not process_group:
+        raise ValueError(f"Process group not found: {process_group_id}")
+    pg_name = process_group.component.name
+
+    if stop:
+        nipyapi.canvas.schedule_process_group(process_group_id, scheduled=False)
+    everything = nipyapi.canvas.list_all_connections(process_group_id, descendants=True) or []
+    queued_before = sum(_queued(c) for c in everything)
+    selected = select_connections(everything, patterns)
+    if patterns and not selected:
+        log.warning("No connections in %s match %s", pg_name, ", ".join(patterns))
+    # An empty queue needs no drop request
+    backed_up = [c for c in selected if _queued(c)]
+    log.info(
+        "Purging %d of %d connection(s) in %s (%d selected are empty), %d worker(s)",
+        len(backed_up),
+        len(everything),
+        pg_name,
+        len(selected) - len(backed_up),
+        max_workers,
+    )
+
+    started = time.monotonic()
+    deadline = started + limit if limit else None
+    cancelled = threading.Event()
+    totals = {"connections": 0, "flowfiles": 0, "bytes": 0}
+    failures, unfinished = [], 0
+
+    def _progress():
+        seconds = time.monotonic() - started
+        log.info(
+            "Purged %d/%d connection(s): %d FlowFile(s), %d bytes, %.1f FlowFiles/s",
+            totals["connections"],
+            len(backed_up),
+            totals["flowfiles"],
+            totals["bytes"],
+            totals["flowfiles"] / seconds if seconds else 0.0,
+        )
+
+    if backed_up:
+        pool = ThreadPoolExecutor(max_workers=min(max_workers, len(backed_up)))
+        pending = {pool.submit(_drop, c.id, cancelled): c for c in backed_up}
+        last_progress = started
+        try:
+            while pending:
+                timeout = PROGRESS_INTERVAL
+                if deadline and not cancelled.is_set():
+                    timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    connection = pending.pop(future)
+                    try:
+                        dropped = future.result()
+                    except Exception as e:
+                        log.error("Failed to purge %s: %s", connection.id, e)
+                        failures.append(connection.id)
+                        continue
+                    totals["flowfiles"] += dropped["flowfiles"]
+                    totals["bytes"] += dropped["bytes"]
+                    if dropped["finished"]:
+                        totals["connections"] += 1
+                    else:
+                        unfinished += 1
+                if time.monotonic() - last_progress >= PROGRESS_INTERVAL:
+                    _progress()
+                    last_progress = time.monotonic()
+                if deadline and time.monotonic() >= deadline and not cancelled.is_set():
+                    log.warning("Max duration %s reached; cancelling remaining drops", max_duration)
+                    cancelled.set()
+                    unfinished += sum(1 for f in pending if f.cancel())
+                    pending = {f: c for f, c in pending.items() if not f.cancelled()}
+        finally:
+            cancelled.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+    seconds = round(time.monotonic() - started, 3)
+    _progress()
+
+    status = nipyapi.canvas.get_process_group_status(process_group_id, detail="all")
+    snapshot = status.status.aggregate_snapshot if status and status.status else None
+    queued_after = (snapshot.flow_files_queued or 0) if snapshot else 0
+
+    result = {
+        "process_group_id": process_group_id,
+        "process_group_name": pg_name,
+        "purged": "false" if failures or unfinished else "true",
+        "stopped": str(stop).lower(),
+        "connections_selected": str(len(selected)),
+        "connections_purged": str(totals["connections"]),
+        "flowfiles_before": str(queued_before),
+        "flowfiles_after": str(queued_after),
+        "flowfiles_removed": str(totals["flowfiles"]),
+        "bytes_removed": str(totals["bytes"]),
+        "purge_seconds": str(seconds),
+        "purge_rate": str(round(totals["flowfiles"] / seconds, 1) if seconds else 0.0),
+    }
+    problems = []
+    if failures:
+        problems.append(f"{len(failures)} connection(s) failed: {', '.join(failures)}")
+    if unfinished:
+        problems.append(f"{unfinished} connection(s) not purged within {max_duration}")
+    if problems:
+        result["error"] = "; ".join(problems)
+    return result
@@ -0,0 +1,116 @@
+"""
+read_outputs - stream outputs back from a JSON lines sidecar (NIFI_OUTPUT_JSONL).
+
+Each line of the sidecar is one ``{"key":...,"type":...,"value":...}``
+record, so a reader never has to split ``key=value`` lines or re-parse a
+stringified list. Records for other keys are skipped by their prefix without
+being parsed, so picking one output from a large file only decodes that
+output. Later records win, as they do in GITHUB_OUTPUT.
+
+Usage::
+
+    python -m nipyapi_actions.read_outputs FILE            # JSON object of all outputs
+    python -m nipyapi_actions.read_outputs FILE KEY        # one value (strings raw)
+    python -m nipyapi_actions.read_outputs FILE KEY --items  # one JSON line per element
+"""
+
+import json
+import sys
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+
+def _key(name: str) -> str:
+    """Keys are recorded kebab-case, as GitHub outputs are named."""
+    return name.replace("_", "-")
+
+
+def iter_outputs(path: str, keys: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield (key, value) for each record in a sidecar, in file order.
+
+    Args:
+        path: Sidecar file
+        keys: Only these outputs (snake or kebab case); default: all
+
+    Raises:
+        ValueError: A selected line is not a valid record
+    """
+    prefixes = None
+    if keys is not None:
+        prefixes = tuple('{"key":%s,' % json.dumps(_key(k)) for k in keys)
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip() or (prefixes is not None and not line.startswith(prefixes)):
+                continue
+            try:
+                record = json.loads(line)
+                yield record["key"], record["value"]
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{number}: not an output record: {e}") from e
+
+
+def load_outputs(path: str, keys: Optional[Iterable[str]] = None) -> dict:
+    """Return the last value of each output in a sidecar (optionally only ``keys``)."""
+    return dict(iter_outputs(path, keys))
+
+
+def get_output(path: str, key: str, default=None):
+    """Return the last value of one output, or ``default`` if it was never written."""
+    value = default
+    for _, value in iter_outputs(path, [key]):
+        pass
+    return value
+
+
+def iter_items(path: str, key: str) -> Iterator[Any]:
+    """
+    Yield the elements of a list output (or ``[key, value]`` pairs of an object).
+
+    Only the last record for ``key`` is used.
+    """
+    value = get_output(path, key)
+    if isinstance(value, dict):
+        yield from ([k, v] for k, v in value.items())
+    elif isinstance(value, list):
+        yield from value
+    elif value is not None:
+        yield value
+
+
+def _print_value(value) -> None:
+    if isinstance(value, str):
+        sys.stdout.write(value + "\n")
+    else:
+        sys.stdout.write(json.dumps(value, default=str) + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print all outputs, one output, or one output's elements."""
+    argv = sys.argv[1:] if argv is None else argv
+    items = "--items" in argv
+    args = [a for a in argv if a != "--items"]
+    if not 1 <= len(args) <= 2 or (items and len(args) != 2):
+        sys.stderr.write(
+            "Usage: python -m nipyapi_actions.read_outputs FILE [KEY [--items]]\n"
+        )
+        return 2
+    try:
+        if len(args) == 1:
+            sys.stdout.write(json.dumps(load_outputs(args[0]), indent=2, default=str) + "\n")
+        elif items:
+            for item in iter_items(args[0], args[1]):
+                sys.stdout.write(json.dumps(item, default=str) + "\n")
+        else:
+            outputs = load_outputs(args[0], [args[1]])
+            if _key(args[1]) not in outputs:
+                sys.stderr.write(f"No output '{args[1]}' in {args[0]}\n")
+                return 1
+            _print_value(outputs[_key(args[1])])
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"{e}\n")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+registry_cache - cache Git registry listings for list-registry-flows and get-versions.
+
+Every bucket listing or version history makes NiFi's Git registry client
+call the GitHub/GitLab API, which is slow and counts against the provider's
+rate limit. Results are cached in a private directory under the job's
+temporary directory (RUNNER_TEMP on GitHub Actions), so later steps of the
+same job reuse them. Entries are keyed on NiFi endpoint, registry client,
+branch, bucket and flow, expire after a TTL, and are invalidated early when
+the branch head commit SHA (NIFI_REGISTRY_HEAD_SHA) differs from the one
+they were recorded at.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Callable, Optional, Tuple
+
+import nipyapi
+from nipyapi import ci
+
+from .utils import parse_duration, resolve_registry_client
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TTL = "10m"
+
+
+def _cache_dir() -> Optional[str]:
+    """Return the registry cache directory, or None if caching is disabled or unavailable."""
+    if not nipyapi.utils.getenv_bool("NIFI_REGISTRY_CACHE", default=True):
+        return None
+    explicit = os.environ.get("NIFI_REGISTRY_CACHE_DIR")
+    if explicit:
+        return explicit
+    runner_temp = os.environ.get("RUNNER_TEMP")
+    return os.path.join(runner_temp, "nipyapi-actions", "registry") if runner_temp else None
+
+
+def _cache_path(cache_dir: str, *key: str) -> str:
+    """Return the cache file for a key (hashed, so names and branches never hit the disk)."""
+    endpoint = (os.environ.get("NIFI_API_ENDPOINT") or "").rstrip("/")
+    digest = hashlib.sha256("\0".join((endpoint,) + key).encode()).hexdigest()[:32]
+    return os.path.join(cache_dir, f"{digest}.json")
+
+
+def head_sha(branch: Optional[str]) -> Optional[str]:
+    """
+    Resolve NIFI_REGISTRY_HEAD_SHA: a commit SHA as given, or ``auto``.
+
+    ``auto`` asks the Git provider for the head of ``branch`` (default: the
+    registry's default branch, NIFI_REGISTRY_BRANCH or main) - one cheap
+    API call instead of the listing.
+
+    Returns:
+        The head SHA, or None when not configured
+    """
+    value = os.environ.get("NIFI_REGISTRY_HEAD_SHA") or None
+    if not value or value.lower() != "auto":
+        return value
+    provider = (os.environ.get("NIFI_REGISTRY_PROVIDER") or "github").lower()
+    token_vars = ("GL_REGISTRY_TOKEN", "GH_REGISTRY_TOKEN")
+    if provider != "gitlab":
+        token_vars = token_vars[::-1]
+    token = next((os.environ[v] for v in token_vars if os.environ.get(v)), None)
+    ref = branch or os.environ.get("NIFI_REGISTRY_BRANCH") or "main"
+    return ci.resolve_git_ref(ref, os.environ.get("NIFI_REGISTRY_REPO"), token, provider)
+
+
+def read_entry(path: str, ttl: float, head: Optional[str]) -> Optional[dict]:
+    """Return a cached result if present, younger than ttl and recorded at head."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry.get("created", 0) >= ttl:
+        return None
+    if head and entry.get("head") != head:
+        return None
+    return entry.get("result")
+
+
+def write_entry(path: str, result: dict, head: Optional[str]) -> None:
+    """Write a result to the cache atomically, readable only by the current user."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")  # created 0600
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "head": head, "result": result}, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def cached(key: Tuple[str, ...], branch: Optional[str], fetch: Callable[[], dict]) -> dict:
+    """
+    Return ``fetch()`` through the cache, adding ``registry_cache`` to the result.
+
+    ``registry_cache`` is ``hit``, ``miss`` or ``off`` (no cache directory,
+    NIFI_REGISTRY_CACHE=false, or NIFI_REGISTRY_CACHE_TTL=0). Cache read and
+    write errors only cost the cache, never the command.
+    """
+    cache_dir = _cache_dir()
+    ttl = parse_duration(os.environ.get("NIFI_REGISTRY_CACHE_TTL") or DEFAULT_TTL)
+    if not cache_dir or ttl <= 0:
+        return dict(fetch(), registry_cache="off")
+
+    head = head_sha(branch)
+    path = _cache_path(cache_dir, *key)
+    result = read_entry(path, ttl, head)
+    if result is not None:
+        log.info("Registry cache hit%s", f" at {head[:12]}" if head else "")
+        return dict(result, registry_cache="hit")
+
+    result = fetch()
+    try:
+        write_entry(path, result, head)
+    except OSError as e:
+        log.warning("Could not cache registry listing: %s", e)
+    return dict(result, registry_cache="miss")
+
+
+def list_registry_flows(
+    registry_client: Optional[str] = None,
+    bucket: Optional[str] = None,
+    branch: Optional[str] = None,
+    detailed: Optional[bool] = None,
+) -> dict:
+    """
+    List flows in a Git registry bucket, through the registry cache.
+
+    Args:
+        registry_client: Registry client ID or name. Env: NIFI_REGISTRY_CLIENT_ID
+        bucket: Bucket (folder) containing flows. Env: NIFI_BUCKET
+        branch: Branch to query. Env: NIFI_FLOW_BRANCH (default: client default)
+        detailed: Include description and comments. Env: NIFI_DETAILED
+
+    Returns:
+        dict from ``nipyapi.ci.list_registry_flows`` plus registry_cache
+    """
+    registry_client = registry_client or os.environ.get("NIFI_REGISTRY_CLIENT_ID")
+    bucket = bucket or os.environ.get("NIFI_BUCKET")
+    branch = branch or os.environ.get("NIFI_FLOW_BRANCH") or None
+    if detailed is None:
+        detailed = bool(nipyapi.utils.getenv_bool("NIFI_DETAILED", default=False))
+    if not registry_client:
+        raise ValueError("registry_client is required (or set NIFI_REGISTRY_CLIENT_ID)")
+    if not bucket:
+        raise ValueError("bucket is required (or set NIFI_BUCKET)")
+
+    # A client ID keys the cache as is; a name is resolved first (one NiFi call)
+    if not nipyapi.utils.is_uuid(registry_client):
+        registry_client = resolve_registry_client(registry_client).id
+    return cached(
+        ("flows", registry_client, branch or "", bucket, str(detailed)),
+        branch,
+        lambda: ci.list_registry_flows(
+            registry_client=registry_client, bucket=bucket, branch=branch, detailed=detailed
+        ),
+    )
+
+
+def get_flow_versions(process_group_id: Optional[str] = None) -> dict:
+    """
+    Get the version history of a versioned flow, through the registry cache.
+
+    Args:
+        process_group_id: ID of the versioned process group. Env: NIFI_PROCESS_GROUP_ID
+
+    Returns:
+        dict as ``nipyapi.ci.get_flow_versions`` (flow_id, bucket_id,
+        registry_id, current_version, state, version_count, versions) plus
+        registry_cache; current_version and state always come from NiFi
+
+    Raises:
+        ValueError: Missing process group or not under version control
+    """
+    process_group_id = process_group_id or os.environ.get("NIFI_PROCESS_GROUP_ID")
+    if not process_group_id:
+        raise ValueError("process_group_id is required (or set NIFI_PROCESS_GROUP_ID)")
+
+    pg = nipyapi.canvas.get_process_group(process_group_id, "id")
+    if not pg:
+        raise ValueError(f"Process group not found: {process_group_id}")
+    vci = pg.component.version_control_information
+    if not vci:
+        raise ValueError(f"Process group '{pg.component.name}' is not under version control")
+
+    def fetch() -> dict:
+        response = nipyapi.versioning.list_git_registry_flow_versions(
+            registry_client_id=vci.registry_id,
+            bucket_id=vci.bucket_id,
+            flow_id=vci.flow_id,
+            branch=vci.branch,
+        )
+        versions = []
+        for item in response.versioned_flow_snapshot_metadata_set or []:
+            meta = item.versioned_flow_snapshot_metadata
+            versions.append(
+                {
+                    "version": meta.version,
+                    "author": meta.author,
+                    "comments": meta.comments,
+                    "timestamp": meta.timestamp,
+                    "branch": meta.branch,
+                }
+            )
+        return {"version_count": len(versions), "versions": versions}
+
+    history = cached(
+        ("versions", vci.registry_id, vci.branch or "", vci.bucket_id, vci.flow_id),
+        vci.branch,
+        fetch,
+    )
+    log.info("Found %d versions (%s)", history["version_count"], history["registry_cache"])
+    return {
+        "flow_id": vci.flow_id,
+        "bucket_id": vci.bucket_id,
+        "registry_id": vci.registry_id,
+        "current_version": vci.version,
+        "state": vci.state,
+        **history,
+    }
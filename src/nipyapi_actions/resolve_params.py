@@ -0,0 +1,183 @@
+"""
+resolve_params - resolve a process group's parameter context inheritance chain.
+
+A parameter a group sees may live in its own context or in any context that
+one inherits from, directly or through others. This fetches every context in
+the chain once - each level of inherited contexts concurrently - and builds
+an index of the effective parameters: value, owning context and sensitivity,
+plus the contexts whose definition of the same name is shadowed.
+
+Precedence follows NiFi: a context's own parameters win, then its inherited
+contexts in the order they are listed, each with its own inherited contexts
+before the next (depth first).
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import nipyapi
+from nipyapi.nifi import ParameterContextEntity
+
+from .utils import to_json
+
+log = logging.getLogger(__name__)
+
+# Contexts fetched at once per level of the inheritance chain
+MAX_FETCH_WORKERS = 8
+
+
+def _inherited_ids(ctx: ParameterContextEntity) -> List[str]:
+    return [ref.id for ref in ctx.component.inherited_parameter_contexts or []]
+
+
+def fetch_context_chain(context_id: str) -> Dict[str, ParameterContextEntity]:
+    """
+    Fetch a context and every context it inherits from, each once.
+
+    Returns:
+        dict of context ID -> fetched context entity
+
+    Raises:
+        ValueError: A context in the chain was not found
+    """
+    contexts: Dict[str, ParameterContextEntity] = {}
+    level = [context_id]
+    with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as pool:
+        while level:
+            fetched = pool.map(
+                lambda cid: nipyapi.parameters.get_parameter_context(cid, identifier_type="id"),
+                level,
+            )
+            for cid, ctx in zip(level, fetched):
+                if not ctx:
+                    raise ValueError(f"Parameter context not found: {cid}")
+                contexts[cid] = ctx
+            level = list(
+                dict.fromkeys(
+                    i for cid in level for i in _inherited_ids(contexts[cid]) if i not in contexts
+                )
+            )
+    return contexts
+
+
+def resolution_order(contexts: Dict[str, ParameterContextEntity], root_id: str) -> List[str]:
+    """Context IDs in the order NiFi resolves a parameter name (root first, depth first)."""
+    order, seen, stack = [], set(), [root_id]
+    while stack:
+        cid = stack.pop()
+        if cid in seen or cid not in contexts:
+            continue
+        seen.add(cid)
+        order.append(cid)
+        stack.extend(reversed(_inherited_ids(contexts[cid])))
+    return order
+
+
+def build_param_index(
+    contexts: Dict[str, ParameterContextEntity], root_id: str
+) -> Tuple[Dict[str, dict], List[str]]:
+    """
+    Index the effective parameters of a context.
+
+    Parameters NiFi reports as ``inherited`` in a context's listing are
+    skipped there; they are indexed from the context that owns them.
+
+    Returns:
+        tuple of (parameter name -> {value, sensitive, context, context_id,
+        inherited, shadows}, context names in resolution order); sensitive
+        values are always None
+    """
+    order = resolution_order(contexts, root_id)
+    index: Dict[str, dict] = {}
+    for cid in order:
+        ctx = contexts[cid]
+        for entity in ctx.component.parameters or []:
+            param = entity.parameter
+            if param.inherited:
+                continue
+            existing = index.get(param.name)
+            if existing is not None:
+                existing["shadows"].append(ctx.component.name)
+                continue
+            index[param.name] = {
+                "value": None if param.sensitive else param.value,
+                "sensitive": bool(param.sensitive),
+                "context": ctx.component.name,
+                "context_id": cid,
+                "inherited": cid != root_id,
+                "shadows": [],
+            }
+    return index, [contexts[cid].component.name for cid in order]
+
+
+def resolve_group_params(process_group_id: str):
+    """
+    Resolve the parameter context bound to a process group.
+
+    Returns:
+        tuple of (process group entity, contexts by ID, parameter index,
+        context names in resolution order)
+
+    Raises:
+        ValueError: Group not found or without a parameter context
+    """
+    pg = nipyapi.canvas.get_process_group(process_group_id, identifier_type="id")
+    if not pg:
+        raise ValueError(f"Process group not found: {process_group_id}")
+    if not pg.component.parameter_context:
+        raise ValueError(
+            f"Process group '{pg.component.name}' has no parameter context. "
+            "Attach a parameter context before configuring parameters."
+        )
+    root_id = pg.component.parameter_context.id
+    contexts = fetch_context_chain(root_id)
+    index, order = build_param_index(contexts, root_id)
+    log.info(
+        "Resolved %d parameter(s) from %d context(s): %s",
+        len(index),
+        len(order),
+        " -> ".join(order),
+    )
+    return pg, contexts, index, order
+
+
+def resolve_params(process_group_id: Optional[str] = None) -> dict:
+    """
+    Resolve the effective parameters of a process group, following inheritance.
+
+    Args:
+        process_group_id: ID of the process group. Env: NIFI_PROCESS_GROUP_ID
+
+    Returns:
+        dict with context_name, context_id, contexts (JSON list of context
+        names in resolution order), context_count, parameter_count,
+        inherited_count and parameters (JSON: name -> {value, sensitive,
+        context, context_id, inherited, shadows})
+
+    Raises:
+        ValueError: Missing process group, or no parameter context
+
+    Example::
+
+        resolve_params(pg_id)
+        # {"context_name": "nipyapi_test_param_parent", "context_count": "2",
+        #  "contexts": '["nipyapi_test_param_parent", "nipyapi_test_param_child"]',
+        #  "parameters": '{"child_param": {"context": "nipyapi_test_param_child",
+        #                  "inherited": true, "sensitive": false, ...}, ...}', ...}
+    """
+    process_group_id = process_group_id or os.environ.get("NIFI_PROCESS_GROUP_ID")
+    if not process_group_id:
+        raise ValueError("process_group_id is required (or set NIFI_PROCESS_GROUP_ID)")
+
+    pg, _, index, order = resolve_group_params(process_group_id)
+    return {
+        "context_name": order[0],
+        "context_id": pg.component.parameter_context.id,
+        "contexts": to_json(order),
+        "context_count": str(len(order)),
+        "parameter_count": str(len(index)),
+        "inherited_count": str(sum(1 for p in index.values() if p["inherited"])),
+        "parameters": to_json(index),
+    }
@@ -0,0 +1,172 @@
+# pylint: disable=broad-exception-caught
+"""
+runner - run one or more action commands in a single Python process.
+
+Running a chain such as ensure-registry -> deploy-flow -> start-flow as
+separate action steps pays for interpreter startup, the nipyapi import,
+login and TLS setup once per step. The runner keeps one authenticated
+nipyapi session for the whole chain and forwards IDs produced by earlier
+steps (see ``commands.FORWARDED_OUTPUTS``) into the environment of later
+ones.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import yaml
+
+from .commands import FORWARDED_OUTPUTS, get_command, input_env_vars
+from .metrics import METRICS
+
+log = logging.getLogger(__name__)
+
+Step = Tuple[str, Dict[str, str]]
+
+
+def parse_steps(spec: Union[str, list]) -> List[Step]:
+    """
+    Parse a pipeline specification into (command, env overrides) steps.
+
+    Accepts a YAML/JSON sequence, or a plain string of command names
+    separated by commas or whitespace. Sequence items are either a command
+    name or a mapping with a ``command`` key plus per-step action inputs::
+
+        - ensure-registry
+        - command: deploy-flow
+          flow: my-flow
+        - start-flow
+
+    Args:
+        spec: YAML string or already-parsed list
+
+    Returns:
+        list of (command name, {env var: value}) tuples
+
+    Raises:
+        ValueError: Empty or malformed specification
+    """
+    if isinstance(spec, str):
+        try:
+            parsed = yaml.safe_load(spec)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid commands specification: {e}") from e
+        if isinstance(parsed, str):
+            parsed = parsed.replace(",", " ").split()
+    else:
+        parsed = spec
+
+    if not parsed or not isinstance(parsed, list):
+        raise ValueError("commands must be a non-empty list of command names")
+
+    steps = []
+    for item in parsed:
+        if isinstance(item, str):
+            steps.append((item.strip(), {}))
+        elif isinstance(item, dict) and item.get("command"):
+            overrides = {}
+            for input_name, value in item.items():
+                if input_name == "command":
+                    continue
+                for env_var in input_env_vars(input_name):
+                    overrides[env_var] = "" if value is None else str(value)
+            steps.append((str(item["command"]).strip(), overrides))
+        else:
+            raise ValueError(f"Invalid pipeline step: {item!r}")
+
+    # Fail before touching NiFi if any command is unknown
+    for command, _ in steps:
+        get_command(command)
+    return steps
+
+
+@contextmanager
+def _step_env(overrides: Dict[str, str]):
+    """Apply per-step environment overrides and restore them afterwards."""
+    saved = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def run_steps(
+    steps: List[Step], on_result: Optional[Callable[[dict], None]] = None
+) -> Tuple[dict, Optional[str]]:
+    """
+    Run pipeline steps in order, stopping at the first failure.
+
+    A step fails when its result has an ``error`` key, as for a single
+    command; counts such as ``error_count`` do not.
+
+    Outputs of all completed steps are merged (later steps win on key
+    clashes). Forwarded outputs are exported to ``os.environ`` so that
+    subsequent steps pick them up through their normal env var defaults.
+
+    Args:
+        steps: Parsed steps from ``parse_steps``
+        on_result: Called with each step's result as soon as it finishes,
+            e.g. to stream outputs
+
+    Returns:
+        tuple of (merged outputs, failed command name or None)
+    """
+    outputs = {}
+    timings = []
+    failed = None
+
+    for index, (command, overrides) in enumerate(steps, start=1):
+        func = get_command(command)
+        log.info("[%d/%d] %s", index, len(steps), command)
+        METRICS.command = command
+        requests_before = METRICS.requests
+        started = time.monotonic()
+        try:
+            with _step_env(overrides):
+                result = func() or {}
+            if not isinstance(result, dict):
+                result = {"result": result}
+        except Exception as e:
+            result = {
+                "success": False,
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "command": command,
+            }
+        elapsed = round(time.monotonic() - started, 3)
+        requests = METRICS.requests - requests_before
+        timings.append(
+            {"step": index, "command": command, "seconds": elapsed, "requests": requests}
+        )
+        log.info(
+            "[%d/%d] %s finished in %.3fs (%d NiFi requests)",
+            index,
+            len(steps),
+            command,
+            elapsed,
+            requests,
+        )
+
+        outputs.update(result)
+        if on_result:
+            on_result(result)
+        if "error" in result:
+            failed = command
+            break
+
+        for key, env_var in FORWARDED_OUTPUTS.items():
+            if result.get(key):
+                os.environ[env_var] = str(result[key])
+
+    outputs["step_timings"] = timings
+    outputs["total_seconds"] = round(sum(t["seconds"] for t in timings), 3)
+    if failed:
+        outputs["failed_step"] = failed
+    return outputs, failed
@@ -0,0 +1,174 @@
+"""
+status - get-status for one process group or a fleet of them.
+
+``nipyapi.ci.get_status`` makes several requests per group (status,
+processors, ports, controllers, parameters, bulletins), so a health gate
+over dozens of groups multiplies that. Fleet mode instead reads one
+recursive status snapshot of the common parent - a single request that
+NiFi answers with per-group and per-processor run status, queue depth and
+versioned flow state for the whole subtree - and derives each group's
+summary from it locally.
+"""
+
+import logging
+import os
+from typing import Dict, List, Optional, Union
+
+import nipyapi
+from nipyapi import ci
+
+from .utils import parse_list, to_json
+
+log = logging.getLogger(__name__)
+
+# Processor run statuses counted per group (NiFi reports them title-cased)
+_RUN_STATUSES = ("running", "stopped", "invalid", "disabled")
+
+
+def _index_snapshots(root) -> Dict[str, object]:
+    """Map group ID -> ProcessGroupStatusSnapshotDTO for a recursive snapshot."""
+    snapshots, stack = {}, [root]
+    while stack:
+        snapshot = stack.pop()
+        snapshots[snapshot.id] = snapshot
+        stack.extend(
+            child.process_group_status_snapshot
+            for child in snapshot.process_group_status_snapshots or []
+        )
+    return snapshots
+
+
+def _summarise(snapshot) -> dict:
+    """Status of one group, counting processors across its whole subtree."""
+    counts = dict.fromkeys(_RUN_STATUSES, 0)
+    total, stack = 0, [snapshot]
+    while stack:
+        group = stack.pop()
+        for entity in group.processor_status_snapshots or []:
+            total += 1
+            run_status = (entity.processor_status_snapshot.run_status or "").lower()
+            if run_status in counts:
+                counts[run_status] += 1
+        stack.extend(
+            child.process_group_status_snapshot
+            for child in group.process_group_status_snapshots or []
+        )
+
+    # Same processor-centric rule as nipyapi.ci.get_status
+    if counts["running"]:
+        state = "RUNNING"
+    elif counts["stopped"]:
+        state = "STOPPED"
+    else:
+        state = "EMPTY"
+    return {
+        "name": snapshot.name,
+        "state": state,
+        "total_processors": total,
+        "running_processors": counts["running"],
+        "stopped_processors": counts["stopped"],
+        "invalid_processors": counts["invalid"],
+        "disabled_processors": counts["disabled"],
+        "queued_flowfiles": snapshot.flow_files_queued or 0,
+        "queued_bytes": snapshot.bytes_queued or 0,
+        "active_threads": snapshot.active_thread_count or 0,
+        "version_state": snapshot.versioned_flow_state or "",
+    }
+
+
+def fleet_status(process_group_ids: List[str], children_of: Optional[str] = None) -> dict:
+    """
+    Status of many process groups from one recursive status request.
+
+    Args:
+        process_group_ids: Groups to report. Empty to report every direct
+            child of ``children_of``
+        children_of: Parent to read the snapshot from; with explicit IDs it
+            narrows the request to that subtree (default: root)
+
+    Returns:
+        dict with statuses (JSON: group ID -> state, processor counts, queue
+        depth, active threads, version_state), group_count, running_groups,
+        stopped_groups, invalid_groups and missing_groups; error when a
+        requested group was not found
+
+    Raises:
+        ValueError: Neither IDs nor a parent given
+    """
+    if not process_group_ids and not children_of:
+        raise ValueError("process_group_ids or children_of is required")
+
+    parent_id = children_of or nipyapi.canvas.get_root_pg_id()
+    with nipyapi.utils.rest_exceptions():
+        status = nipyapi.nifi.FlowApi().get_process_group_status(parent_id, recursive=True)
+    root = status.process_group_status.aggregate_snapshot
+    snapshots = _index_snapshots(root)
+
+    if not process_group_ids:
+        process_group_ids = [
+            child.process_group_status_snapshot.id
+            for child in root.process_group_status_snapshots or []
+        ]
+
+    statuses, missing = {}, []
+    for pg_id in process_group_ids:
+        if pg_id in snapshots:
+            statuses[pg_id] = _summarise(snapshots[pg_id])
+        else:
+            missing.append(pg_id)
+
+    def _count(predicate) -> str:
+        return str(sum(1 for s in statuses.values() if predicate(s)))
+
+    result = {
+        "statuses": to_json(statuses),
+        "group_count": str(len(statuses)),
+        "running_groups": _count(lambda s: s["state"] == "RUNNING"),
+        "stopped_groups": _count(lambda s: s["state"] == "STOPPED"),
+        "invalid_groups": _count(lambda s: s["invalid_processors"] > 0),
+        "missing_groups": ",".join(missing),
+    }
+    log.info(
+        "Status for %d group(s): %s running, %s stopped, %s with invalid processors",
+        len(statuses),
+        result["running_groups"],
+        result["stopped_groups"],
+        result["invalid_groups"],
+    )
+    if missing:
+        result["error"] = f"Process group(s) not found under {parent_id}: {', '.join(missing)}"
+    return result
+
+
+def get_status(
+    process_group_id: Optional[str] = None,
+    process_group_ids: Optional[Union[str, List[str]]] = None,
+    children_of: Optional[str] = None,
+) -> dict:
+    """
+    Get status for one process group, or for many in fleet mode.
+
+    Args:
+        process_group_id: Single group (default: root). Env: NIFI_PROCESS_GROUP_ID
+        process_group_ids: YAML list or comma-separated IDs; enables fleet
+            mode. Env: NIFI_PROCESS_GROUP_IDS
+        children_of: Report every direct child of this group; enables fleet
+            mode. Env: NIFI_CHILDREN_OF
+
+    Returns:
+        dict from ``nipyapi.ci.get_status`` for a single group, or the
+        ``fleet_status`` outputs
+
+    Example::
+
+        get_status(children_of=parent_id)
+        # {"group_count": "12", "running_groups": "12", "invalid_groups": "0",
+        #  "statuses": '{"<id>": {"state": "RUNNING", "queued_flowfiles": 0, ...}}', ...}
+    """
+    process_group_ids = parse_list(
+        process_group_ids or os.environ.get("NIFI_PROCESS_GROUP_IDS") or None
+    )
+    children_of = children_of or os.environ.get("NIFI_CHILDREN_OF")
+    if process_group_ids or children_of:
+        return fleet_status(process_group_ids, children_of)
+    return ci.get_status(process_group_id=process_group_id)
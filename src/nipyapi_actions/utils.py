@@ -0,0 +1,112 @@
+"""
+utils - helpers shared by the action-specific commands.
+"""
+
+import json
+import os
+import re
+from typing import List, Optional
+
+import yaml
+
+
+def parse_list(value) -> List[str]:
+    """
+    Parse a list input from YAML/JSON, or comma/newline-separated text.
+
+    Args:
+        value: list, YAML/JSON sequence string, or delimited string
+
+    Returns:
+        list of non-empty stripped strings
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        try:
+            parsed = yaml.safe_load(value)
+        except yaml.YAMLError:
+            parsed = value
+        if not isinstance(parsed, list):
+            parsed = value.replace(",", "\n").splitlines()
+        value = parsed
+    return [str(item).strip() for item in value if item is not None and str(item).strip()]
+
+
+def getenv_int(name: str, default: Optional[int]) -> Optional[int]:
+    """Read an integer environment variable, raising ValueError if malformed."""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be an integer, got '{value}'") from e
+
+
+def getenv_float(name: str, default: Optional[float]) -> Optional[float]:
+    """Read a float environment variable, raising ValueError if malformed."""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be a number, got '{value}'") from e
+
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_duration(value: str) -> float:
+    """
+    Parse a duration such as ``90``, ``30s``, ``15m``, ``2h``, ``7d`` or ``1w``.
+
+    Returns:
+        Duration in seconds
+
+    Raises:
+        ValueError: Unrecognised format
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*", str(value).lower())
+    if not match:
+        raise ValueError(f"Invalid duration '{value}', expected e.g. 90, 30m, 2h or 7d")
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2) or "s"]
+
+
+def resolve_registry_client(registry_client: Optional[str], greedy: bool = False):
+    """
+    Resolve a registry client by ID or name, as the nipyapi CI functions do.
+
+    Args:
+        registry_client: Registry client ID (UUID) or name
+        greedy: Allow partial name matching
+
+    Returns:
+        The registry client entity
+
+    Raises:
+        ValueError: Not found or ambiguous
+    """
+    import nipyapi
+
+    if not registry_client:
+        raise ValueError("registry_client is required (or set NIFI_REGISTRY_CLIENT_ID)")
+    identifier_type = "id" if nipyapi.utils.is_uuid(registry_client) else "name"
+    client = nipyapi.versioning.get_registry_client(
+        registry_client, identifier_type=identifier_type, greedy=greedy
+    )
+    if client is None:
+        raise ValueError(f"Registry client not found: {registry_client}")
+    if isinstance(client, list):
+        names = [c.component.name for c in client]
+        raise ValueError(
+            f"Multiple registry clients match '{registry_client}': {names}. "
+            "Use exact name or ID, or set greedy=True to use first match."
+        )
+    return client
+
+
+def to_json(value) -> str:
+    """Serialize a mapping for a single output value (kept intact, not flattened)."""
+    return json.dumps(value, default=str, sort_keys=True)
@@ -0,0 +1,525 @@
+"""
+validate_flow - offline lint of flow definition files before they are deployed.
+
+A flow that references a parameter its context does not define, or a
+controller service that is not in scope, imports fine and only shows up as
+invalid components once it is on the canvas - typically in the middle of a
+deployment. This checks definition files (``export-flow-definition`` output
+or files from a Git flow registry) on disk, without NiFi.
+
+Each file is walked once to index its parameter contexts (with inherited
+contexts resolved), controller services by the groups that can see them and
+every component by identifier; the rules then run against that index, so a
+file is linear in its size. Many files are spread over a process pool, as
+parsing and walking large definitions is CPU-bound.
+"""
+
+import glob
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from .diff_definitions import COMPONENT_KINDS, _display_name, load_definition
+from .utils import getenv_int, parse_list, to_json
+
+log = logging.getLogger(__name__)
+
+SEVERITIES = ("error", "warning")
+
+# Extensions picked up when a directory is given
+DEFINITION_EXTENSIONS = (".json", ".yaml", ".yml")
+
+# Queues bounded below these stall their upstream under any real load
+DEFAULT_MIN_BACKPRESSURE_OBJECTS = 1000
+DEFAULT_MIN_BACKPRESSURE_SIZE = "10 MB"
+
+# ``#{name}`` references; an even run of ``#`` is an escaped literal
+_REFERENCE = re.compile(r"(#+)\{([^}]*)\}")
+_UNCLOSED_REFERENCE = re.compile(r"(?<!#)(?:##)*#\{[^}]*$")
+_PARAMETER_NAME = re.compile(r"^[A-Za-z0-9 ._-]+$")
+
+_SIZE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?B)?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+
+
+def parse_data_size(value) -> Optional[int]:
+    """Bytes in a NiFi data size such as ``1 GB``, or None if it cannot be parsed."""
+    match = _SIZE.match(str(value)) if value is not None else None
+    if not match:
+        return None
+    return int(float(match.group(1)) * _SIZE_UNITS[(match.group(2) or "B").upper()])
+
+
+def parameter_references(value: str) -> Tuple[List[str], List[str]]:
+    """
+    Parameters referenced by a property value.
+
+    Returns:
+        tuple of (parameter names, malformed references)
+    """
+    names, malformed = [], []
+    for match in _REFERENCE.finditer(value):
+        if len(match.group(1)) % 2 == 0:
+            continue
+        name = match.group(2)
+        if len(name) > 1 and name[0] == name[-1] == "'":
+            name = name[1:-1]
+        if _PARAMETER_NAME.match(name):
+            names.append(name)
+        else:
+            malformed.append(match.group(0)[len(match.group(1)) - 1 :])
+    unclosed = _UNCLOSED_REFERENCE.search(value)
+    if unclosed:
+        malformed.append("#" + unclosed.group(0).lstrip("#"))
+    return names, malformed
+
+
+def _context_parameters(contexts: dict, name: str) -> Optional[Dict[str, dict]]:
+    """Parameters visible through a context, own first then inherited in order."""
+    if name not in contexts:
+        return None
+    parameters: Dict[str, dict] = {}
+    seen, queue = set(), [name]
+    while queue:
+        current = queue.pop(0)
+        if current in seen or current not in contexts:
+            continue
+        seen.add(current)
+        for param in contexts[current].get("parameters") or []:
+            parameters.setdefault(param.get("name"), dict(param, context=current))
+        queue.extend(contexts[current].get("inheritedParameterContexts") or [])
+    return parameters
+
+
+class _Linter:  # pylint: disable=too-few-public-methods
+    """Rules run against one definition; findings collect on ``findings``."""
+
+    def __init__(self, path: str, definition: dict, min_objects: int, min_size: int):
+        self.path = path
+        self.definition = definition
+        self.min_objects = min_objects
+        self.min_size = min_size
+        self.findings: List[dict] = []
+        self.contexts = definition.get("parameterContexts") or {}
+        self.external = set(definition.get("externalControllerServices") or {})
+        # identifier -> (kind, name, group path, group identifier)
+        self.components: Dict[str, Tuple[str, str, str, str]] = {}
+        # service identifier -> identifier of the group that contains it
+        self.services: Dict[str, str] = {}
+        self.groups: List[Tuple[dict, str, Tuple[str, ...]]] = []
+        self.service_references: Dict[str, int] = {}
+        self.parameter_uses: Dict[str, set] = {}
+
+    def add(self, severity, rule, kind, component, group, message):
+        self.findings.append(
+            {
+                "file": self.path,
+                "severity": severity,
+                "rule": rule,
+                "kind": kind,
+                "id": component.get("identifier") or component.get("name") or "",
+                "name": component.get("name") or "",
+                "group": group,
+                "message": message,
+            }
+        )
+
+    def index(self) -> None:
+        """Walk every group once (iteratively), recording ancestry and components."""
+        root = self.definition["flowContents"]
+        root_id = root.get("identifier", "root")
+        stack = [(root, root.get("name", ""), (root_id,))]
+        while stack:
+            group, path, ancestry = stack.pop()
+            self.groups.append((group, path, ancestry))
+            for list_key, kind in COMPONENT_KINDS.items():
+                for component in group.get(list_key) or []:
+                    identifier = component.get("identifier") or component.get("name")
+                    self.components[identifier] = (
+                        kind,
+                        component.get("name") or "",
+                        path,
+                        ancestry[-1],
+                    )
+                    if kind == "controller_service":
+                        self.services[identifier] = ancestry[-1]
+                    elif kind == "process_group":
+                        stack.append(
+                            (
+                                component,
+                                f"{path}/{component.get('name', '')}",
+                                ancestry + (identifier,),
+                            )
+                        )
+
+    def check_properties(self, kind, component, path, ancestry, parameters, context_name):
+        """Parameter references and controller service references of one component."""
+        descriptors = component.get("propertyDescriptors") or {}
+        for prop, value in (component.get("properties") or {}).items():
+            if not isinstance(value, str):
+                continue
+            descriptor = descriptors.get(prop) or {}
+            if descriptor.get("identifiesControllerService") or value in self.services:
+                self._check_service(kind, component, path, ancestry, prop, value)
+            if "#{" not in value:
+                continue
+            names, malformed = parameter_references(value)
+            for reference in malformed:
+                self.add(
+                    "error",
+                    "invalid-parameter-reference",
+                    kind,
+                    component,
+                    path,
+                    f"Property '{prop}' has a malformed parameter reference '{reference}'",
+                )
+            for name in names:
+                self._check_parameter(
+                    kind, component, path, prop, name, descriptor, parameters, context_name
+                )
+
+    def _check_service(self, kind, component, path, ancestry, prop, value):
+        self.service_references[value] = self.service_references.get(value, 0) + 1
+        if value in self.external or "#{" in value:
+            return
+        if value not in self.services:
+            self.add(
+                "error",
+                "missing-controller-service",
+                kind,
+                component,
+                path,
+                f"Property '{prop}' references controller service {value}, "
+                "which is not in the definition",
+            )
+        elif self.services[value] not in ancestry:
+            self.add(
+                "error",
+                "controller-service-out-of-scope",
+                kind,
+                component,
+                path,
+                f"Property '{prop}' references controller service "
+                f"'{self.components[value][1]}' in {self.components[value][2]}, "
+                "which is not this group or one of its parents",
+            )
+
+    def _check_parameter(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self, kind, component, path, prop, name, descriptor, parameters, context_name
+    ):
+        if context_name is None:
+            self.add(
+                "error",
+                "no-parameter-context",
+                kind,
+                component,
+                path,
+                f"Property '{prop}' references #{{{name}}} but the group has no parameter context",
+            )
+            return
+        if parameters is None:
+            return  # reported once per group as unknown-parameter-context
+        param = parameters.get(name)
+        if param is None:
+            self.add(
+                "error",
+                "missing-parameter",
+                kind,
+                component,
+                path,
+                f"Property '{prop}' references #{{{name}}}, not defined in "
+                f"'{context_name}' or the contexts it inherits",
+            )
+            return
+        self.parameter_uses.setdefault(param["context"], set()).add(name)
+        if bool(param.get("sensitive")) != bool(descriptor.get("sensitive")):
+            which = ("sensitive", "non-sensitive")
+            if not param.get("sensitive"):
+                which = which[::-1]
+            self.add(
+                "error",
+                "sensitive-parameter-mismatch",
+                kind,
+                component,
+                path,
+                f"{which[0].capitalize()} parameter #{{{name}}} used in "
+                f"{which[1]} property '{prop}'",
+            )
+
+    def check_connection(self, connection, path):
+        """Connection ends and back pressure thresholds."""
+        connection = dict(connection, name=_display_name("connection", connection))
+        for end in ("source", "destination"):
+            target = (connection.get(end) or {}).get("id")
+            if target and target not in self.components:
+                self.add(
+                    "error",
+                    "dangling-connection",
+                    "connection",
+                    connection,
+                    path,
+                    f"Connection {end} {target} is not in the definition",
+                )
+        objects = connection.get("backPressureObjectThreshold")
+        size_text = connection.get("backPressureDataSizeThreshold")
+        size = parse_data_size(size_text)
+        if objects == 0 and size == 0:
+            self.add(
+                "warning",
+                "backpressure-disabled",
+                "connection",
+                connection,
+                path,
+                "Back pressure is disabled; the queue can grow until NiFi runs out of "
+                "heap or content repository",
+            )
+            return
+        if objects and objects < self.min_objects:
+            self.add(
+                "warning",
+                "backpressure-low",
+                "connection",
+                connection,
+                path,
+                f"Back pressure object threshold {objects} is below "
+                f"{self.min_objects}; upstream stalls under load",
+            )
+        if size and size < self.min_size:
+            self.add(
+                "warning",
+                "backpressure-low",
+                "connection",
+                connection,
+                path,
+                f"Back pressure data size threshold {size_text} is below "
+                f"{self.min_size} bytes; upstream stalls under load",
+            )
+
+    def run(self) -> List[dict]:
+        self.index()
+        for group, path, ancestry in self.groups:
+            context_name = group.get("parameterContextName") or None
+            parameters = None
+            if context_name:
+                parameters = _context_parameters(self.contexts, context_name)
+                if parameters is None:
+                    self.add(
+                        "error",
+                        "unknown-parameter-context",
+                        "process_group",
+                        group,
+                        path,
+                        f"Parameter context '{context_name}' is not in the definition",
+                    )
+            for list_key, kind in (
+                ("processors", "processor"),
+                ("controllerServices", "controller_service"),
+            ):
+                for component in group.get(list_key) or []:
+                    self.check_properties(
+                        kind, component, path, ancestry, parameters, context_name
+                    )
+            for connection in group.get("connections") or []:
+                self.check_connection(connection, path)
+
+        for identifier in self.services:
+            if identifier not in self.service_references:
+                kind, name, path, _ = self.components[identifier]
+                self.add(
+                    "warning",
+                    "unused-controller-service",
+                    kind,
+                    {"identifier": identifier, "name": name},
+                    path,
+                    "Controller service is not referenced by any component",
+                )
+        for ctx_name, ctx in self.contexts.items():
+            for inherited in ctx.get("inheritedParameterContexts") or []:
+                if inherited not in self.contexts:
+                    self.add(
+                        "error",
+                        "unknown-parameter-context",
+                        "parameter_context",
+                        {"identifier": ctx_name, "name": ctx_name},
+                        "",
+                        f"Inherited parameter context '{inherited}' is not in the definition",
+                    )
+            used = self.parameter_uses.get(ctx_name, set())
+            for param in ctx.get("parameters") or []:
+                if param.get("name") not in used and not param.get("provided"):
+                    self.add(
+                        "warning",
+                        "unused-parameter",
+                        "parameter",
+                        {"identifier": f"{ctx_name}/{param.get('name')}", **param},
+                        ctx_name,
+                        "Parameter is not referenced by any component",
+                    )
+        return self.findings
+
+
+def validate_file(path: str, min_objects: int, min_size: int) -> Tuple[List[dict], int]:
+    """
+    Lint one definition file.
+
+    Returns:
+        tuple of (findings, component count); an unreadable file is one
+        ``invalid-definition`` error
+    """
+    try:
+        definition = load_definition(path)
+    except (ValueError, OSError) as e:
+        finding = {"file": path, "severity": "error", "rule": "invalid-definition"}
+        finding.update(kind="file", id=path, name=os.path.basename(path), group="")
+        return [dict(finding, message=str(e))], 0
+    linter = _Linter(path, definition, min_objects, min_size)
+    return linter.run(), len(linter.components)
+
+
+def expand_paths(patterns: List[str]) -> List[str]:
+    """Files named by paths, globs (``**`` recurses) and directories (searched recursively)."""
+    paths = []
+    for pattern in patterns:
+        matches = [pattern]
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                log.warning("No files match %s", pattern)
+        for match in matches:
+            if os.path.isdir(match):
+                for root, _, names in os.walk(match):
+                    paths.extend(
+                        os.path.join(root, n)
+                        for n in sorted(names)
+                        if n.lower().endswith(DEFINITION_EXTENSIONS)
+                    )
+            else:
+                paths.append(match)
+    return list(dict.fromkeys(paths))
+
+
+def validate_flow(  # pylint: disable=too-many-locals
+    file_path: Optional[Union[str, List[str]]] = None,
+    max_items: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    fail_on: Optional[str] = None,
+) -> dict:
+    """
+    Lint flow definition files without NiFi.
+
+    Rules (severity): ``invalid-definition``, ``missing-parameter``,
+    ``no-parameter-context``, ``unknown-parameter-context``,
+    ``invalid-parameter-reference``, ``sensitive-parameter-mismatch``,
+    ``missing-controller-service``, ``controller-service-out-of-scope`` and
+    ``dangling-connection`` (error); ``unused-controller-service``,
+    ``unused-parameter``, ``backpressure-disabled`` and ``backpressure-low``
+    (warning). The back pressure floor is set with
+    NIFI_VALIDATE_MIN_BACKPRESSURE_OBJECTS (default: 1000) and
+    NIFI_VALIDATE_MIN_BACKPRESSURE_SIZE (default: 10 MB).
+
+    Args:
+        file_path: Definition files, directories or globs, as a list, YAML list
+            or comma-separated string. Env: NIFI_FLOW_FILE_PATH
+        max_items: Most findings listed in ``findings``; counts are always
+            complete. Env: NIFI_VALIDATE_MAX_ITEMS (default: 200)
+        max_workers: Processes used when there are several files.
+            Env: NIFI_MAX_WORKERS (default: CPU count)
+        fail_on: ``error`` or ``warning``: the lowest severity that fails the
+            step. Env: NIFI_VALIDATE_FAIL_ON (default: error)
+
+    Returns:
+        dict with valid ("true"/"false"), file_count, component_count,
+        error_count, warning_count, summary (JSON: rule -> count), findings
+        (JSON list of {file, severity, rule, kind, id, name, group, message})
+        and truncated; error if a finding at or above fail_on was reported
+
+    Raises:
+        ValueError: Missing or invalid parameters, or no files matched
+
+    Example::
+
+        NIFI_FLOW_FILE_PATH="flows/**/*.json" python -m nipyapi_actions validate-flow
+        # {"valid": "false", "file_count": "14", "error_count": "1", "warning_count": "3",
+        #  "summary": '{"backpressure-low": 3, "missing-parameter": 1}', ...}
+    """
+    patterns = parse_list(file_path or os.environ.get("NIFI_FLOW_FILE_PATH") or None)
+    if max_items is None:
+        max_items = getenv_int("NIFI_VALIDATE_MAX_ITEMS", 200)
+    max_workers = max_workers or getenv_int("NIFI_MAX_WORKERS", os.cpu_count() or 1)
+    fail_on = (fail_on or os.environ.get("NIFI_VALIDATE_FAIL_ON") or "error").lower()
+    min_objects = getenv_int(
+        "NIFI_VALIDATE_MIN_BACKPRESSURE_OBJECTS", DEFAULT_MIN_BACKPRESSURE_OBJECTS
+    )
+    min_size_text = (
+        os.environ.get("NIFI_VALIDATE_MIN_BACKPRESSURE_SIZE") or DEFAULT_MIN_BACKPRESSURE_SIZE
+    )
+    min_size = parse_data_size(min_size_text)
+
+    if not patterns:
+        raise ValueError("file_path is required (or set NIFI_FLOW_FILE_PATH)")
+    if max_items < 0:
+        raise ValueError(f"max_items must be zero or more, got {max_items}")
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    if fail_on not in SEVERITIES:
+        raise ValueError(f"fail_on must be one of {', '.join(SEVERITIES)}, got '{fail_on}'")
+    if min_size is None:
+        raise ValueError(f"Invalid data size: {min_size_text}")
+
+    paths = expand_paths(patterns)
+    if not paths:
+        raise ValueError(f"No flow definition files match {', '.join(patterns)}")
+
+    workers = min(max_workers, len(paths))
+    if workers > 1:
+        log.info("Validating %d file(s) with %d process(es)", len(paths), workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(
+                pool.map(
+                    validate_file,
+                    paths,
+                    [min_objects] * len(paths),
+                    [min_size] * len(paths),
+                    chunksize=max(1, len(paths) // (workers * 4)),
+                )
+            )
+    else:
+        results = [validate_file(p, min_objects, min_size) for p in paths]
+
+    findings = [finding for file_findings, _ in results for finding in file_findings]
+    findings.sort(
+        key=lambda f: (SEVERITIES.index(f["severity"]), f["file"], f["group"], f["rule"], f["id"])
+    )
+    counts = {severity: 0 for severity in SEVERITIES}
+    summary: Dict[str, int] = {}
+    for finding in findings:
+        counts[finding["severity"]] += 1
+        summary[finding["rule"]] = summary.get(finding["rule"], 0) + 1
+    components = sum(count for _, count in results)
+    failing = counts["error"] + (counts["warning"] if fail_on == "warning" else 0)
+
+    log.info(
+        "Validated %d file(s), %d component(s): %d error(s), %d warning(s)",
+        len(paths),
+        components,
+        counts["error"],
+        counts["warning"],
+    )
+    result = {
+        "valid": "false" if failing else "true",
+        "file_count": str(len(paths)),
+        "component_count": str(components),
+        "error_count": str(counts["error"]),
+        "warning_count": str(counts["warning"]),
+        "summary": to_json(dict(sorted(summary.items()))),
+        "findings": to_json(findings[:max_items]),
+        "truncated": "true" if len(findings) > max_items else "false",
+    }
+    if failing:
+        result["error"] = (
+            f"Flow validation failed: {counts['error']} error(s), "
+            f"{counts['warning']} warning(s)"
+        )
+    return result
@@ -0,0 +1,202 @@
+"""
+wait_for_state - poll a process group until it reaches a target state.
+"""
+
+import logging
+import os
+import time
+from typing import Callable, Optional, Tuple
+
+import nipyapi
+
+from .utils import getenv_float, getenv_int
+
+log = logging.getLogger(__name__)
+
+RUN_STATES = ("RUNNING", "STOPPED")
+CONTROLLER_STATES = ("ENABLED", "DISABLED")
+
+# Adaptive backoff: poll quickly while things change, slow down while they don't
+BACKOFF_FACTOR = 1.5
+MAX_INTERVAL = 5.0
+
+
+def wait_until(
+    probe: Callable[[], Tuple[bool, object]],
+    timeout: float,
+    interval: float = 0.25,
+) -> Tuple[bool, object, int, float]:
+    """
+    Call ``probe`` with adaptive backoff until it reports done or the deadline passes.
+
+    The interval grows by ``BACKOFF_FACTOR`` (up to ``MAX_INTERVAL``) while the
+    observation is unchanged and resets to ``interval`` when it changes, so
+    settling flows are polled closely without hammering an idle one. Sleeps
+    never overshoot the deadline.
+
+    Args:
+        probe: Callable returning (done, observation)
+        timeout: Deadline in seconds from now
+        interval: Initial poll interval in seconds
+
+    Returns:
+        tuple of (done, last observation, polls, seconds waited)
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    delay = interval
+    polls = 0
+    previous = None
+    while True:
+        done, observed = probe()
+        polls += 1
+        if done:
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        if observed != previous:
+            delay = interval
+        else:
+            delay = min(delay * BACKOFF_FACTOR, MAX_INTERVAL)
+        previous = observed
+        time.sleep(min(delay, remaining))
+    return done, observed, polls, round(time.monotonic() - started, 3)
+
+
+def _observe(process_group_id: str, check_controllers: bool) -> dict:
+    """Snapshot the run state, threads, queue and (optionally) controller states."""
+    pg = nipyapi.canvas.get_process_group_status(process_group_id, detail="all")
+    if not pg:
+        raise ValueError(f"Process group not found: {process_group_id}")
+    snapshot = pg.status.aggregate_snapshot if pg.status else None
+    observed = {
+        "running_processors": pg.running_count or 0,
+        "stopped_processors": pg.stopped_count or 0,
+        "active_threads": (snapshot.active_thread_count or 0) if snapshot else 0,
+        "queued_flowfiles": (snapshot.flow_files_queued or 0) if snapshot else 0,
+    }
+    if check_controllers:
+        controllers = nipyapi.canvas.list_all_controllers(process_group_id, descendants=True)
+        states = [
+            # Invalid services can never be enabled; do not wait for them
+            "INVALID" if c.component.validation_status == "INVALID" else c.component.state
+            for c in controllers or []
+        ]
+        observed["enabled_controllers"] = states.count("ENABLED")
+        observed["disabled_controllers"] = states.count("DISABLED")
+        observed["invalid_controllers"] = states.count("INVALID")
+        # ENABLING / DISABLING
+        observed["pending_controllers"] = len(states) - sum(
+            states.count(s) for s in ("ENABLED", "DISABLED", "INVALID")
+        )
+    return observed
+
+
+def _reached(observed: dict, state, queue, controllers) -> bool:
+    """Check an observation against the requested targets."""
+    if state == "RUNNING" and (
+        observed["stopped_processors"] > 0 or observed["running_processors"] == 0
+    ):
+        return False
+    if state == "STOPPED" and (observed["running_processors"] > 0 or observed["active_threads"]):
+        return False
+    if queue is not None and observed["queued_flowfiles"] > queue:
+        return False
+    if controllers == "ENABLED" and (
+        observed["pending_controllers"] or observed["disabled_controllers"]
+    ):
+        return False
+    if controllers == "DISABLED" and (
+        observed["pending_controllers"] or observed["enabled_controllers"]
+    ):
+        return False
+    return True
+
+
+def wait_for_state(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    process_group_id: Optional[str] = None,
+    state: Optional[str] = None,
+    queue: Optional[int] = None,
+    controllers: Optional[str] = None,
+    timeout: Optional[float] = None,
+    interval: Optional[float] = None,
+) -> dict:
+    """
+    Wait until a process group reaches the requested state.
+
+    All given targets must hold at the same time. STOPPED also requires that
+    no threads are still active, so the group is safe to modify or delete.
+
+    Args:
+        process_group_id: ID of the process group. Env: NIFI_PROCESS_GROUP_ID
+        state: Target run state, RUNNING or STOPPED. Env: NIFI_WAIT_STATE
+        queue: Maximum queued FlowFiles, 0 for empty. Env: NIFI_WAIT_QUEUE
+        controllers: Target controller service state, ENABLED or DISABLED.
+            Env: NIFI_WAIT_CONTROLLERS
+        timeout: Deadline in seconds. Env: NIFI_WAIT_TIMEOUT (default: 120)
+        interval: Initial poll interval in seconds.
+            Env: NIFI_WAIT_INTERVAL (default: 0.25)
+
+    Returns:
+        dict with reached, polls, waited_seconds and the last observed
+        counts; includes ``error`` if the deadline passed first
+
+    Raises:
+        ValueError: Missing or invalid parameters
+
+    Example::
+
+        # Wait for a deployed flow to drain and stop
+        NIFI_WAIT_STATE=STOPPED NIFI_WAIT_QUEUE=0 python -m nipyapi_actions wait-for-state
+    """
+    process_group_id = process_group_id or os.environ.get("NIFI_PROCESS_GROUP_ID")
+    state = (state or os.environ.get("NIFI_WAIT_STATE") or "").upper() or None
+    controllers = (controllers or os.environ.get("NIFI_WAIT_CONTROLLERS") or "").upper() or None
+    if queue is None:
+        queue = getenv_int("NIFI_WAIT_QUEUE", None)
+    timeout = getenv_float("NIFI_WAIT_TIMEOUT", 120.0) if timeout is None else timeout
+    interval = getenv_float("NIFI_WAIT_INTERVAL", 0.25) if interval is None else interval
+
+    if not process_group_id:
+        raise ValueError("process_group_id is required (or set NIFI_PROCESS_GROUP_ID)")
+    if state and state not in RUN_STATES:
+        raise ValueError(f"state must be one of {', '.join(RUN_STATES)}, got '{state}'")
+    if controllers and controllers not in CONTROLLER_STATES:
+        raise ValueError(
+            f"controllers must be one of {', '.join(CONTROLLER_STATES)}, got '{controllers}'"
+        )
+    if not (state or controllers or queue is not None):
+        raise ValueError(
+            "At least one target is required: state, queue or controllers "
+            "(or set NIFI_WAIT_STATE / NIFI_WAIT_QUEUE / NIFI_WAIT_CONTROLLERS)"
+        )
+
+    targets = []
+    if state:
+        targets.append(f"state={state}")
+    if queue is not None:
+        targets.append(f"queue<={queue}")
+    if controllers:
+        targets.append(f"controllers={controllers}")
+    targets = ", ".join(targets)
+    log.info("Waiting up to %ss for %s (%s)", timeout, process_group_id, targets)
+
+    def probe():
+        observed = _observe(process_group_id, check_controllers=bool(controllers))
+        return _reached(observed, state, queue, controllers), observed
+
+    reached, observed, polls, waited = wait_until(probe, timeout, interval)
+
+    result = {
+        "process_group_id": process_group_id,
+        "reached": str(reached).lower(),
+        "polls": str(polls),
+        "waited_seconds": str(waited),
+    }
+    result.update({key: str(value) for key, value in observed.items()})
+    if reached:
+        log.info("Reached %s after %.3fs (%d polls)", targets, waited, polls)
+    else:
+        result["error"] = f"Timed out after {timeout}s waiting for {targets}"
+    return result
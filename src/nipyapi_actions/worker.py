@@ -0,0 +1,440 @@
+# pylint: disable=broad-exception-caught
+"""
+worker - one long-lived runner per job, driven over a Unix socket.
+
+Each GitLab fragment is a separate script line, so a job of ten fragments
+pays interpreter startup, the nipyapi import and a NiFi login ten times.
+``worker start`` launches a background process that does all of that once
+and then serves commands sent by ``worker run`` over a Unix socket in a
+directory only the current user can enter. The client is standard library
+only: it sends its arguments, working directory, environment and, when an
+input is ``-``, its stdin; it prints the outputs and progress the worker
+returns and exits with the command's status, so ``... | tee -a outputs.env``
+keeps working unchanged.
+
+Outputs the runner forwards between steps (registry client and process
+group IDs) are remembered across requests, so later commands find them
+without ``load-outputs``; a value the client sets itself always wins.
+
+Usage::
+
+    python -m nipyapi_actions.worker start
+    python -m nipyapi_actions.worker run deploy-flow --flow my-flow | tee -a outputs.env
+    python -m nipyapi_actions.worker run cleanup --delete-parameter-context --force
+    python -m nipyapi_actions.worker stop
+
+Options are action inputs (``--file-path x``, ``--force``); an option with
+no value is ``true``. Several commands in one ``run`` form a pipeline. When
+no worker is running, ``run`` executes the commands in-process instead.
+"""
+
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+log = logging.getLogger(__name__)
+
+DEFAULT_IDLE_TIMEOUT = "30m"
+START_TIMEOUT = 60
+
+
+def socket_path() -> str:
+    """
+    Return the worker socket path.
+
+    NIFI_WORKER_SOCKET, else a per-user directory under the temp dir with
+    one socket per CI job (CI_JOB_ID), so jobs sharing a runner never meet.
+    """
+    explicit = os.environ.get("NIFI_WORKER_SOCKET")
+    if explicit:
+        return explicit
+    directory = os.path.join(tempfile.gettempdir(), f"nipyapi-actions-{os.getuid()}")
+    return os.path.join(directory, f"worker-{os.environ.get('CI_JOB_ID') or 'local'}.sock")
+
+
+def parse_args(argv: List[str]) -> list:
+    """
+    Turn ``command [--input [value]] ...`` arguments into a pipeline spec.
+
+    Option names are action inputs; underscores are accepted for nipyapi CLI
+    habits (``--delete_parameter_context``). An option takes the next
+    argument as its value unless that is another option or the end, in which
+    case it is ``true``; use ``--input=value`` where that is ambiguous.
+
+    Returns:
+        list of ``{"command": ..., input: value}`` items for ``parse_steps``
+
+    Raises:
+        ValueError: No command, or an option before the first command
+    """
+    spec, index = [], 0
+    while index < len(argv):
+        arg = argv[index]
+        if arg.startswith("--"):
+            if not spec:
+                raise ValueError(f"Option {arg} must follow a command")
+            name, has_value, value = arg[2:].partition("=")
+            if not has_value:
+                following = argv[index + 1] if index + 1 < len(argv) else None
+                if following is None or following.startswith("--"):
+                    value = "true"
+                else:
+                    value, index = following, index + 1
+            spec[-1][name.replace("_", "-")] = value
+        else:
+            spec.append({"command": arg})
+        index += 1
+    if not spec:
+        raise ValueError("command is required")
+    return spec
+
+
+def _request(path: str, request: dict) -> dict:
+    """Send one request to the worker and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        conn.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        conn.shutdown(socket.SHUT_WR)
+        with conn.makefile("rb") as reader:
+            return json.loads(reader.read() or b"{}")
+
+
+def _ping(path: str) -> bool:
+    try:
+        return _request(path, {"op": "ping"}).get("exit") == 0
+    except (OSError, ValueError):
+        return False
+
+
+def _wants_stdin(argv: List[str], env: dict) -> bool:
+    """Whether a command reads from stdin (an input or NIFI_PARAMETERS_FILE set to ``-``)."""
+    try:
+        spec = parse_args(argv)
+    except ValueError:
+        return False
+    return env.get("NIFI_PARAMETERS_FILE") == "-" or any(
+        value == "-" for step in spec for key, value in step.items() if key != "command"
+    )
+
+
+@contextlib.contextmanager
+def _request_context(env: dict, cwd: str, remembered: dict, stdin: Optional[str] = None):
+    """Run with the client's environment, working directory and stdin, then restore ours."""
+    saved_env, saved_cwd, saved_stdin = dict(os.environ), os.getcwd(), sys.stdin
+    os.environ.clear()
+    os.environ.update({k: v for k, v in remembered.items() if not env.get(k)})
+    os.environ.update(env)
+    os.chdir(cwd)
+    # The worker's own stdin is /dev/null; a command reading "-" gets the client's
+    sys.stdin = io.StringIO(stdin or "")
+    try:
+        yield
+    finally:
+        sys.stdin = saved_stdin
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+
+
+class Worker:
+    """
+    The serving side: one NiFi session reused by every request.
+
+    Args:
+        token: Bearer token from the initial login, refreshed when it nears
+            expiry
+    """
+
+    def __init__(self, token: Optional[str]):
+        self.token = token
+        self.remembered = {}
+        self.served = 0
+
+    def _refresh_login(self) -> None:
+        from .auth import EXPIRY_MARGIN, login, token_expiry
+
+        if self.token and token_expiry(self.token) - EXPIRY_MARGIN <= time.time():
+            log.info("NiFi token about to expire, logging in again")
+            self.token, _ = login()
+
+    def run(self, request: dict) -> dict:
+        """
+        Run one ``run`` request.
+
+        Returns:
+            dict with exit (0 or 1), stdout (formatted outputs) and stderr
+            (progress log for this request)
+        """
+        # pylint: disable=import-outside-toplevel
+        from nipyapi.cli import LogCapture
+
+        from .__main__ import _log_level, _log_on_error
+        from .commands import FORWARDED_OUTPUTS
+        from .metrics import METRICS
+        from .metrics import to_output as metrics_output
+        from .outputs import OutputSink, detect_output_format, jsonl_output_path
+        from .runner import parse_steps, run_steps
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        progress = logging.StreamHandler(stderr)
+        progress.setFormatter(logging.Formatter("%(message)s"))
+        package_logger = logging.getLogger(__package__)
+        package_logger.addHandler(progress)
+        log_capture = LogCapture()
+        log_capture.setLevel(logging.DEBUG)
+        log_capture.setFormatter(logging.Formatter("%(name)s: %(message)s"))
+        nipyapi_logger = logging.getLogger("nipyapi")
+        nipyapi_logger.addHandler(log_capture)
+
+        env, cwd = request.get("env") or {}, request.get("cwd") or "/"
+        failed = True
+        try:
+            with _request_context(env, cwd, self.remembered, request.get("stdin")):
+                sink = OutputSink(
+                    detect_output_format(),
+                    os.environ.get("NIFI_OUTPUT_FILE") or None,
+                    stdout,
+                    jsonl_path=jsonl_output_path(),
+                )
+                try:
+                    steps = parse_steps(parse_args(request.get("argv") or []))
+                except ValueError as e:
+                    sink.write({"success": False, "error": str(e)})
+                    sink.close()
+                    return {"exit": 1, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+                self._refresh_login()
+                METRICS.reset()
+                outputs, failed = run_steps(steps, on_result=sink.write)
+                self.served += 1
+
+                for key, env_var in FORWARDED_OUTPUTS.items():
+                    if outputs.get(key):
+                        self.remembered[env_var] = str(outputs[key])
+
+                extra = {"token_source": "worker", "metrics": metrics_output(METRICS.summary())}
+                if sink.jsonl_path:
+                    extra["outputs_file"] = sink.jsonl_path
+                if len(steps) > 1:
+                    for key in ("step_timings", "total_seconds", "failed_step"):
+                        if key in outputs:
+                            extra[key] = outputs[key]
+                if failed:
+                    if _log_on_error():
+                        extra["logs"] = log_capture.get_all_logs()
+                elif _log_level() is not None:
+                    logs = log_capture.get_logs(min_level=_log_level())
+                    if logs:
+                        extra["logs"] = logs
+                sink.write(extra)
+                sink.close()
+        finally:
+            package_logger.removeHandler(progress)
+            nipyapi_logger.removeHandler(log_capture)
+        return {
+            "exit": 1 if failed else 0,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
+
+
+def serve(path: Optional[str] = None) -> int:
+    """
+    Log in once and serve requests on the socket until ``stop`` or idle timeout.
+
+    Idle timeout: NIFI_WORKER_IDLE_TIMEOUT (default: 30m), so a job that
+    never stops its worker does not leave it running on a shell executor.
+
+    Returns:
+        Exit code: 0 after a clean stop, 1 if the initial login failed
+    """
+    # pylint: disable=import-outside-toplevel
+    from .__main__ import _NO_AUTH_CONFIGURED
+    from .auth import login
+    from .metrics import install as install_metrics
+    from .utils import parse_duration
+
+    path = path or socket_path()
+    logging.basicConfig(stream=sys.stderr, format="%(asctime)s %(message)s")
+    logging.getLogger(__package__).setLevel(logging.INFO)
+    nipyapi_logger = logging.getLogger("nipyapi")
+    nipyapi_logger.setLevel(logging.DEBUG)
+    nipyapi_logger.propagate = False
+
+    if os.environ.get("NIFI_VERIFY_SSL", "true").lower() in ("false", "0", "no"):
+        import urllib3
+
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    install_metrics()
+    token = None
+    try:
+        token, token_source = login()
+        log.info("NiFi session ready (token: %s)", token_source)
+    except ValueError as e:
+        if not str(e).startswith(_NO_AUTH_CONFIGURED):
+            log.error("NiFi login failed: %s", e)
+            return 1
+        log.info("Login skipped: %s", e)
+    except Exception as e:
+        log.error("NiFi login failed: %s", e)
+        return 1
+
+    idle_timeout = parse_duration(
+        os.environ.get("NIFI_WORKER_IDLE_TIMEOUT") or DEFAULT_IDLE_TIMEOUT
+    )
+    worker = Worker(token)
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+        os.chmod(path, 0o600)
+        server.listen()
+        server.settimeout(idle_timeout or None)
+        log.info("Worker %d listening on %s", os.getpid(), path)
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                log.info("No requests for %ss, exiting", int(idle_timeout))
+                break
+            with conn:
+                conn.settimeout(None)
+                try:
+                    with conn.makefile("rb") as reader:
+                        request = json.loads(reader.readline() or b"{}")
+                except ValueError:
+                    request = {}
+                op = request.get("op")
+                if op == "run":
+                    response = worker.run(request)
+                elif op in ("ping", "stop"):
+                    response = {
+                        "exit": 0,
+                        "stderr": f"nipyapi worker {os.getpid()}: {worker.served} command(s) run\n",
+                    }
+                else:
+                    response = {"exit": 2, "stderr": f"Unknown worker request: {op!r}\n"}
+                with contextlib.suppress(OSError):
+                    conn.sendall(json.dumps(response).encode("utf-8"))
+                if op == "stop":
+                    log.info("Stopped after %d request(s)", worker.served)
+                    break
+    finally:
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+    return 0
+
+
+def start(path: Optional[str] = None) -> int:
+    """Start a worker in the background and wait until it accepts requests."""
+    path = path or socket_path()
+    if _ping(path):
+        print(f"nipyapi worker already running on {path}", file=sys.stderr)
+        return 0
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    os.chmod(directory, 0o700)
+    log_path = f"{os.path.splitext(path)[0]}.log"
+    env = dict(os.environ, NIFI_WORKER_SOCKET=path)
+    with open(log_path, "ab") as log_file:
+        # pylint: disable-next=consider-using-with
+        process = subprocess.Popen(
+            [sys.executable, "-m", "nipyapi_actions.worker", "serve"],
+            stdin=subprocess.DEVNULL,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            env=env,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if _ping(path):
+            print(f"nipyapi worker {process.pid} listening on {path}", file=sys.stderr)
+            return 0
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+    else:
+        process.terminate()
+    with open(log_path, encoding="utf-8", errors="replace") as f:
+        sys.stderr.write(f.read()[-4000:])
+    print(f"nipyapi worker failed to start (log: {log_path})", file=sys.stderr)
+    return 1
+
+
+def stop(path: Optional[str] = None) -> int:
+    """Stop the worker, if one is running."""
+    path = path or socket_path()
+    try:
+        response = _request(path, {"op": "stop"})
+    except (OSError, ValueError):
+        print("No nipyapi worker running", file=sys.stderr)
+        return 0
+    sys.stderr.write(response.get("stderr", ""))
+    return 0
+
+
+def run(argv: List[str], path: Optional[str] = None) -> int:
+    """Run commands on the worker, or in this process if none is running."""
+    path = path or socket_path()
+    request = {"op": "run", "argv": argv, "env": dict(os.environ), "cwd": os.getcwd()}
+    if _wants_stdin(argv, request["env"]):
+        # Read here: the worker cannot see this process's stdin
+        request["stdin"] = sys.stdin.read()
+    try:
+        response = _request(path, request)
+    except (FileNotFoundError, ConnectionRefusedError):
+        from .__main__ import main  # pylint: disable=import-outside-toplevel
+
+        try:
+            spec = parse_args(argv)
+        except ValueError as e:
+            return _usage(str(e))
+        if "stdin" in request:
+            sys.stdin = io.StringIO(request["stdin"])
+        return main(spec)
+    sys.stderr.write(response.get("stderr", ""))
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stdout.flush()
+    return response.get("exit", 1)
+
+
+def _usage(error: Optional[str] = None) -> int:
+    if error:
+        print(error, file=sys.stderr)
+    print(
+        "usage: python -m nipyapi_actions.worker "
+        "{start|stop|serve|run COMMAND [--input [value]] ...}",
+        file=sys.stderr,
+    )
+    return 2
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Dispatch ``start``, ``stop``, ``serve`` or ``run``."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        return _usage()
+    action, rest = argv[0], argv[1:]
+    if action == "run":
+        return run(rest)
+    if action in ("start", "stop", "serve") and not rest:
+        return {"start": start, "stop": stop, "serve": serve}[action]()
+    return _usage(f"Unknown worker action: {' '.join(argv)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
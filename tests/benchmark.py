@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+Offline benchmark for the action commands, against the mock NiFi API.
+
+Runs a scenario that exercises every command (ensure the registry client,
+deploy, configure, start, stop, version operations, purge, export/import,
+cleanup) N times against ``mock_nifi.MockNiFi`` and reports, per command,
+p50/p95 wall time, HTTP requests made and bytes transferred. No NiFi,
+Docker or registry token is needed, so it runs anywhere Python does.
+
+Commands run in-process with one login, as in a pipeline step, so timings
+are the command itself and not interpreter startup.
+
+Usage:
+    python tests/benchmark.py                  # 5 iterations, table output
+    python tests/benchmark.py -n 20 --json out.json
+    python tests/benchmark.py --max-requests 400   # fail if a run exceeds it
+    python tests/benchmark.py --latency 0.02   # simulate a remote NiFi
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from mock_nifi import MockNiFi  # noqa: E402  pylint: disable=wrong-import-position
+
+FLOW = 'nipyapi_test_cicd_demo'
+
+
+def scenario(export_path):
+    """
+    Return the ordered (command, env overrides) steps for one iteration.
+
+    IDs produced by earlier steps are forwarded by the runner as in a real
+    pipeline. Each iteration ends by garbage-collecting what it created.
+    """
+    return [
+        ('ensure-registry', {}),
+        ('list-registry-flows', {}),
+        ('deploy-flow', {'NIFI_FLOW': FLOW}),
+        ('get-versions', {}),
+        ('get-status', {}),
+        ('resolve-params', {}),
+        ('configure-params', {'NIFI_PARAMETERS': json.dumps({'version': str(time.time())})}),
+        ('start-flow', {'NIFI_WAIT': 'true'}),
+        ('wait-for-state', {'NIFI_WAIT_STATE': 'RUNNING'}),
+        ('stop-flow', {'NIFI_WAIT': 'true'}),
+        ('get-diff', {}),
+        ('change-version', {}),
+        ('revert-flow', {}),
+        ('purge-flowfiles', {}),
+        ('export-flow-definition', {'NIFI_FLOW_FILE_PATH': export_path}),
+        ('cleanup', {'NIFI_WAIT': 'true'}),
+        ('import-flow-definition', {'NIFI_FLOW_FILE_PATH': export_path}),
+        ('cleanup', {'NIFI_DELETE_PARAMETER_CONTEXT': 'true'}),
+        ('deploy-flows', {'NIFI_FLOWS': 'nipyapi_test_*'}),
+        ('garbage-collect', {
+            'NIFI_GC_PATTERNS': 'nipyapi_test_*', 'NIFI_DELETE_PARAMETER_CONTEXT': 'true',
+        }),
+    ]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_benchmark(iterations, latency=0.0):
+    """
+    Run the scenario against a fresh mock server.
+
+    Returns:
+        dict of command -> list of {seconds, requests, bytes} samples
+
+    Raises:
+        RuntimeError: A command failed
+    """
+    from nipyapi_actions.auth import login
+    from nipyapi_actions.runner import run_steps
+
+    samples = {}
+    with MockNiFi(latency=latency) as nifi, tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(nifi.env())
+        for key in ('NIFI_PROCESS_GROUP_ID', 'NIFI_REGISTRY_CLIENT_ID'):
+            os.environ.pop(key, None)
+        # Measure registry listings uncached, as the first step of a job sees them
+        os.environ['NIFI_REGISTRY_CACHE'] = 'false'
+        login()
+        export_path = os.path.join(tmp, 'export.json')
+
+        for iteration in range(iterations):
+            for command, overrides in scenario(export_path):
+                nifi.reset_log()
+                started = time.perf_counter()
+                outputs, failed = run_steps([(command, overrides)])
+                elapsed = time.perf_counter() - started
+                if failed:
+                    raise RuntimeError(
+                        f'{command} failed on iteration {iteration + 1}: {outputs.get("error")}'
+                    )
+                stats = nifi.stats()
+                samples.setdefault(command, []).append({
+                    'seconds': elapsed,
+                    'requests': stats['requests'],
+                    'bytes': stats['bytes_in'] + stats['bytes_out'],
+                })
+    return samples
+
+
+def summarise(samples):
+    """Reduce samples to per-command p50/p95 seconds and mean requests/bytes."""
+    summary = {}
+    for command, runs in samples.items():
+        seconds = [r['seconds'] for r in runs]
+        summary[command] = {
+            'runs': len(runs),
+            'p50_ms': round(percentile(seconds, 50) * 1000, 2),
+            'p95_ms': round(percentile(seconds, 95) * 1000, 2),
+            'requests': round(statistics.mean(r['requests'] for r in runs), 1),
+            'bytes': int(statistics.mean(r['bytes'] for r in runs)),
+        }
+    return summary
+
+
+def print_table(summary):
+    print(f"{'command':<26}{'runs':>6}{'p50 ms':>10}{'p95 ms':>10}{'requests':>10}{'bytes':>10}")
+    print('-' * 72)
+    for command, row in summary.items():
+        print(
+            f"{command:<26}{row['runs']:>6}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+            f"{row['requests']:>10}{row['bytes']:>10}"
+        )
+    total = sum(row['requests'] for row in summary.values())
+    print('-' * 72)
+    print(f"{'requests per iteration':<52}{round(total, 1):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark action commands against a mock NiFi')
+    parser.add_argument('-n', '--iterations', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Artificial seconds of latency per request')
+    parser.add_argument('--json', dest='json_path', help='Also write the summary to this file')
+    parser.add_argument('--max-requests', type=float,
+                        help='Fail if one iteration makes more requests than this')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+    try:
+        summary = summarise(run_benchmark(args.iterations, args.latency))
+    except RuntimeError as e:
+        print(f'FAILED: {e}')
+        return 1
+
+    print_table(summary)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    total = sum(row['requests'] for row in summary.values())
+    if args.max_requests is not None and total > args.max_requests:
+        print(f'FAILED: {total} requests per iteration exceeds {args.max_requests}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Shared fixtures for the unit tests (``python -m pytest``).
+
+Commands read their inputs from the environment and the runner exports
+forwarded outputs into it, so every test starts without NiFi-related
+variables and gets the original environment back afterwards.
+"""
+
+import json
+import os
+
+import pytest
+
+from mock_nifi import FLOWS_DIR, MockNiFi
+
+DEMO_FLOW = os.path.join(FLOWS_DIR, 'nipyapi_test_cicd_demo.json')
+INHERITANCE_FLOW = os.path.join(FLOWS_DIR, 'nipyapi_test_param_inheritance.json')
+
+_ENV_PREFIXES = ('NIFI_', 'GH_', 'GL_', 'GITHUB_', 'GITLAB_', 'RUNNER_', 'CI_')
+
+
+@pytest.fixture(autouse=True)
+def clean_env():
+    saved = dict(os.environ)
+    for key in [k for k in os.environ if k.startswith(_ENV_PREFIXES)]:
+        del os.environ[key]
+    yield
+    os.environ.clear()
+    os.environ.update(saved)
+
+
+@pytest.fixture
+def demo_flow():
+    """The demo flow definition, parsed; tests mutate their own copy."""
+    with open(DEMO_FLOW, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def write_flow(tmp_path):
+    """Write a definition to a file under tmp_path and return its path."""
+    def write(definition, name='flow.json'):
+        path = tmp_path / name
+        path.write_text(json.dumps(definition), encoding='utf-8')
+        return str(path)
+    return write
+
+
+@pytest.fixture
+def mock_nifi():
+    with MockNiFi() as nifi:
+        yield nifi
@@ -38,6 +38,8 @@ ACTION_ENV_VARS = [
     'NIFI_FLOW_VERSION', 'NIFI_PARENT_PG_ID', 'NIFI_LOCATION_X', 'NIFI_LOCATION_Y',
     'NIFI_PROCESS_GROUP_ID', 'NIFI_ENABLE_CONTROLLERS', 'NIFI_DISABLE_CONTROLLERS',
     'NIFI_FORCE_DELETE', 'NIFI_DELETE_PARAM_CONTEXT', 'NIFI_PARAMETERS',
+    'NIFI_COMMANDS', 'NIFI_WAIT', 'NIFI_WAIT_STATE', 'NIFI_WAIT_QUEUE',
+    'NIFI_WAIT_CONTROLLERS', 'NIFI_WAIT_TIMEOUT',
 ]
 
 
@@ -78,32 +80,30 @@ def run_command(env_vars):
     for key, value in env_vars.items():
         os.environ[key] = value
 
-    # Map action command names to CLI function names
+    # Resolve the action command through the same registry the action uses
+    from nipyapi_actions.commands import get_command
+    from nipyapi_actions.metrics import install, to_output
     command = env_vars.get('NIFI_ACTION_COMMAND', '')
-    cmd_map = {
-        'ensure-registry': 'ensure_registry',
-        'deploy-flow': 'deploy_flow',
-        'start-flow': 'start_flow',
-        'stop-flow': 'stop_flow',
-        'get-status': 'get_status',
-        'configure-params': 'configure_params',
-        'change-version': 'change_flow_version',
-        'revert-flow': 'revert_flow',
-        'cleanup': 'cleanup',
-        'purge-flowfiles': 'purge_flowfiles',
-    }
-
-    func_name = cmd_map.get(command)
-    if not func_name:
-        raise ValueError(f"Unknown command: {command}")
+    func = get_command(command)
 
-    # Import and run the nipyapi.ci function directly
-    import nipyapi.ci
-    func = getattr(nipyapi.ci, func_name)
+    # Count and time the NiFi REST calls, as the action does
+    metrics = install()
+    metrics.reset()
+    metrics.command = command
     result = func()
 
-    # Write outputs to GITHUB_OUTPUT file in key=value format
-    output_file = env_vars.get('GITHUB_OUTPUT')
+    summary = metrics.summary()
+    print(f"  NiFi API: {summary['requests']} request(s) in {summary['seconds']}s")
+    if isinstance(result, dict):
+        result['metrics'] = to_output(summary)
+    if os.environ.get('NIFI_METRICS_FILE'):
+        metrics.write(os.environ['NIFI_METRICS_FILE'])
+
+    write_outputs(env_vars.get('GITHUB_OUTPUT'), result)
+
+
+def write_outputs(output_file, result):
+    """Write a command result to the GITHUB_OUTPUT file in key=value format."""
     if output_file and result and isinstance(result, dict):
         with open(output_file, 'a') as f:
             for key, value in result.items():
@@ -222,6 +222,7 @@ def test_start_flow(github_token, output_file, process_group_id):
     env.update({
         'NIFI_ACTION_COMMAND': 'start-flow',
         'NIFI_PROCESS_GROUP_ID': process_group_id,
+        'NIFI_WAIT': 'true',
     })
 
     print(f"Process Group ID: {process_group_id}")
@@ -238,6 +239,8 @@ def test_start_flow(github_token, output_file, process_group_id):
 
     if outputs.get('started') not in ('true', 'partial'):
         raise ValueError("Expected started=true or started=partial in outputs")
+    if outputs.get('reached') != 'true':
+        raise ValueError("Expected reached=true after waiting for RUNNING")
 
     print("start-flow PASSED!")
     return outputs
@@ -256,6 +259,7 @@ def test_stop_flow(github_token, output_file, process_group_id):
         'NIFI_PROCESS_GROUP_ID': process_group_id,
         # Disable controllers for cleanup - stop_flow defaults to not disabling
         'NIFI_DISABLE_CONTROLLERS': 'true',
+        'NIFI_WAIT': 'true',
     })
 
     print(f"Process Group ID: {process_group_id}")
@@ -272,6 +276,8 @@ def test_stop_flow(github_token, output_file, process_group_id):
 
     if outputs.get('stopped') not in ('true', 'partial'):
         raise ValueError("Expected stopped=true or stopped=partial in outputs")
+    if outputs.get('reached') != 'true' or outputs.get('active_threads') != '0':
+        raise ValueError("Expected reached=true and no active threads after waiting")
 
     print("stop-flow PASSED!")
     return outputs
@@ -399,6 +405,46 @@ def test_get_status(github_token, output_file, process_group_id):
     return outputs
 
 
+def test_pipeline(github_token, output_file, process_group_id):
+    """Test pipeline mode: several commands in one process with one session."""
+    print()
+    print("=" * 60)
+    print("Testing pipeline mode (commands)")
+    print("=" * 60)
+
+    env = get_base_env(github_token, output_file)
+    env['NIFI_PROCESS_GROUP_ID'] = process_group_id
+    for key in ACTION_ENV_VARS:
+        os.environ.pop(key, None)
+    os.environ.update(env)
+
+    from nipyapi_actions.runner import parse_steps, run_steps
+    steps = parse_steps("[get-status, get-versions, get-diff]")
+    print(f"Steps: {[command for command, _ in steps]}")
+    print()
+
+    # Clear output file
+    open(output_file, 'w').close()
+
+    result, failed = run_steps(steps)
+    write_outputs(output_file, result)
+
+    outputs = read_outputs(output_file)
+    print()
+    print("Outputs:", outputs)
+
+    if failed:
+        raise ValueError(f"Pipeline failed at step: {failed}")
+    if len(result['step_timings']) != 3:
+        raise ValueError("Expected step_timings for all 3 steps")
+    for key in ('state', 'version_count', 'modification_count'):
+        if key not in outputs:
+            raise ValueError(f"Expected {key} in outputs")
+
+    print("pipeline PASSED!")
+    return outputs
+
+
 def test_cleanup(github_token, output_file, process_group_id):
     """Test the cleanup command."""
     print()
@@ -413,6 +459,7 @@ def test_cleanup(github_token, output_file, process_group_id):
         # Full cleanup for CI/CD - cleanup defaults to safe mode
         'NIFI_FORCE_DELETE': 'true',
         'NIFI_DELETE_PARAMETER_CONTEXT': 'true',
+        'NIFI_WAIT': 'true',
     })
 
     print(f"Process Group ID: {process_group_id}")
@@ -451,6 +498,7 @@ def test_purge_flowfiles(github_token, output_file, process_group_id):
     print("=" * 60)
 
     import nipyapi
+    from nipyapi_actions.wait_for_state import wait_until
 
     # Get processors in the process group
     processors = nipyapi.canvas.list_all_processors(pg_id=process_group_id)
@@ -468,11 +516,24 @@ def test_purge_flowfiles(github_token, output_file, process_group_id):
 
     print(f"Found HandleHTTPResponse processor: {response_proc.id}")
 
+    def processor_stopped():
+        proc = nipyapi.canvas.get_processor(response_proc.id, 'id')
+        threads = proc.status.aggregate_snapshot.active_thread_count or 0
+        return proc.component.state == 'STOPPED' and threads == 0, threads
+
+    def flowfiles_queued():
+        status = nipyapi.canvas.get_process_group_status(process_group_id, detail="all")
+        queued = status.status.aggregate_snapshot.flow_files_queued or 0
+        return queued > 0, queued
+
     try:
         # Step 1: Stop the response processor so flow files will queue
         print("Stopping HandleHTTPResponse processor...")
         nipyapi.canvas.schedule_processor(response_proc, False)
-        time.sleep(1)
+        stopped, _, _, waited = wait_until(processor_stopped, timeout=30)
+        if not stopped:
+            raise ValueError("HandleHTTPResponse processor did not stop within 30s")
+        print(f"Processor stopped after {waited}s")
 
         # Step 2: Send an HTTP request to create a queued flow file
         print("Sending HTTP request to create queued flow file...")
@@ -484,13 +545,8 @@ def test_purge_flowfiles(github_token, output_file, process_group_id):
             # Expected to timeout/fail since response processor is stopped
             pass
 
-        time.sleep(1)
-
-        # Step 3: Check that flow files are queued
-        status = nipyapi.canvas.get_process_group_status(process_group_id, detail="all")
-        queued_before = 0
-        if hasattr(status, 'status') and hasattr(status.status, 'aggregate_snapshot'):
-            queued_before = status.status.aggregate_snapshot.flow_files_queued or 0
+        # Step 3: Wait for the flow file to show up in the queue
+        _, queued_before, _, _ = wait_until(flowfiles_queued, timeout=10)
         print(f"Flow files queued before purge: {queued_before}")
 
         if queued_before == 0:
@@ -501,6 +557,7 @@ def test_purge_flowfiles(github_token, output_file, process_group_id):
         env.update({
             'NIFI_ACTION_COMMAND': 'purge-flowfiles',
             'NIFI_PROCESS_GROUP_ID': process_group_id,
+            'NIFI_PURGE_CONNECTIONS': '*-> HandleHTTPResponse',
         })
 
         print(f"Calling purge-flowfiles on: {process_group_id}")
@@ -517,6 +574,8 @@ def test_purge_flowfiles(github_token, output_file, process_group_id):
         # purge_flowfiles returns purged=true, not success
         if outputs.get('purged') != 'true':
             raise ValueError("Expected purged=true in outputs")
+        if outputs.get('connections_selected') == '0':
+            raise ValueError("Expected the connection filter to select the response queue")
 
         # Step 5: Verify queue is now empty
         status = nipyapi.canvas.get_process_group_status(process_group_id, detail="all")
@@ -592,44 +651,33 @@ def cleanup_stale_resources(github_token, output_file):
         os.environ[key] = value
 
     import nipyapi
+    from nipyapi_actions.garbage_collect import garbage_collect
 
     # Configure nipyapi from environment (same as CI functions do)
     nipyapi.profiles.switch()
 
-    # Find and clean up any stale nipyapi_test_cicd_demo
+    # Only this test's own group, context and registry client, by exact name, so
+    # other developers' resources on a shared NiFi are left alone
     try:
-        pgs = nipyapi.canvas.list_all_process_groups(nipyapi.canvas.get_root_pg_id())
-        for pg in pgs:
-            if pg.component.name == 'nipyapi_test_cicd_demo':
-                print(f"  Found stale PG: {pg.id}")
-                nipyapi.canvas.schedule_process_group(pg.id, scheduled=False)
-                try:
-                    nipyapi.canvas.schedule_all_controllers(pg.id, scheduled=False)
-                except Exception:
-                    pass
-                nipyapi.canvas.delete_process_group(pg, force=True)
-                print("  Deleted stale process group")
-    except Exception as e:
-        print(f"  Could not clean PGs: {e}")
-
-    # Clean up orphaned parameter context
-    try:
-        contexts = nipyapi.parameters.list_all_parameter_contexts()
-        for ctx in contexts:
-            if ctx.component.name == 'nipyapi_test_cicd_params':
-                nipyapi.parameters.delete_parameter_context(ctx)
-                print("  Deleted orphaned parameter context")
+        result = garbage_collect(
+            patterns=['nipyapi_test_cicd_demo'],
+            context_patterns=['nipyapi_test_cicd_params'],
+            registry_client_patterns=['test-action-client'],
+            delete_parameter_contexts=True,
+            dry_run=False,
+        )
     except Exception as e:
-        print(f"  Could not clean parameter context: {e}")
-
-    # Clean up test registry client
-    try:
-        client = nipyapi.versioning.get_registry_client('test-action-client')
-        if client:
-            nipyapi.versioning.delete_registry_client(client)
-            print("  Deleted stale registry client")
-    except Exception:
-        pass
+        print(f"  Could not clean stale resources: {e}")
+        return
+    print(f"  Deleted {result['deleted_count']} stale process group(s)")
+    if result['deleted_parameter_contexts']:
+        print(f"  Deleted parameter contexts: {result['deleted_parameter_contexts']}")
+    if result['deleted_registry_clients']:
+        print(f"  Deleted registry clients: {result['deleted_registry_clients']}")
+    if result['skipped_registry_clients']:
+        print(f"  Registry clients still in use: {result['skipped_registry_clients']}")
+    if 'error' in result:
+        print(f"  Could not clean everything: {result['error']}")
 
     print("Pre-test cleanup complete")
 
@@ -672,6 +720,9 @@ def test_full_workflow():
         if status.get('state') != 'RUNNING':
             print(f"WARNING: Expected state=RUNNING, got {status.get('state')}")
 
+        # Step 4b: pipeline mode - chained read-only commands in one process
+        test_pipeline(github_token, output_file, process_group_id)
+
         # Step 5: test HTTP endpoint with default version (1.0.0)
         if not test_http_endpoint(expected_version="1.0.0"):
             print("WARNING: HTTP endpoint test failed, continuing...")
@@ -0,0 +1,1277 @@
+#!/usr/bin/env python
+"""
+In-process stand-in for the NiFi REST API, for offline tests and benchmarks.
+
+Serves the subset of the NiFi 2.x API used by the action commands from a
+plain ``http.server`` on a background thread. The Git flow registry is
+simulated from the flow definitions in ``tests/flows/*.json``: every file is
+a flow in the ``flows`` bucket, with a single version derived from its
+content hash. Deploying or importing a flow builds process groups,
+processors, connections, controller services and parameter contexts from the
+definition, so start/stop/status/purge/cleanup behave plausibly.
+
+Scheduling is immediate: there are no threads, and stopping or starting a
+group takes effect at once. Queued FlowFiles (``flowfile_arrived``) are
+consumed at ``Canvas.process_rate`` per second from every connection whose
+destination processor is running, so draining a flow takes plausible time. Every request is recorded (method, endpoint
+template, status, bytes in/out, seconds) for the benchmark harness.
+
+Usage:
+    from mock_nifi import MockNiFi
+
+    with MockNiFi() as nifi:
+        os.environ.update(nifi.env())
+        ...
+        print(nifi.stats())
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FLOWS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flows')
+BUCKET = 'flows'
+BRANCH = 'main'
+NIFI_VERSION = '2.7.2'
+
+
+class NotFound(Exception):
+    """Raised by handlers for unknown resources (404)."""
+
+
+class Conflict(Exception):
+    """Raised by handlers for invalid state transitions (409)."""
+
+
+def _new_id():
+    return str(uuid.uuid4())
+
+
+def _multipart_fields(content_type, body):
+    """Parse a multipart/form-data body into {name: bytes}."""
+    boundary = content_type.split('boundary=', 1)[1].strip('"').encode()
+    fields = {}
+    for part in body.split(b'--' + boundary):
+        if b'\r\n\r\n' not in part:
+            continue
+        head, value = part.split(b'\r\n\r\n', 1)
+        match = re.search(rb'name="([^"]+)"', head)
+        if match:
+            fields[match.group(1).decode()] = value.rstrip(b'\r\n-')
+    return fields
+
+
+class FlowStore:
+    """The simulated Git registry: flow definitions on disk, one version each."""
+
+    def __init__(self, flows_dir=FLOWS_DIR):
+        self.flows_dir = flows_dir
+
+    def flow_ids(self):
+        return sorted(
+            name[:-5] for name in os.listdir(self.flows_dir) if name.endswith('.json')
+        )
+
+    def load(self, flow_id):
+        path = os.path.join(self.flows_dir, f'{flow_id}.json')
+        if not os.path.exists(path):
+            raise NotFound(f'Flow {flow_id} not found in bucket {BUCKET}')
+        with open(path, 'rb') as f:
+            raw = f.read()
+        return json.loads(raw), hashlib.sha1(raw).hexdigest()
+
+    def version(self, flow_id):
+        return self.load(flow_id)[1]
+
+
+class Canvas:  # pylint: disable=too-many-public-methods
+    """Mutable NiFi state and the translation to and from REST entities."""
+
+    def __init__(self, flows=None):
+        self.lock = threading.RLock()
+        self.flows = flows or FlowStore()
+        self.root_id = _new_id()
+        self.revisions = {}
+        self.groups = {self.root_id: {
+            'id': self.root_id, 'name': 'NiFi Flow', 'parent': None,
+            'vci': None, 'param_ctx': None, 'position': {'x': 0.0, 'y': 0.0},
+            'modified': False, 'created': time.time(), 'comments': '',
+        }}
+        self.processors = {}
+        self.connections = {}
+        self.controllers = {}
+        self.contexts = {}
+        self.registry_clients = {}
+        self.requests = {}
+        self.process_rate = 1000.0
+        self._processed_at = time.monotonic()
+
+    # -- helpers ---------------------------------------------------------
+
+    def revision(self, component_id):
+        return {'version': self.revisions.get(component_id, 0), 'clientId': 'mock'}
+
+    def bump(self, component_id):
+        self.revisions[component_id] = self.revisions.get(component_id, 0) + 1
+
+    def group(self, group_id):
+        if group_id == 'root':
+            group_id = self.root_id
+        if group_id not in self.groups:
+            raise NotFound(f'Unable to find process group with id {group_id}')
+        return self.groups[group_id]
+
+    def descendants(self, group_id):
+        """Return group_id and the IDs of all groups below it."""
+        found = [group_id]
+        for gid in found:
+            found.extend(g['id'] for g in self.groups.values() if g['parent'] == gid)
+        return found
+
+    def within(self, items, group_ids):
+        return [item for item in items.values() if item['pg'] in group_ids]
+
+    # -- entities --------------------------------------------------------
+
+    def processor_entity(self, proc):
+        state = proc['state']
+        return {
+            'id': proc['id'],
+            'revision': self.revision(proc['id']),
+            'position': proc['position'],
+            'component': {
+                'id': proc['id'], 'name': proc['name'], 'type': proc['type'],
+                'parentGroupId': proc['pg'], 'state': state,
+                'validationStatus': 'VALID', 'config': {'properties': proc['properties']},
+                'relationships': [],
+            },
+            'status': {
+                'id': proc['id'], 'name': proc['name'], 'groupId': proc['pg'],
+                'runStatus': state.title(),
+                'aggregateSnapshot': {
+                    'id': proc['id'], 'name': proc['name'], 'runStatus': state.title(),
+                    'activeThreadCount': 0,
+                },
+            },
+        }
+
+    def connection_entity(self, conn):
+        def name(processor_id):
+            return self.processors.get(processor_id, {}).get('name', '')
+
+        return {
+            'id': conn['id'],
+            'revision': self.revision(conn['id']),
+            'sourceId': conn['source'], 'destinationId': conn['destination'],
+            'sourceGroupId': conn['pg'], 'destinationGroupId': conn['pg'],
+            'sourceType': 'PROCESSOR', 'destinationType': 'PROCESSOR',
+            'component': {
+                'id': conn['id'], 'name': conn['name'], 'parentGroupId': conn['pg'],
+                'source': {
+                    'id': conn['source'], 'groupId': conn['pg'], 'type': 'PROCESSOR',
+                    'name': name(conn['source']),
+                },
+                'destination': {
+                    'id': conn['destination'], 'groupId': conn['pg'], 'type': 'PROCESSOR',
+                    'name': name(conn['destination']),
+                },
+            },
+            'status': {
+                'id': conn['id'], 'groupId': conn['pg'],
+                'aggregateSnapshot': {
+                    'id': conn['id'], 'flowFilesQueued': conn['queued'],
+                    'bytesQueued': conn['queued'] * 1024,
+                    'queued': f"{conn['queued']} (0 bytes)",
+                },
+            },
+        }
+
+    def controller_entity(self, svc):
+        return {
+            'id': svc['id'],
+            'revision': self.revision(svc['id']),
+            'parentGroupId': svc['pg'],
+            'component': {
+                'id': svc['id'], 'name': svc['name'], 'type': svc['type'],
+                'parentGroupId': svc['pg'], 'state': svc['state'],
+                'validationStatus': 'VALID', 'properties': svc['properties'],
+            },
+            'status': {'runStatus': svc['state'], 'validationStatus': 'VALID'},
+        }
+
+    def vci_component(self, group):
+        vci = group['vci']
+        if not vci:
+            return None
+        state = 'LOCALLY_MODIFIED' if group['modified'] else 'UP_TO_DATE'
+        return dict(vci, groupId=group['id'], state=state, stateExplanation='')
+
+    def group_entity(self, group):
+        with self.lock:
+            ids = self.descendants(group['id'])
+            procs = self.within(self.processors, ids)
+            queued = sum(c['queued'] for c in self.within(self.connections, ids))
+            running = sum(1 for p in procs if p['state'] == 'RUNNING')
+            stopped = sum(1 for p in procs if p['state'] == 'STOPPED')
+            disabled = sum(1 for p in procs if p['state'] == 'DISABLED')
+            ctx = self.contexts.get(group['param_ctx'])
+            state = self.vci_component(group)['state'] if group['vci'] else None
+            return {
+                'id': group['id'],
+                'revision': self.revision(group['id']),
+                'position': group['position'],
+                'runningCount': running, 'stoppedCount': stopped,
+                'invalidCount': 0, 'disabledCount': disabled,
+                'activeRemotePortCount': 0, 'inactiveRemotePortCount': 0,
+                'upToDateCount': 1 if state == 'UP_TO_DATE' else 0,
+                'locallyModifiedCount': 1 if state == 'LOCALLY_MODIFIED' else 0,
+                'inputPortCount': 0, 'outputPortCount': 0,
+                'parameterContext': self.context_reference(ctx) if ctx else None,
+                'versionedFlowState': state,
+                'component': {
+                    'id': group['id'], 'name': group['name'],
+                    'parentGroupId': group['parent'], 'position': group['position'],
+                    'comments': group['comments'],
+                    'versionControlInformation': self.vci_component(group),
+                    'parameterContext': self.context_reference(ctx) if ctx else None,
+                    'runningCount': running, 'stoppedCount': stopped,
+                    'invalidCount': 0, 'disabledCount': disabled,
+                },
+                'status': {
+                    'id': group['id'], 'name': group['name'],
+                    'aggregateSnapshot': {
+                        'id': group['id'], 'name': group['name'],
+                        'activeThreadCount': 0, 'flowFilesQueued': queued,
+                        'bytesQueued': queued * 1024, 'queued': f'{queued} (0 bytes)',
+                    },
+                },
+            }
+
+    def status_snapshot(self, group):
+        """Recursive status snapshot of a group, as /flow/process-groups/{id}/status returns."""
+        gid = group['id']
+        ids = self.descendants(gid)
+        queued = sum(c['queued'] for c in self.within(self.connections, ids))
+        state = self.vci_component(group)['state'] if group['vci'] else None
+        return {
+            'id': gid, 'name': group['name'], 'versionedFlowState': state,
+            'activeThreadCount': 0, 'flowFilesQueued': queued,
+            'bytesQueued': queued * 1024, 'queued': f'{queued} (0 bytes)',
+            'processorStatusSnapshots': [
+                {
+                    'id': proc['id'],
+                    'processorStatusSnapshot': {
+                        'id': proc['id'], 'groupId': gid, 'name': proc['name'],
+                        'runStatus': proc['state'].title(), 'activeThreadCount': 0,
+                    },
+                }
+                for proc in self.within(self.processors, [gid])
+            ],
+            'processGroupStatusSnapshots': [
+                {'id': child['id'], 'processGroupStatusSnapshot': self.status_snapshot(child)}
+                for child in self.groups.values() if child['parent'] == gid
+            ],
+        }
+
+    def group_flow_entity(self, group):
+        with self.lock:
+            gid = group['id']
+            return {
+                'permissions': {'canRead': True, 'canWrite': True},
+                'processGroupFlow': {
+                    'id': gid,
+                    'parentGroupId': group['parent'],
+                    'breadcrumb': {'id': gid, 'breadcrumb': {'id': gid, 'name': group['name']}},
+                    'flow': {
+                        'processGroups': [
+                            self.group_entity(g) for g in self.groups.values()
+                            if g['parent'] == gid
+                        ],
+                        'processors': [
+                            self.processor_entity(p) for p in self.within(self.processors, [gid])
+                        ],
+                        'connections': [
+                            self.connection_entity(c) for c in self.within(self.connections, [gid])
+                        ],
+                        'inputPorts': [], 'outputPorts': [], 'funnels': [], 'labels': [],
+                        'remoteProcessGroups': [],
+                    },
+                },
+            }
+
+    def context_reference(self, ctx):
+        return {
+            'id': ctx['id'],
+            'permissions': {'canRead': True, 'canWrite': True},
+            'component': {'id': ctx['id'], 'name': ctx['name']},
+        }
+
+    def context_entity(self, ctx):
+        with self.lock:
+            bound = [
+                {'id': g['id'], 'component': {'id': g['id'], 'name': g['name']}}
+                for g in self.groups.values() if g['param_ctx'] == ctx['id']
+            ]
+            return {
+                'id': ctx['id'],
+                'revision': self.revision(ctx['id']),
+                'permissions': {'canRead': True, 'canWrite': True},
+                'component': {
+                    'id': ctx['id'], 'name': ctx['name'], 'description': ctx['description'],
+                    'parameters': [
+                        {
+                            'canWrite': True,
+                            'parameter': dict(
+                                param,
+                                value=None if param.get('sensitive') else param.get('value'),
+                                inherited=False,
+                            ),
+                        }
+                        for param in ctx['parameters'].values()
+                    ],
+                    'inheritedParameterContexts': [
+                        self.context_reference(self.contexts[i]) for i in ctx['inherited']
+                    ],
+                    'boundProcessGroups': bound,
+                },
+            }
+
+    def registry_client_entity(self, client):
+        return {
+            'id': client['id'],
+            'revision': self.revision(client['id']),
+            'component': {
+                'id': client['id'], 'name': client['name'], 'type': client['type'],
+                'description': client.get('description', ''),
+                'properties': client['properties'],
+                'supportsBranching': True,
+            },
+        }
+
+    # -- flow instantiation ----------------------------------------------
+
+    def _ensure_contexts(self, definition):
+        """Create the definition's parameter contexts (by name), return name -> id."""
+        contexts = definition.get('parameterContexts') or {}
+        ids = {c['name']: c['id'] for c in self.contexts.values()}
+        for name, spec in contexts.items():
+            if name not in ids:
+                ctx_id = _new_id()
+                ids[name] = ctx_id
+                self.contexts[ctx_id] = {
+                    'id': ctx_id, 'name': name, 'description': spec.get('description', ''),
+                    'parameters': {
+                        p['name']: {
+                            'name': p['name'], 'value': p.get('value'),
+                            'sensitive': p.get('sensitive', False),
+                            'description': p.get('description', ''),
+                            'provided': False,
+                        }
+                        for p in spec.get('parameters', [])
+                    },
+                    'inherited': [],
+                }
+        for name, spec in contexts.items():
+            self.contexts[ids[name]]['inherited'] = [
+                ids[i] for i in spec.get('inheritedParameterContexts', []) if i in ids
+            ]
+        return ids
+
+    def _build_group(self, contents, parent_id, name, position, context_ids):
+        group_id = _new_id()
+        self.groups[group_id] = {
+            'id': group_id, 'name': name or contents.get('name', 'Imported'),
+            'parent': parent_id, 'vci': None,
+            'param_ctx': context_ids.get(contents.get('parameterContextName')),
+            'position': position or contents.get('position') or {'x': 0.0, 'y': 0.0},
+            'modified': False, 'created': time.time(), 'comments': contents.get('comments') or '',
+        }
+        id_map = {}
+        for proc in contents.get('processors', []):
+            proc_id = _new_id()
+            id_map[proc['identifier']] = proc_id
+            state = 'DISABLED' if proc.get('scheduledState') == 'DISABLED' else 'STOPPED'
+            self.processors[proc_id] = {
+                'id': proc_id, 'name': proc['name'], 'type': proc['type'], 'pg': group_id,
+                'state': state, 'position': proc.get('position'),
+                'properties': proc.get('properties', {}),
+            }
+        for svc in contents.get('controllerServices', []):
+            svc_id = _new_id()
+            self.controllers[svc_id] = {
+                'id': svc_id, 'name': svc['name'], 'type': svc['type'], 'pg': group_id,
+                'state': 'DISABLED', 'properties': svc.get('properties', {}),
+            }
+        for child in contents.get('processGroups', []):
+            self._build_group(child, group_id, None, None, context_ids)
+        for conn in contents.get('connections', []):
+            conn_id = _new_id()
+            self.connections[conn_id] = {
+                'id': conn_id, 'name': conn.get('name', ''), 'pg': group_id,
+                'source': id_map.get(conn['source']['id'], conn['source']['id']),
+                'destination': id_map.get(conn['destination']['id'], conn['destination']['id']),
+                'queued': 0,
+            }
+        return group_id
+
+    def instantiate(self, definition, parent_id, name=None, position=None):
+        with self.lock:
+            parent = self.group(parent_id)
+            context_ids = self._ensure_contexts(definition)
+            return self._build_group(
+                definition['flowContents'], parent['id'], name, position, context_ids
+            )
+
+    def export(self, group):
+        """Export a group as a flow definition (shape of a VersionedFlowSnapshot)."""
+        with self.lock:
+            def contents(g):
+                return {
+                    'identifier': g['id'], 'name': g['name'], 'componentType': 'PROCESS_GROUP',
+                    'position': g['position'],
+                    'parameterContextName': (
+                        self.contexts[g['param_ctx']]['name'] if g['param_ctx'] else None
+                    ),
+                    'processors': [
+                        {
+                            'identifier': p['id'], 'name': p['name'], 'type': p['type'],
+                            'componentType': 'PROCESSOR', 'properties': p['properties'],
+                            'position': p['position'],
+                            'scheduledState': 'DISABLED' if p['state'] == 'DISABLED'
+                            else 'ENABLED',
+                        }
+                        for p in self.within(self.processors, [g['id']])
+                    ],
+                    'controllerServices': [
+                        {
+                            'identifier': s['id'], 'name': s['name'], 'type': s['type'],
+                            'componentType': 'CONTROLLER_SERVICE',
+                            'properties': s['properties'],
+                        }
+                        for s in self.within(self.controllers, [g['id']])
+                    ],
+                    'connections': [
+                        {
+                            'identifier': c['id'], 'name': c['name'],
+                            'componentType': 'CONNECTION',
+                            'source': {'id': c['source'], 'type': 'PROCESSOR'},
+                            'destination': {'id': c['destination'], 'type': 'PROCESSOR'},
+                        }
+                        for c in self.within(self.connections, [g['id']])
+                    ],
+                    'processGroups': [
+                        contents(child) for child in self.groups.values()
+                        if child['parent'] == g['id']
+                    ],
+                }
+
+            used = {
+                g['param_ctx'] for g in self.groups.values()
+                if g['id'] in self.descendants(group['id']) and g['param_ctx']
+            }
+            return {
+                'flowEncodingVersion': '1.0',
+                'flowContents': contents(group),
+                'parameterContexts': {
+                    self.contexts[c]['name']: {
+                        'name': self.contexts[c]['name'],
+                        'componentType': 'PARAMETER_CONTEXT',
+                        'parameters': list(self.contexts[c]['parameters'].values()),
+                        'inheritedParameterContexts': [
+                            self.contexts[i]['name'] for i in self.contexts[c]['inherited']
+                        ],
+                    }
+                    for c in used
+                },
+                'externalControllerServices': {},
+                'parameterProviders': {},
+            }
+
+    def delete_group(self, group_id):
+        with self.lock:
+            ids = self.descendants(group_id)
+            for items in (self.processors, self.connections, self.controllers):
+                for key in [k for k, v in items.items() if v['pg'] in ids]:
+                    del items[key]
+            for gid in ids:
+                del self.groups[gid]
+
+    def schedule(self, group_id, state):
+        with self.lock:
+            ids = self.descendants(self.group(group_id)['id'])
+            for proc in self.within(self.processors, ids):
+                if proc['state'] != 'DISABLED':
+                    proc['state'] = state
+                    self.bump(proc['id'])
+
+    def activate_controllers(self, group_id, state):
+        with self.lock:
+            ids = self.descendants(self.group(group_id)['id'])
+            for svc in self.within(self.controllers, ids):
+                svc['state'] = state
+                self.bump(svc['id'])
+
+    def advance(self):
+        """Consume queued FlowFiles processed by running destinations since the last call."""
+        with self.lock:
+            budget = int(self.process_rate * (time.monotonic() - self._processed_at))
+            if budget < 1:
+                return
+            self._processed_at = time.monotonic()
+            for conn in self.connections.values():
+                destination = self.processors.get(conn['destination'])
+                if conn['queued'] and destination and destination['state'] == 'RUNNING':
+                    conn['queued'] = max(0, conn['queued'] - budget)
+
+    def flowfile_arrived(self, group_id, count=1):
+        """Test hook: queue FlowFiles on every connection in a group."""
+        with self.lock:
+            for conn in self.within(self.connections, self.descendants(group_id)):
+                conn['queued'] += count
+
+
+class MockNiFi:  # pylint: disable=too-many-public-methods
+    """
+    A stand-in NiFi REST API on ``http://127.0.0.1:<port>/nifi-api``.
+
+    Args:
+        flows_dir: Directory of flow definition JSON files for the registry
+        latency: Seconds of artificial latency added to every request
+    """
+
+    def __init__(self, flows_dir=FLOWS_DIR, latency=0.0):
+        self.canvas = Canvas(FlowStore(flows_dir))
+        self.latency = latency
+        self.log = []
+        self._log_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self.routes = [
+            (method, re.compile('^/nifi-api' + pattern + '$'), pattern, handler)
+            for method, pattern, handler in self._route_table()
+        ]
+
+    # -- lifecycle -------------------------------------------------------
+
+    def start(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out as separate writes; do not wait on delayed ACKs
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def _handle(self):
+                mock.dispatch(self)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self._server.server_port}/nifi-api'
+
+    def env(self):
+        """Environment for running commands against this server."""
+        return {
+            'NIFI_API_ENDPOINT': self.url,
+            'NIFI_BEARER_TOKEN': 'mock-token',
+            'NIFI_VERIFY_SSL': 'false',
+            'NIFI_REGISTRY_PROVIDER': 'github',
+            'GH_REGISTRY_TOKEN': 'mock-registry-token',
+            'NIFI_REGISTRY_REPO': 'example/flows',
+            'NIFI_REPOSITORY_PATH': 'tests',
+            'NIFI_BUCKET': BUCKET,
+        }
+
+    # -- request log -----------------------------------------------------
+
+    def reset_log(self):
+        with self._log_lock:
+            self.log = []
+
+    def stats(self):
+        """Summarise the request log: totals and per-endpoint counts and bytes."""
+        with self._log_lock:
+            log = list(self.log)
+        endpoints = {}
+        for entry in log:
+            key = f"{entry['method']} {entry['endpoint']}"
+            agg = endpoints.setdefault(key, {'count': 0, 'bytes_in': 0, 'bytes_out': 0})
+            agg['count'] += 1
+            agg['bytes_in'] += entry['bytes_in']
+            agg['bytes_out'] += entry['bytes_out']
+        return {
+            'requests': len(log),
+            'bytes_in': sum(e['bytes_in'] for e in log),
+            'bytes_out': sum(e['bytes_out'] for e in log),
+            'errors': sum(1 for e in log if e['status'] >= 400),
+            'endpoints': endpoints,
+        }
+
+    # -- dispatch --------------------------------------------------------
+
+    def dispatch(self, request):
+        started = time.monotonic()
+        parsed = urlparse(request.path)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        length = int(request.headers.get('Content-Length') or 0)
+        raw = request.rfile.read(length) if length else b''
+        endpoint = 'UNMATCHED'
+        status, payload = 404, {'message': f'No mock for {request.command} {parsed.path}'}
+        for method, regex, pattern, handler in self.routes:
+            match = regex.match(parsed.path)
+            if match and method == request.command:
+                endpoint = pattern
+                self.canvas.advance()
+                try:
+                    status, payload = 200, handler(raw, query, request.headers, *match.groups())
+                except NotFound as e:
+                    status, payload = 404, str(e)
+                except Conflict as e:
+                    status, payload = 409, str(e)
+                break
+        if self.latency:
+            time.sleep(self.latency)
+
+        if isinstance(payload, (bytes, str)):
+            body = payload if isinstance(payload, bytes) else payload.encode()
+            content_type = 'text/plain'
+        else:
+            body = json.dumps(payload).encode()
+            content_type = 'application/json'
+        request.send_response(status)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+        with self._log_lock:
+            self.log.append({
+                'method': request.command, 'path': parsed.path, 'endpoint': endpoint,
+                'status': status, 'bytes_in': len(raw), 'bytes_out': len(body),
+                'seconds': time.monotonic() - started,
+            })
+
+    # -- routes ----------------------------------------------------------
+
+    def _route_table(self):
+        uid = '([^/]+)'
+        return [
+            ('GET', '/flow/current-user', self.current_user),
+            ('GET', '/flow/about', self.about),
+            ('GET', '/flow/cluster/summary', self.cluster_summary),
+            ('GET', '/flow/bulletin-board', self.bulletin_board),
+            ('GET', '/flow/history', self.history),
+            ('GET', f'/flow/process-groups/{uid}', self.get_group_flow),
+            ('PUT', f'/flow/process-groups/{uid}', self.schedule_group),
+            ('GET', f'/flow/process-groups/{uid}/controller-services', self.list_controllers),
+            ('PUT', f'/flow/process-groups/{uid}/controller-services', self.activate_controllers),
+            ('GET', f'/flow/process-groups/{uid}/status', self.group_status),
+            ('GET', '/flow/parameter-contexts', self.list_contexts),
+            ('GET', '/flow/registries', self.list_registry_clients),
+            ('GET', f'/flow/registries/{uid}/branches', self.list_branches),
+            ('GET', f'/flow/registries/{uid}/buckets', self.list_buckets),
+            ('GET', f'/flow/registries/{uid}/buckets/{uid}/flows', self.list_flows),
+            ('GET', f'/flow/registries/{uid}/buckets/{uid}/flows/{uid}/versions',
+             self.list_versions),
+            ('GET', f'/flow/process-groups/{uid}/processors', self.list_group_processors),
+            ('GET', '/controller/registry-clients', self.list_registry_clients),
+            ('POST', '/controller/registry-clients', self.create_registry_client),
+            ('GET', f'/controller/registry-clients/{uid}', self.get_registry_client),
+            ('PUT', f'/controller/registry-clients/{uid}', self.update_registry_client),
+            ('DELETE', f'/controller/registry-clients/{uid}', self.delete_registry_client),
+            ('GET', f'/process-groups/{uid}', self.get_group),
+            ('PUT', f'/process-groups/{uid}', self.update_group),
+            ('DELETE', f'/process-groups/{uid}', self.delete_group),
+            ('POST', f'/process-groups/{uid}/process-groups', self.create_group),
+            ('POST', f'/process-groups/{uid}/process-groups/upload', self.upload_group),
+            ('GET', f'/process-groups/{uid}/process-groups', self.list_child_groups),
+            ('GET', f'/process-groups/{uid}/processors', self.list_group_processors),
+            ('GET', f'/process-groups/{uid}/connections', self.list_group_connections),
+            ('GET', f'/process-groups/{uid}/input-ports', self.empty_list('inputPorts')),
+            ('GET', f'/process-groups/{uid}/output-ports', self.empty_list('outputPorts')),
+            ('GET', f'/process-groups/{uid}/download', self.download_group),
+            ('GET', f'/process-groups/{uid}/local-modifications', self.local_modifications),
+            ('POST', f'/process-groups/{uid}/empty-all-connections-requests',
+             self.create_drop_request),
+            ('GET', f'/process-groups/{uid}/empty-all-connections-requests/{uid}',
+             self.get_drop_request),
+            ('DELETE', f'/process-groups/{uid}/empty-all-connections-requests/{uid}',
+             self.get_drop_request),
+            ('GET', f'/processors/{uid}', self.get_processor),
+            ('PUT', f'/processors/{uid}/run-status', self.set_processor_run_status),
+            ('GET', f'/connections/{uid}', self.get_connection),
+            ('POST', f'/flowfile-queues/{uid}/drop-requests', self.create_queue_drop_request),
+            ('GET', f'/flowfile-queues/{uid}/drop-requests/{uid}', self.get_queue_drop_request),
+            ('DELETE', f'/flowfile-queues/{uid}/drop-requests/{uid}',
+             self.get_queue_drop_request),
+            ('GET', f'/controller-services/{uid}', self.get_controller),
+            ('GET', f'/parameter-contexts/{uid}', self.get_context),
+            ('DELETE', f'/parameter-contexts/{uid}', self.delete_context),
+            ('POST', '/parameter-contexts', self.create_context),
+            ('POST', f'/parameter-contexts/{uid}/update-requests', self.create_context_update),
+            ('GET', f'/parameter-contexts/{uid}/update-requests/{uid}', self.get_context_update),
+            ('DELETE', f'/parameter-contexts/{uid}/update-requests/{uid}',
+             self.get_context_update),
+            ('GET', f'/versions/process-groups/{uid}', self.get_version_info),
+            ('POST', f'/versions/update-requests/process-groups/{uid}', self.create_version_update),
+            ('GET', f'/versions/update-requests/{uid}', self.get_version_request),
+            ('DELETE', f'/versions/update-requests/{uid}', self.get_version_request),
+            ('POST', f'/versions/revert-requests/process-groups/{uid}', self.create_revert),
+            ('GET', f'/versions/revert-requests/{uid}', self.get_version_request),
+            ('DELETE', f'/versions/revert-requests/{uid}', self.get_version_request),
+        ]
+
+    # Handlers take (raw body, query, headers, *path params) and return a payload
+
+    @staticmethod
+    def _json(raw):
+        return json.loads(raw) if raw else {}
+
+    @staticmethod
+    def empty_list(key):
+        return lambda *args: {key: []}
+
+    def current_user(self, *_):
+        return {'identity': 'mock-user', 'anonymous': False, 'canVersionFlows': True}
+
+    def about(self, *_):
+        return {'about': {'title': 'NiFi', 'version': NIFI_VERSION, 'uri': self.url}}
+
+    def cluster_summary(self, *_):
+        return {'clusterSummary': {'clustered': False, 'connectedToCluster': False}}
+
+    def bulletin_board(self, *_):
+        return {'bulletinBoard': {'bulletins': [], 'generated': time.strftime('%H:%M:%S')}}
+
+    def history(self, _raw, query, _headers):
+        """Flow history: one 'Add' action per process group, at its creation time."""
+        groups = [
+            g for g in self.canvas.groups.values()
+            if g['parent'] and query.get('sourceId') in (None, g['id'])
+        ]
+        actions = [
+            {
+                'id': index, 'sourceId': g['id'], 'canRead': True,
+                'timestamp': time.strftime('%m/%d/%Y %H:%M:%S UTC', time.gmtime(g['created'])),
+                'action': {'id': index, 'sourceId': g['id'], 'sourceName': g['name'],
+                           'sourceType': 'ProcessGroup', 'operation': 'Add'},
+            }
+            for index, g in enumerate(sorted(groups, key=lambda g: g['created']))
+        ]
+        count = int(query.get('count', len(actions)))
+        offset = int(query.get('offset', 0))
+        return {'history': {
+            'total': len(actions), 'lastRefreshed': time.strftime('%H:%M:%S UTC'),
+            'actions': actions[offset:offset + count],
+        }}
+
+    # process groups
+
+    def get_group_flow(self, _raw, _query, _headers, group_id):
+        return self.canvas.group_flow_entity(self.canvas.group(group_id))
+
+    def get_group(self, _raw, _query, _headers, group_id):
+        return self.canvas.group_entity(self.canvas.group(group_id))
+
+    def group_status(self, _raw, query, _headers, group_id):
+        group = self.canvas.group(group_id)
+        if query.get('recursive', '').lower() == 'true':
+            with self.canvas.lock:
+                snapshot = self.canvas.status_snapshot(group)
+            return {'processGroupStatus': {
+                'id': group_id, 'name': group['name'], 'aggregateSnapshot': snapshot,
+            }}
+        entity = self.canvas.group_entity(group)
+        return {'processGroupStatus': entity['status']}
+
+    def list_child_groups(self, _raw, _query, _headers, group_id):
+        group = self.canvas.group(group_id)
+        return {'processGroups': [
+            self.canvas.group_entity(g) for g in self.canvas.groups.values()
+            if g['parent'] == group['id']
+        ]}
+
+    def update_group(self, raw, _query, _headers, group_id):
+        body = self._json(raw)
+        with self.canvas.lock:
+            group = self.canvas.group(group_id)
+            component = body.get('component', {})
+            if 'name' in component:
+                group['name'] = component['name']
+            if 'comments' in component:
+                group['comments'] = component['comments'] or ''
+            if 'parameterContext' in component:
+                ref = component['parameterContext']
+                group['param_ctx'] = ref.get('id') if ref else None
+            if 'position' in component and component['position']:
+                group['position'] = component['position']
+            self.canvas.bump(group['id'])
+            return self.canvas.group_entity(group)
+
+    def delete_group(self, _raw, _query, _headers, group_id):
+        group = self.canvas.group(group_id)
+        entity = self.canvas.group_entity(group)
+        with self.canvas.lock:
+            ids = self.canvas.descendants(group['id'])
+            canvas = self.canvas
+            if any(p['state'] == 'RUNNING' for p in canvas.within(canvas.processors, ids)):
+                raise Conflict(f"Process group {group['id']} has running components")
+            if any(s['state'] == 'ENABLED' for s in canvas.within(canvas.controllers, ids)):
+                raise Conflict(f"Process group {group['id']} has enabled controller services")
+            if any(c['queued'] for c in self.canvas.within(self.canvas.connections, ids)):
+                raise Conflict(f"Process group {group['id']} has queued data")
+            self.canvas.delete_group(group['id'])
+        return entity
+
+    def create_group(self, raw, _query, _headers, parent_id):
+        body = self._json(raw)
+        component = body.get('component', {})
+        vci = component.get('versionControlInformation')
+        if not vci:
+            with self.canvas.lock:
+                parent = self.canvas.group(parent_id)
+                group_id = _new_id()
+                self.canvas.groups[group_id] = {
+                    'id': group_id, 'name': component.get('name', 'New Group'),
+                    'parent': parent['id'], 'vci': None, 'param_ctx': None,
+                    'position': component.get('position') or {'x': 0.0, 'y': 0.0},
+                    'modified': False, 'created': time.time(),
+                    'comments': component.get('comments') or '',
+                }
+                return self.canvas.group_entity(self.canvas.groups[group_id])
+        client = self.canvas.registry_clients.get(vci.get('registryId'))
+        if not client:
+            raise NotFound(f"Unable to find registry client {vci.get('registryId')}")
+        definition, version = self.canvas.flows.load(vci['flowId'])
+        requested = vci.get('version')
+        if requested and requested not in (version, 'latest'):
+            raise NotFound(f"Version {requested} of flow {vci['flowId']} not found")
+        group_id = self.canvas.instantiate(
+            definition, parent_id, position=component.get('position')
+        )
+        with self.canvas.lock:
+            group = self.canvas.groups[group_id]
+            group['vci'] = {
+                'registryId': client['id'], 'registryName': client['name'],
+                'bucketId': vci.get('bucketId', BUCKET), 'bucketName': vci.get('bucketId', BUCKET),
+                'branch': vci.get('branch') or BRANCH,
+                'flowId': vci['flowId'], 'flowName': vci['flowId'],
+                'version': version, 'storageLocation': f"{vci['flowId']}.json",
+            }
+            return self.canvas.group_entity(group)
+
+    def upload_group(self, raw, _query, headers, parent_id):
+        fields = _multipart_fields(headers.get('Content-Type', ''), raw)
+        definition = json.loads(fields['file'])
+        position = None
+        if 'positionX' in fields:
+            position = {'x': float(fields['positionX']), 'y': float(fields.get('positionY', 0))}
+        name = fields.get('groupName', b'').decode() or None
+        group_id = self.canvas.instantiate(definition, parent_id, name=name, position=position)
+        return self.canvas.group_entity(self.canvas.groups[group_id])
+
+    def download_group(self, _raw, _query, _headers, group_id):
+        return self.canvas.export(self.canvas.group(group_id))
+
+    def schedule_group(self, raw, _query, _headers, group_id):
+        body = self._json(raw)
+        state = body.get('state')
+        if state not in ('RUNNING', 'STOPPED'):
+            raise Conflict(f'Unsupported state {state}')
+        self.canvas.schedule(group_id, state)
+        return {'id': group_id, 'state': state}
+
+    def list_controllers(self, _raw, query, _headers, group_id):
+        group = self.canvas.group(group_id)
+        with self.canvas.lock:
+            ids = (
+                self.canvas.descendants(group['id'])
+                if query.get('includeDescendantGroups') == 'true' else [group['id']]
+            )
+            return {'controllerServices': [
+                self.canvas.controller_entity(s)
+                for s in self.canvas.within(self.canvas.controllers, ids)
+            ]}
+
+    def activate_controllers(self, raw, _query, _headers, group_id):
+        body = self._json(raw)
+        state = body.get('state')
+        if state not in ('ENABLED', 'DISABLED'):
+            raise Conflict(f'Unsupported state {state}')
+        self.canvas.activate_controllers(group_id, state)
+        return {'id': group_id, 'state': state}
+
+    def list_group_processors(self, _raw, query, _headers, group_id):
+        group = self.canvas.group(group_id)
+        with self.canvas.lock:
+            ids = (
+                self.canvas.descendants(group['id'])
+                if query.get('includeDescendantGroups') == 'true' else [group['id']]
+            )
+            return {'processors': [
+                self.canvas.processor_entity(p)
+                for p in self.canvas.within(self.canvas.processors, ids)
+            ]}
+
+    def list_group_connections(self, _raw, _query, _headers, group_id):
+        group = self.canvas.group(group_id)
+        with self.canvas.lock:
+            return {'connections': [
+                self.canvas.connection_entity(c)
+                for c in self.canvas.within(self.canvas.connections, [group['id']])
+            ]}
+
+    def local_modifications(self, _raw, _query, _headers, group_id):
+        group = self.canvas.group(group_id)
+        differences = []
+        if group['modified']:
+            differences.append({
+                'componentId': group['id'], 'componentName': group['name'],
+                'componentType': 'ProcessGroup', 'processGroupId': group['id'],
+                'differences': [{'differenceType': 'Component Modified',
+                                 'difference': 'Modified outside version control'}],
+            })
+        return {'componentDifferences': differences}
+
+    # purge
+
+    def _drop_request(self, group_id, request_id, dropped):
+        return {'dropRequest': {
+            'id': request_id, 'uri': f'{self.url}/process-groups/{group_id}/'
+            f'empty-all-connections-requests/{request_id}',
+            'finished': True, 'percentCompleted': 100, 'state': 'Completed',
+            'droppedCount': dropped, 'droppedSize': dropped * 1024,
+            'currentCount': 0, 'originalCount': dropped,
+            'dropped': f'{dropped} / 0 bytes',
+        }}
+
+    def create_drop_request(self, _raw, _query, _headers, group_id):
+        with self.canvas.lock:
+            group = self.canvas.group(group_id)
+            ids = self.canvas.descendants(group['id'])
+            conns = self.canvas.within(self.canvas.connections, ids)
+            dropped = sum(c['queued'] for c in conns)
+            for conn in conns:
+                conn['queued'] = 0
+            request_id = _new_id()
+            self.canvas.requests[request_id] = dropped
+        return self._drop_request(group['id'], request_id, dropped)
+
+    def get_drop_request(self, _raw, _query, _headers, group_id, request_id):
+        if request_id not in self.canvas.requests:
+            raise NotFound(f'Drop request {request_id} not found')
+        return self._drop_request(group_id, request_id, self.canvas.requests[request_id])
+
+    def create_queue_drop_request(self, _raw, _query, _headers, connection_id):
+        with self.canvas.lock:
+            conn = self.canvas.connections.get(connection_id)
+            if not conn:
+                raise NotFound(f'Connection {connection_id} not found')
+            dropped, conn['queued'] = conn['queued'], 0
+            request_id = _new_id()
+            self.canvas.requests[request_id] = dropped
+        return self._drop_request(connection_id, request_id, dropped)
+
+    def get_queue_drop_request(self, _raw, _query, _headers, connection_id, request_id):
+        if request_id not in self.canvas.requests:
+            raise NotFound(f'Drop request {request_id} not found')
+        return self._drop_request(connection_id, request_id, self.canvas.requests[request_id])
+
+    # components
+
+    def get_processor(self, _raw, _query, _headers, processor_id):
+        proc = self.canvas.processors.get(processor_id)
+        if not proc:
+            raise NotFound(f'Processor {processor_id} not found')
+        return self.canvas.processor_entity(proc)
+
+    def set_processor_run_status(self, raw, _query, _headers, processor_id):
+        body = self._json(raw)
+        with self.canvas.lock:
+            proc = self.canvas.processors.get(processor_id)
+            if not proc:
+                raise NotFound(f'Processor {processor_id} not found')
+            proc['state'] = body.get('state', proc['state'])
+            self.canvas.bump(processor_id)
+            return self.canvas.processor_entity(proc)
+
+    def get_connection(self, _raw, _query, _headers, connection_id):
+        conn = self.canvas.connections.get(connection_id)
+        if not conn:
+            raise NotFound(f'Connection {connection_id} not found')
+        return self.canvas.connection_entity(conn)
+
+    def get_controller(self, _raw, _query, _headers, service_id):
+        svc = self.canvas.controllers.get(service_id)
+        if not svc:
+            raise NotFound(f'Controller service {service_id} not found')
+        return self.canvas.controller_entity(svc)
+
+    # parameter contexts
+
+    def _context(self, context_id):
+        ctx = self.canvas.contexts.get(context_id)
+        if not ctx:
+            raise NotFound(f'Unable to find parameter context with id {context_id}')
+        return ctx
+
+    def list_contexts(self, *_):
+        return {'parameterContexts': [
+            self.canvas.context_entity(c) for c in self.canvas.contexts.values()
+        ]}
+
+    def get_context(self, _raw, _query, _headers, context_id):
+        return self.canvas.context_entity(self._context(context_id))
+
+    def create_context(self, raw, *_):
+        component = self._json(raw).get('component', {})
+        context_id = _new_id()
+        with self.canvas.lock:
+            self.canvas.contexts[context_id] = {
+                'id': context_id, 'name': component.get('name', context_id),
+                'description': component.get('description', ''),
+                'parameters': {
+                    p['parameter']['name']: dict(p['parameter'])
+                    for p in component.get('parameters') or []
+                },
+                'inherited': [c['id'] for c in component.get('inheritedParameterContexts') or []],
+            }
+        return self.canvas.context_entity(self.canvas.contexts[context_id])
+
+    def delete_context(self, _raw, _query, _headers, context_id):
+        with self.canvas.lock:
+            ctx = self._context(context_id)
+            if any(g['param_ctx'] == context_id for g in self.canvas.groups.values()):
+                raise Conflict(f"Parameter context {ctx['name']} is bound to a process group")
+            entity = self.canvas.context_entity(ctx)
+            del self.canvas.contexts[context_id]
+        return entity
+
+    def _context_request(self, context_id, request_id):
+        ctx = self._context(context_id)
+        return {
+            'parameterContextRevision': self.canvas.revision(context_id),
+            'request': {
+                'requestId': request_id,
+                'uri': f'{self.url}/parameter-contexts/{context_id}/update-requests/{request_id}',
+                'complete': True, 'percentCompleted': 100, 'state': 'Complete',
+                'parameterContext': self.canvas.context_entity(ctx)['component'],
+                'updateSteps': [], 'referencingComponents': [],
+            },
+        }
+
+    def create_context_update(self, raw, _query, _headers, context_id):
+        component = self._json(raw).get('component', {})
+        with self.canvas.lock:
+            ctx = self._context(context_id)
+            for item in component.get('parameters') or []:
+                param = item['parameter']
+                if param.get('value') is None and not param.get('sensitive') and \
+                        'value' in param and param['name'] in ctx['parameters'] and \
+                        item.get('canWrite', True) and param.get('valueRemoved'):
+                    del ctx['parameters'][param['name']]
+                    continue
+                existing = ctx['parameters'].setdefault(param['name'], {'name': param['name']})
+                existing.update({k: v for k, v in param.items() if k != 'inherited'})
+            if 'inheritedParameterContexts' in component:
+                ctx['inherited'] = [
+                    c['id'] for c in component['inheritedParameterContexts'] or []
+                ]
+            self.canvas.bump(context_id)
+            request_id = _new_id()
+        return self._context_request(context_id, request_id)
+
+    def get_context_update(self, _raw, _query, _headers, context_id, request_id):
+        return self._context_request(context_id, request_id)
+
+    # registry
+
+    def list_registry_clients(self, *_):
+        return {'registries': [
+            self.canvas.registry_client_entity(c) for c in self.canvas.registry_clients.values()
+        ]}
+
+    def _registry_client(self, client_id):
+        client = self.canvas.registry_clients.get(client_id)
+        if not client:
+            raise NotFound(f'Unable to find registry client with id {client_id}')
+        return client
+
+    def get_registry_client(self, _raw, _query, _headers, client_id):
+        return self.canvas.registry_client_entity(self._registry_client(client_id))
+
+    def create_registry_client(self, raw, *_):
+        component = self._json(raw).get('component', {})
+        client_id = _new_id()
+        with self.canvas.lock:
+            self.canvas.registry_clients[client_id] = {
+                'id': client_id, 'name': component.get('name', client_id),
+                'type': component.get('type', 'org.apache.nifi.github.GitHubFlowRegistryClient'),
+                'description': component.get('description', ''),
+                'properties': {
+                    k: ('********' if v and 'Token' in k else v)
+                    for k, v in (component.get('properties') or {}).items()
+                },
+            }
+        return self.canvas.registry_client_entity(self.canvas.registry_clients[client_id])
+
+    def update_registry_client(self, raw, _query, _headers, client_id):
+        component = self._json(raw).get('component', {})
+        with self.canvas.lock:
+            client = self._registry_client(client_id)
+            client['properties'].update(
+                (k, '********' if v and 'Token' in k else v)
+                for k, v in (component.get('properties') or {}).items()
+            )
+            for key in ('name', 'description'):
+                if component.get(key) is not None:
+                    client[key] = component[key]
+            self.canvas.bump(client_id)
+        return self.canvas.registry_client_entity(client)
+
+    def delete_registry_client(self, _raw, _query, _headers, client_id):
+        with self.canvas.lock:
+            entity = self.canvas.registry_client_entity(self._registry_client(client_id))
+            del self.canvas.registry_clients[client_id]
+        return entity
+
+    def list_branches(self, _raw, _query, _headers, client_id):
+        self._registry_client(client_id)
+        return {'branches': [{'branch': {'name': BRANCH}}]}
+
+    def list_buckets(self, _raw, _query, _headers, client_id):
+        self._registry_client(client_id)
+        return {'buckets': [{
+            'id': BUCKET,
+            'bucket': {'identifier': BUCKET, 'name': BUCKET},
+            'permissions': {'canRead': True, 'canWrite': True},
+        }]}
+
+    def _snapshot_metadata(self, flow_id):
+        return {
+            'bucketIdentifier': BUCKET, 'flowIdentifier': flow_id, 'branch': BRANCH,
+            'version': self.canvas.flows.version(flow_id), 'timestamp': 0,
+            'author': 'mock', 'comments': f'{flow_id} from tests/flows',
+        }
+
+    def list_flows(self, _raw, _query, _headers, client_id, bucket_id):
+        self._registry_client(client_id)
+        if bucket_id != BUCKET:
+            raise NotFound(f'Bucket {bucket_id} not found')
+        return {'versionedFlows': [
+            {'versionedFlow': {
+                'registryId': client_id, 'bucketId': BUCKET, 'bucketName': BUCKET,
+                'flowId': flow_id, 'flowName': flow_id, 'branch': BRANCH,
+                'description': '', 'lastModified': 0,
+            }}
+            for flow_id in self.canvas.flows.flow_ids()
+        ]}
+
+    def list_versions(self, _raw, _query, _headers, client_id, bucket_id, flow_id):
+        self._registry_client(client_id)
+        if bucket_id != BUCKET:
+            raise NotFound(f'Bucket {bucket_id} not found')
+        return {'versionedFlowSnapshotMetadataSet': [{
+            'registryId': client_id,
+            'versionedFlowSnapshotMetadata': self._snapshot_metadata(flow_id),
+        }]}
+
+    # versioning
+
+    def get_version_info(self, _raw, _query, _headers, group_id):
+        group = self.canvas.group(group_id)
+        return {
+            'processGroupRevision': self.canvas.revision(group['id']),
+            'versionControlInformation': self.canvas.vci_component(group),
+        }
+
+    def _version_request(self, group_id, request_id):
+        group = self.canvas.group(group_id)
+        return {
+            'processGroupRevision': self.canvas.revision(group['id']),
+            'request': {
+                'requestId': request_id, 'processGroupId': group['id'],
+                'uri': f'{self.url}/versions/update-requests/{request_id}',
+                'complete': True, 'failureReason': None, 'percentCompleted': 100,
+                'state': 'Complete',
+                'versionControlInformation': self.canvas.vci_component(group),
+            },
+        }
+
+    def create_version_update(self, raw, _query, _headers, group_id):
+        body = self._json(raw)
+        vci = body.get('versionControlInformation') or {}
+        with self.canvas.lock:
+            group = self.canvas.group(group_id)
+            if not group['vci']:
+                raise Conflict(f"Process group {group['id']} is not under version control")
+            available = self.canvas.flows.version(group['vci']['flowId'])
+            if vci.get('version') not in (None, available):
+                raise NotFound(f"Version {vci.get('version')} not found")
+            group['vci']['version'] = available
+            group['modified'] = False
+            self.canvas.bump(group['id'])
+            request_id = _new_id()
+            self.canvas.requests[request_id] = group['id']
+        return self._version_request(group['id'], request_id)
+
+    def create_revert(self, _raw, _query, _headers, group_id):
+        with self.canvas.lock:
+            group = self.canvas.group(group_id)
+            group['modified'] = False
+            self.canvas.bump(group['id'])
+            request_id = _new_id()
+            self.canvas.requests[request_id] = group['id']
+        return self._version_request(group['id'], request_id)
+
+    def get_version_request(self, _raw, _query, _headers, request_id):
+        group_id = self.canvas.requests.get(request_id)
+        if not group_id:
+            raise NotFound(f'Request {request_id} not found')
+        return self._version_request(group_id, request_id)
+
+
+if __name__ == '__main__':
+    # Serve until interrupted, for manual exploration with the nipyapi CLI
+    with MockNiFi() as server:
+        print(f'Mock NiFi listening on {server.url}')
+        for key, value in server.env().items():
+            print(f'export {key}={value}')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
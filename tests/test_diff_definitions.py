@@ -0,0 +1,101 @@
+"""Tests for diff_definitions."""
+
+import copy
+import json
+import uuid
+
+import pytest
+
+from conftest import DEMO_FLOW, INHERITANCE_FLOW
+from nipyapi_actions.diff_definitions import diff_definitions
+
+
+def _diff(base, target, **kwargs):
+    result = diff_definitions(base, target, **kwargs)
+    return result, json.loads(result['differences'])
+
+
+def test_same_file_is_identical():
+    result, differences = _diff(DEMO_FLOW, DEMO_FLOW)
+    assert result['identical'] == 'true'
+    assert result['change_count'] == '0'
+    assert differences == []
+
+
+def test_layout_and_instance_ids_are_ignored_at_every_depth(demo_flow, write_flow):
+    moved = copy.deepcopy(demo_flow)
+    contents = moved['flowContents']
+    contents['position'] = {'x': 0.0, 'y': 0.0}
+    for component in contents['processors'] + contents['controllerServices']:
+        component['instanceIdentifier'] = str(uuid.uuid4())
+        component['position'] = {'x': 1.0, 'y': 2.0}
+    for connection in contents['connections']:
+        connection['instanceIdentifier'] = str(uuid.uuid4())
+        connection['bends'] = [{'x': 5.0, 'y': 5.0}]
+        connection['source']['instanceIdentifier'] = str(uuid.uuid4())
+        connection['destination']['instanceIdentifier'] = str(uuid.uuid4())
+
+    result, _ = _diff(write_flow(demo_flow, 'base.json'), write_flow(moved, 'moved.json'))
+    assert result['identical'] == 'true'
+
+
+def test_property_change_is_reported_per_key(demo_flow, write_flow):
+    changed = copy.deepcopy(demo_flow)
+    processor = changed['flowContents']['processors'][0]
+    processor['properties']['Listening Port'] = '9999'
+
+    result, differences = _diff(write_flow(demo_flow, 'base.json'), write_flow(changed))
+    assert result['identical'] == 'false'
+    assert differences == [{
+        'change': 'changed',
+        'kind': 'processor',
+        'id': processor['identifier'],
+        'name': processor['name'],
+        'group': 'nipyapi_test_cicd_demo',
+        'fields': ['properties.Listening Port'],
+    }]
+
+
+def test_added_removed_and_summary(demo_flow, write_flow):
+    changed = copy.deepcopy(demo_flow)
+    removed = changed['flowContents']['processors'].pop()
+    added = dict(removed, identifier=str(uuid.uuid4()), name='Extra')
+    changed['flowContents']['processors'].append(added)
+
+    result, differences = _diff(write_flow(demo_flow, 'base.json'), write_flow(changed))
+    assert {(d['change'], d['name']) for d in differences} == {
+        ('added', 'Extra'),
+        ('removed', removed['name']),
+    }
+    assert json.loads(result['summary']) == {
+        'processor': {'added': 1, 'removed': 1, 'changed': 0}
+    }
+
+
+def test_sensitive_parameter_values_are_not_compared(demo_flow, write_flow):
+    base = copy.deepcopy(demo_flow)
+    changed = copy.deepcopy(demo_flow)
+    for definition, value in ((base, 'old'), (changed, 'new')):
+        parameter = definition['parameterContexts']['nipyapi_test_cicd_params']['parameters'][0]
+        parameter.update(sensitive=True, value=value)
+
+    result, _ = _diff(write_flow(base, 'base.json'), write_flow(changed))
+    assert result['identical'] == 'true'
+
+
+def test_max_items_truncates_the_list_not_the_counts():
+    result, differences = _diff(DEMO_FLOW, INHERITANCE_FLOW, max_items=1)
+    assert len(differences) == 1
+    assert int(result['change_count']) > 1
+    assert result['truncated'] == 'true'
+
+
+def test_invalid_inputs(tmp_path):
+    with pytest.raises(ValueError, match='not found'):
+        diff_definitions(DEMO_FLOW, str(tmp_path / 'missing.json'))
+    not_a_flow = tmp_path / 'other.json'
+    not_a_flow.write_text('{"name": "x"}')
+    with pytest.raises(ValueError, match='not a flow definition'):
+        diff_definitions(DEMO_FLOW, str(not_a_flow))
+    with pytest.raises(ValueError, match='base_file is required'):
+        diff_definitions(None, DEMO_FLOW)
@@ -0,0 +1,55 @@
+"""Tests for outputs.format_output and outputs.jsonl_record."""
+
+import json
+
+import pytest
+
+from nipyapi_actions.outputs import format_output, jsonl_record
+
+
+def test_github_uses_kebab_case_keys():
+    assert format_output('process_group_id', 'abc', 'github') == 'process-group-id=abc'
+
+
+@pytest.mark.parametrize('value', ['line 1\nline 2', 'x' * 501])
+def test_github_heredoc_for_multiline_and_long_values(value):
+    assert format_output('report', value, 'github') == f'report<<EOF\n{value}\nEOF'
+
+
+def test_github_serializes_lists_as_json():
+    assert format_output('names', ['a', 'b'], 'github') == 'names=["a", "b"]'
+
+
+def test_dotenv_upper_case_and_quoting():
+    assert format_output('state', 'RUNNING', 'dotenv') == 'STATE=RUNNING'
+    assert format_output('message', 'say "hi" now', 'dotenv') == 'MESSAGE="say \\"hi\\" now"'
+
+
+@pytest.mark.parametrize('value', ['line 1\nline 2', 'x' * 1000])
+def test_dotenv_skips_what_gitlab_rejects(value):
+    assert format_output('report', value, 'dotenv') is None
+
+
+def test_json_keeps_the_value():
+    assert json.loads(format_output('count', 3, 'json')) == {'count': 3}
+
+
+@pytest.mark.parametrize('value, kind, typed', [
+    ('["a", "b"]', 'array', ['a', 'b']),
+    ('{"a": 1}', 'object', {'a': 1}),
+    ('true', 'boolean', True),
+    ('false', 'boolean', False),
+    ('1.10', 'string', '1.10'),
+    ('[not json', 'string', '[not json'),
+    (3, 'number', 3),
+    (None, 'null', None),
+])
+def test_jsonl_record_types(value, kind, typed):
+    record = json.loads(jsonl_record('some_key', value))
+    assert record == {'key': 'some-key', 'type': kind, 'value': typed}
+
+
+def test_jsonl_record_is_one_line_with_key_first():
+    line = jsonl_record('report', 'a\nb')
+    assert '\n' not in line
+    assert line.startswith('{"key":"report",')
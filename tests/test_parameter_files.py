@@ -0,0 +1,102 @@
+"""Tests for parameter_files.read_parameters."""
+
+import io
+
+import pytest
+
+from nipyapi_actions.parameter_files import read_parameters
+
+
+def _values(parameters):
+    return {name: p['value'] for name, p in parameters.items()}
+
+
+@pytest.mark.parametrize('name, content', [
+    ('params.json', '{"host": "db", "port": 5432, "ratio": 1.10, "debug": true}'),
+    ('params.yaml', "host: db\nport: '5432'\nratio: '1.10'\ndebug: 'true'\n"),
+    ('params.env', 'host=db\nexport port=5432\nratio="1.10"\ndebug=true  # inline comment\n'),
+])
+def test_formats_keep_values_as_written(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    assert _values(read_parameters(str(path))) == {
+        'host': 'db', 'port': '5432', 'ratio': '1.10', 'debug': 'true',
+    }
+
+
+def test_format_detected_from_content(tmp_path):
+    path = tmp_path / 'params'
+    path.write_text('\n# comment\nA=1\n')
+    assert _values(read_parameters(str(path))) == {'A': '1'}
+    path.write_text('a: b\n')
+    assert _values(read_parameters(str(path))) == {'a': 'b'}
+
+
+def test_dotenv_quoting_and_escapes(tmp_path):
+    path = tmp_path / 'params.env'
+    path.write_text('A="line\\nnext"\nB=\'#{literal}\'\nC=\n')
+    assert _values(read_parameters(str(path))) == {'A': 'line\nnext', 'B': '#{literal}', 'C': ''}
+
+
+@pytest.mark.parametrize('value', ['yes', '1.10', '2024-01-01', '8080'])
+def test_yaml_values_that_are_not_strings_must_be_quoted(tmp_path, value):
+    path = tmp_path / 'params.yaml'
+    path.write_text(f'a: {value}\n')
+    with pytest.raises(ValueError, match='quote the value'):
+        read_parameters(str(path))
+
+
+def test_sensitivity_from_source_and_patterns(tmp_path):
+    path = tmp_path / 'params.json'
+    path.write_text('{"db_password": "x", "token": {"value": "t", "sensitive": true}, "host": "h"}')
+    seen = []
+    parameters = read_parameters(
+        str(path),
+        sensitive_patterns=['*_password'],
+        on_value=lambda name, value, sensitive: seen.append((name, sensitive)),
+    )
+    assert {name: p['sensitive'] for name, p in parameters.items()} == {
+        'db_password': True, 'token': True, 'host': None,
+    }
+    assert seen == [('db_password', True), ('token', True), ('host', False)]
+
+
+def test_inline_overrides_file(tmp_path):
+    path = tmp_path / 'params.env'
+    path.write_text('A=file\nB=file\n')
+    parameters = read_parameters(str(path), inline='{"B": "inline", "C": 1.50}')
+    assert _values(parameters) == {'A': 'file', 'B': 'inline', 'C': '1.50'}
+
+
+def test_stdin():
+    parameters = read_parameters('-', stdin=io.StringIO('{"A": "1"}'))
+    assert _values(parameters) == {'A': '1'}
+
+
+@pytest.mark.parametrize('content', ['', '\n\n', '{}'])
+def test_empty_sources_read_nothing(content):
+    assert read_parameters('-', stdin=io.StringIO(content)) == {}
+
+
+@pytest.mark.parametrize('name, content, message', [
+    ('params.json', '["a"]', 'must contain a mapping'),
+    ('params.json', '{"a": null}', 'scalar value'),
+    ('params.json', '{"a": ["x"]}', 'scalar value'),
+    ('params.json', '{"a": {"sensitive": true}}', 'has no value'),
+    ('params.json', '{"a": ', 'Invalid json'),
+    ('params.env', 'not a pair\n', 'expected NAME=value'),
+])
+def test_malformed_files(tmp_path, name, content, message):
+    path = tmp_path / name
+    path.write_text(content)
+    with pytest.raises(ValueError, match=message):
+        read_parameters(str(path))
+
+
+def test_missing_file_and_bad_inline(tmp_path):
+    with pytest.raises(ValueError, match='not found'):
+        read_parameters(str(tmp_path / 'missing.env'))
+    with pytest.raises(ValueError, match='Invalid JSON'):
+        read_parameters(inline='{"a": ')
+    with pytest.raises(ValueError, match='JSON object'):
+        read_parameters(inline='["a"]')
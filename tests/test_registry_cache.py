@@ -0,0 +1,70 @@
+"""Tests for registry_cache.read_entry, write_entry and cached."""
+
+import json
+import os
+import time
+
+import pytest
+
+from nipyapi_actions import registry_cache
+from nipyapi_actions.registry_cache import cached, read_entry, write_entry
+
+
+def _entry(path, created, head=None, result=None):
+    path.write_text(json.dumps({'created': created, 'head': head, 'result': result or {'a': '1'}}))
+    return str(path)
+
+
+def test_fresh_entry_is_returned(tmp_path):
+    path = _entry(tmp_path / 'e.json', time.time())
+    assert read_entry(path, 60, None) == {'a': '1'}
+
+
+def test_expired_entry_is_ignored(tmp_path):
+    path = _entry(tmp_path / 'e.json', time.time() - 61)
+    assert read_entry(path, 60, None) is None
+
+
+def test_entry_from_another_head_is_ignored(tmp_path):
+    path = _entry(tmp_path / 'e.json', time.time(), head='abc')
+    assert read_entry(path, 60, 'abc') == {'a': '1'}
+    assert read_entry(path, 60, 'def') is None
+    # Without a head to compare, age alone decides
+    assert read_entry(path, 60, None) == {'a': '1'}
+
+
+@pytest.mark.parametrize('content', [None, '', '{not json', '{"created": '])
+def test_missing_or_corrupt_entry_is_a_miss(tmp_path, content):
+    path = tmp_path / 'e.json'
+    if content is not None:
+        path.write_text(content)
+    assert read_entry(str(path), 60, None) is None
+
+
+def test_write_then_read(tmp_path):
+    path = str(tmp_path / 'cache' / 'e.json')
+    write_entry(path, {'flows': '[]'}, 'abc')
+    assert read_entry(path, 60, 'abc') == {'flows': '[]'}
+    assert oct(os.stat(path).st_mode & 0o777) == oct(0o600)
+    assert os.listdir(tmp_path / 'cache') == ['e.json']
+
+
+def test_cached_hit_miss_and_off(tmp_path, monkeypatch):
+    monkeypatch.setenv('NIFI_REGISTRY_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(registry_cache, 'head_sha', lambda branch: None)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {'flows': '["a"]'}
+
+    assert cached(('client', 'main', 'bucket'), None, fetch)['registry_cache'] == 'miss'
+    assert cached(('client', 'main', 'bucket'), None, fetch) == {
+        'flows': '["a"]', 'registry_cache': 'hit',
+    }
+    assert len(calls) == 1
+    assert cached(('client', 'main', 'other'), None, fetch)['registry_cache'] == 'miss'
+
+    monkeypatch.setenv('NIFI_REGISTRY_CACHE_TTL', '0')
+    assert cached(('client', 'main', 'bucket'), None, fetch)['registry_cache'] == 'off'
+    assert len(calls) == 3
@@ -0,0 +1,121 @@
+"""Tests for runner.parse_steps and runner.run_steps."""
+
+import os
+
+import pytest
+
+from nipyapi_actions import runner
+
+
+def test_parse_steps_plain_string():
+    assert runner.parse_steps('ensure-registry, deploy-flow start-flow') == [
+        ('ensure-registry', {}),
+        ('deploy-flow', {}),
+        ('start-flow', {}),
+    ]
+
+
+def test_parse_steps_yaml_with_inputs():
+    steps = runner.parse_steps(
+        '- ensure-registry\n'
+        '- command: deploy-flow\n'
+        '  flow: my-flow\n'
+        '  parent-id:\n'
+    )
+    assert steps == [
+        ('ensure-registry', {}),
+        ('deploy-flow', {'NIFI_FLOW': 'my-flow', 'NIFI_PARENT_ID': ''}),
+    ]
+
+
+def test_parse_steps_accepts_parsed_list():
+    assert runner.parse_steps([{'command': 'stop-flow', 'wait': True}]) == [
+        ('stop-flow', {'NIFI_WAIT': 'True'}),
+    ]
+
+
+@pytest.mark.parametrize('spec', ['', '[]', '{command: deploy-flow}', '- [deploy-flow]'])
+def test_parse_steps_rejects_malformed(spec):
+    with pytest.raises(ValueError):
+        runner.parse_steps(spec)
+
+
+def test_parse_steps_rejects_unknown_command():
+    with pytest.raises(ValueError, match='no-such-command'):
+        runner.parse_steps('deploy-flow, no-such-command')
+
+
+def test_parse_steps_rejects_unknown_input():
+    with pytest.raises(ValueError, match='Unknown input'):
+        runner.parse_steps([{'command': 'deploy-flow', 'no-such-input': 'x'}])
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    """Replace the command registry with fakes; returns name -> function."""
+    registry = {}
+    monkeypatch.setattr(runner, 'get_command', registry.__getitem__)
+    return registry
+
+
+def test_run_steps_forwards_outputs_and_applies_overrides(commands):
+    seen = {}
+
+    def deploy():
+        seen['flow'] = os.environ.get('NIFI_FLOW')
+        return {'process_group_id': 'pg-1', 'process_group_name': 'demo'}
+
+    def start():
+        seen['pg'] = os.environ.get('NIFI_PROCESS_GROUP_ID')
+        return {'state': 'RUNNING'}
+
+    commands.update({'deploy-flow': deploy, 'start-flow': start})
+    streamed = []
+    outputs, failed = runner.run_steps(
+        [('deploy-flow', {'NIFI_FLOW': 'demo'}), ('start-flow', {})], on_result=streamed.append
+    )
+
+    assert failed is None
+    assert seen == {'flow': 'demo', 'pg': 'pg-1'}
+    assert 'NIFI_FLOW' not in os.environ  # overrides only last for their step
+    assert outputs['process_group_name'] == 'demo'
+    assert outputs['state'] == 'RUNNING'
+    assert [t['command'] for t in outputs['step_timings']] == ['deploy-flow', 'start-flow']
+    assert len(streamed) == 2
+
+
+def test_run_steps_stops_at_error(commands):
+    ran = []
+    commands.update({
+        'get-status': lambda: ran.append('get-status') or {'error': 'boom'},
+        'start-flow': lambda: ran.append('start-flow') or {},
+    })
+    outputs, failed = runner.run_steps([('get-status', {}), ('start-flow', {})])
+
+    assert failed == 'get-status'
+    assert outputs['failed_step'] == 'get-status'
+    assert outputs['error'] == 'boom'
+    assert ran == ['get-status']
+
+
+def test_run_steps_counts_are_not_failures(commands):
+    commands.update({
+        'load-test': lambda: {'error_count': '3', 'errors': '3'},
+        'get-status': lambda: {'state': 'RUNNING'},
+    })
+    outputs, failed = runner.run_steps([('load-test', {}), ('get-status', {})])
+
+    assert failed is None
+    assert outputs['state'] == 'RUNNING'
+
+
+def test_run_steps_reports_exceptions(commands):
+    def broken():
+        raise ValueError('process_group_id is required')
+
+    commands['start-flow'] = broken
+    outputs, failed = runner.run_steps([('start-flow', {})])
+
+    assert failed == 'start-flow'
+    assert outputs['error'] == 'process_group_id is required'
+    assert outputs['error_type'] == 'ValueError'
@@ -0,0 +1,143 @@
+"""Tests for the validate_flow rules."""
+
+import copy
+import json
+
+import pytest
+
+from conftest import DEMO_FLOW, INHERITANCE_FLOW
+from nipyapi_actions.validate_flow import parameter_references, parse_data_size, validate_flow
+
+CONTEXT = 'nipyapi_test_cicd_params'
+
+
+def _rules(write_flow, definition, **kwargs):
+    result = validate_flow(write_flow(definition), **kwargs)
+    return result, [(f['severity'], f['rule']) for f in json.loads(result['findings'])]
+
+
+def _processor(definition, name):
+    return next(p for p in definition['flowContents']['processors'] if p['name'] == name)
+
+
+def test_bundled_flows_are_valid():
+    result = validate_flow([DEMO_FLOW, INHERITANCE_FLOW], max_workers=1)
+    assert result['valid'] == 'true'
+    assert result['file_count'] == '2'
+    assert json.loads(result['findings']) == []
+    assert 'error' not in result
+
+
+def test_missing_parameter(demo_flow, write_flow):
+    _processor(demo_flow, 'HandleHTTPResponse')['properties']['version'] = '#{nope}'
+    result, rules = _rules(write_flow, demo_flow)
+    assert ('error', 'missing-parameter') in rules
+    # version is no longer referenced anywhere
+    assert ('warning', 'unused-parameter') in rules
+    assert result['valid'] == 'false'
+    assert 'error' in result
+
+
+def test_malformed_reference(demo_flow, write_flow):
+    _processor(demo_flow, 'HandleHTTPResponse')['properties']['version'] = '#{version'
+    _, rules = _rules(write_flow, demo_flow)
+    assert ('error', 'invalid-parameter-reference') in rules
+
+
+def test_no_and_unknown_parameter_context(demo_flow, write_flow):
+    without = copy.deepcopy(demo_flow)
+    del without['flowContents']['parameterContextName']
+    _, rules = _rules(write_flow, without)
+    assert ('error', 'no-parameter-context') in rules
+
+    demo_flow['flowContents']['parameterContextName'] = 'elsewhere'
+    _, rules = _rules(write_flow, demo_flow)
+    assert ('error', 'unknown-parameter-context') in rules
+
+
+def test_sensitive_parameter_mismatch(demo_flow, write_flow):
+    demo_flow['parameterContexts'][CONTEXT]['parameters'][0]['sensitive'] = True
+    _, rules = _rules(write_flow, demo_flow)
+    assert ('error', 'sensitive-parameter-mismatch') in rules
+
+
+def test_inherited_parameters_resolve(demo_flow, write_flow):
+    parameters = demo_flow['parameterContexts'][CONTEXT].pop('parameters')
+    demo_flow['parameterContexts'][CONTEXT]['inheritedParameterContexts'] = ['base']
+    demo_flow['parameterContexts']['base'] = {'name': 'base', 'parameters': parameters}
+    _, rules = _rules(write_flow, demo_flow)
+    assert rules == []
+
+
+def test_controller_service_rules(demo_flow, write_flow):
+    unused = copy.deepcopy(demo_flow)
+    for processor in unused['flowContents']['processors']:
+        processor['properties']['HTTP Context Map'] = None
+    _, rules = _rules(write_flow, unused)
+    assert ('warning', 'unused-controller-service') in rules
+
+    missing = copy.deepcopy(demo_flow)
+    missing['flowContents']['controllerServices'] = []
+    _, rules = _rules(write_flow, missing)
+    assert ('error', 'missing-controller-service') in rules
+
+    # A service in a sibling group is out of scope
+    contents = demo_flow['flowContents']
+    sibling = {'identifier': 'sibling', 'name': 'sibling', 'processGroups': [],
+               'controllerServices': contents.pop('controllerServices')}
+    contents['processGroups'] = [sibling]
+    _, rules = _rules(write_flow, demo_flow)
+    assert ('error', 'controller-service-out-of-scope') in rules
+
+
+def test_connection_rules(demo_flow, write_flow):
+    connection = demo_flow['flowContents']['connections'][0]
+    connection['destination']['id'] = 'gone'
+    connection['backPressureObjectThreshold'] = 10
+    _, rules = _rules(write_flow, demo_flow)
+    assert ('error', 'dangling-connection') in rules
+    assert ('warning', 'backpressure-low') in rules
+
+    connection.update(backPressureObjectThreshold=0, backPressureDataSizeThreshold='0 B')
+    _, rules = _rules(write_flow, demo_flow)
+    assert ('warning', 'backpressure-disabled') in rules
+
+
+def test_fail_on_warning(demo_flow, write_flow):
+    demo_flow['flowContents']['connections'][0]['backPressureObjectThreshold'] = 10
+    result, _ = _rules(write_flow, demo_flow)
+    assert result['valid'] == 'true'
+    assert 'error' not in result
+    result, _ = _rules(write_flow, demo_flow, fail_on='warning')
+    assert 'error' in result
+
+
+def test_invalid_definition_is_a_finding(tmp_path):
+    broken = tmp_path / 'broken.json'
+    broken.write_text('{"no": "flowContents"}')
+    result = validate_flow(str(broken))
+    assert [f['rule'] for f in json.loads(result['findings'])] == ['invalid-definition']
+
+
+def test_no_files_match(tmp_path):
+    with pytest.raises(ValueError, match='No flow definition files'):
+        validate_flow(str(tmp_path / '*.json'))
+
+
+@pytest.mark.parametrize('value, names, malformed', [
+    ('#{a} and #{b c}', ['a', 'b c'], []),
+    ("#{'quoted name'}", ['quoted name'], []),
+    ('##{escaped}', [], []),
+    ('###{odd}', ['odd'], []),
+    ('#{bad/name}', [], ['#{bad/name}']),
+    ('#{unclosed', [], ['#{unclosed']),
+])
+def test_parameter_references(value, names, malformed):
+    assert parameter_references(value) == (names, malformed)
+
+
+@pytest.mark.parametrize('value, size', [
+    ('1 GB', 1024**3), ('10 MB', 10 * 1024**2), ('0 B', 0), ('512', 512), ('lots', None),
+])
+def test_parse_data_size(value, size):
+    assert parse_data_size(value) == size
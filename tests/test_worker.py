@@ -0,0 +1,88 @@
+"""Tests for the worker: argument parsing and a start/run/stop round trip against mock NiFi."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from nipyapi_actions.worker import _wants_stdin, parse_args
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+
+def test_parse_args():
+    assert parse_args(['deploy-flow', '--flow', 'demo', 'start-flow', '--wait']) == [
+        {'command': 'deploy-flow', 'flow': 'demo'},
+        {'command': 'start-flow', 'wait': 'true'},
+    ]
+    assert parse_args(['cleanup', '--delete_parameter_context', '--x=--y']) == [
+        {'command': 'cleanup', 'delete-parameter-context': 'true', 'x': '--y'},
+    ]
+
+
+@pytest.mark.parametrize('argv', [[], ['--flow', 'demo']])
+def test_parse_args_rejects(argv):
+    with pytest.raises(ValueError):
+        parse_args(argv)
+
+
+def test_wants_stdin():
+    assert _wants_stdin(['configure-params', '--parameters-file', '-'], {})
+    assert _wants_stdin(['configure-params'], {'NIFI_PARAMETERS_FILE': '-'})
+    assert not _wants_stdin(['configure-params', '--parameters-file', 'p.env'], {})
+
+
+@pytest.fixture
+def worker(mock_nifi, tmp_path):
+    """Run ``python -m nipyapi_actions.worker ...`` against the mock; stops the worker after."""
+    env = dict(os.environ)
+    env.update(mock_nifi.env())
+    env.update(
+        PYTHONPATH=SRC,
+        NIFI_WORKER_SOCKET=str(tmp_path / 'worker.sock'),
+        NIFI_OUTPUT_FORMAT='json',
+    )
+
+    def call(*args, stdin=''):
+        return subprocess.run(
+            [sys.executable, '-m', 'nipyapi_actions.worker', *args],
+            env=env, input=stdin, capture_output=True, text=True, timeout=120, check=False,
+        )
+
+    yield call
+    call('stop')
+
+
+def test_round_trip(worker, mock_nifi):
+    started = worker('start')
+    assert started.returncode == 0, started.stderr
+    assert worker('start').returncode == 0  # already running
+
+    deployed = worker('run', 'ensure-registry', 'deploy-flow', '--flow', 'nipyapi_test_cicd_demo')
+    assert deployed.returncode == 0, deployed.stderr
+    outputs = json.loads(deployed.stdout)
+    assert outputs['process_group_name'] == 'nipyapi_test_cicd_demo'
+    assert outputs['process_group_id'] in mock_nifi.canvas.groups
+
+    # The process group ID is remembered between requests, stdin is passed through
+    configured = worker('run', 'configure-params', '--parameters-file', '-',
+                        stdin='{"version": "2.0.0"}')
+    assert configured.returncode == 0, configured.stderr
+    assert json.loads(configured.stdout)['parameters_changed'] == 'version'
+
+    empty = worker('run', 'configure-params', '--parameters-file', '-')
+    assert empty.returncode == 1
+    assert 'no parameters were read from stdin' in json.loads(empty.stdout)['error']
+
+    stopped = worker('stop')
+    assert stopped.returncode == 0
+    assert '3 command(s) run' in stopped.stderr
+
+
+def test_run_without_worker_falls_back_to_this_process(worker):
+    result = worker('run', 'ensure-registry')
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout)['registry_client_name'] == 'Github-FlowRegistry'
+    assert 'No nipyapi worker running' in worker('stop').stderr